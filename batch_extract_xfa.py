@@ -0,0 +1,13 @@
+#!/usr/bin/env python3
+"""Batch XFA extraction CLI. See xfa_extract.batch for options."""
+
+import sys
+
+from xfa_extract.batch import iter_pdf_paths, main, run_batch
+
+# iter_pdf_paths and run_batch lived here before the package existed;
+# they are re-exported for scripts that still import them from this file.
+__all__ = ["iter_pdf_paths", "main", "run_batch"]
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,59 +1,23 @@
-import re
-import zlib
+import os
 import sys
-import xml.etree.ElementTree as ET
 
-FILE_PATH = "/Users/jacky/Desktop/tian/1.2 1344-validated.pdf"
-
-
-def extract_text_from_xml(xml_content):
-    try:
-        root = ET.fromstring(xml_content)
-        data = {}
-        for elem in root.iter():
-            if elem.text and elem.text.strip():
-                tag = elem.tag.split("}")[-1] if "}" in elem.tag else elem.tag
-                data[tag] = elem.text.strip()
-                for k, v in elem.attrib.items():
-                    attr_name = k.split("}")[-1] if "}" in k else k
-                    data[f"{tag}_{attr_name}"] = v
-        return data, root
-    except ET.ParseError:
-        return {}, None
-
-
-def find_xfa_data(file_path):
-    with open(file_path, "rb") as f:
-        content = f.read()
+from xfa_extract import instrument
+from xfa_extract.datasets import extract_text_from_xml
+from xfa_extract.scanner import find_xfa_data as _find_xfa_data
 
-    candidates = []
-
-    stream_pattern = re.compile(b"stream\s*[\r\n]+(.*?)[\r\n]+\s*endstream", re.DOTALL)
-
-    print(f"Scanning {len(content)} bytes for streams (broad regex)...")
+FILE_PATH = "/Users/jacky/Desktop/tian/1.2 1344-validated.pdf"
 
-    for match in stream_pattern.finditer(content):
-        stream_data = match.group(1)
-        try:
-            decompressed = zlib.decompress(stream_data)
-            if (
-                b"<?xml" in decompressed
-                or b"<xfa:" in decompressed
-                or b"<form1" in decompressed
-            ):
-                candidates.append(decompressed)
-            elif decompressed.strip().startswith(b"<") and b">" in decompressed:
-                if b"<pdf" not in decompressed and len(decompressed) > 20:
-                    candidates.append(decompressed)
-        except Exception:
-            pass
 
+def find_xfa_data(file_path, scanner="mmap"):
+    mode = "broad regex" if scanner == "regex" else scanner
+    print(f"Scanning {os.path.getsize(file_path)} bytes for streams ({mode})...")
+    candidates = _find_xfa_data(file_path, scanner)
     print(f"Found {len(candidates)} potential XML candidates in streams.")
     return candidates
 
 
-def main():
-    xml_candidates = find_xfa_data(FILE_PATH)
+def main(file_path=FILE_PATH):
+    xml_candidates = find_xfa_data(file_path)
 
     if not xml_candidates:
         print("No XML-like data found in streams.")
@@ -85,4 +49,10 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    if "--trace" in sys.argv:
+        with instrument.tracing() as trace:
+            main(args[0] if args else FILE_PATH)
+        instrument.print_trace(trace.to_dict())
+    else:
+        main(args[0] if args else FILE_PATH)
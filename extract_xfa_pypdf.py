@@ -1,35 +1,23 @@
-from pypdf import PdfReader
-from pypdf.generic import IndirectObject, DictionaryObject, ArrayObject
 import xml.etree.ElementTree as ET
 import sys
+from functools import partial
 
-FILE_PATH = "/Users/jacky/Desktop/tian/1.2 1344-validated.pdf"
-
+from xfa_extract import instrument
+from xfa_extract.pypdf_engine import (
+    find_data_packet,
+    open_resolver,
+    read_acroform_fields,
+    read_xfa_packets,
+)
 
-def resolve_obj(obj):
-    if isinstance(obj, IndirectObject):
-        return obj.get_object()
-    return obj
+FILE_PATH = "/Users/jacky/Desktop/tian/1.2 1344-validated.pdf"
 
 
-def main():
+def main(file_path=FILE_PATH, packets=("datasets",), acroform=False):
+    resolver = None
     try:
-        reader = PdfReader(FILE_PATH)
-        if reader.is_encrypted:
-            reader.decrypt("")
-
-        root = resolve_obj(reader.root_object)
-        acroform = resolve_obj(root["/AcroForm"])
-        xfa = resolve_obj(acroform["/XFA"])
-        xml_content = b""
-
-        if isinstance(xfa, list) or isinstance(xfa, ArrayObject):
-            for i in range(1, len(xfa), 2):
-                stream_obj = resolve_obj(xfa[i])
-                if hasattr(stream_obj, "get_data"):
-                    xml_content += stream_obj.get_data()
-        elif hasattr(xfa, "get_data"):
-            xml_content = xfa.get_data()
+        resolver = open_resolver(file_path)
+        xml_content = b"".join(read_xfa_packets(file_path, packets, resolver).values())
 
         # Save raw XML to file for inspection
         with open("xfa_dump.xml", "wb") as f:
@@ -47,17 +35,12 @@ def main():
             # namespaces in ET are annoying, usually {http://www.xfa.org/schema/xfa-data/1.0/}data
 
             print("\n--- Searching for Data Packet ---")
-            found_data = False
-            for elem in root_xml.iter():
-                if "datasets" in elem.tag:
-                    for child in elem:
-                        if "data" in child.tag:
-                            print("Found data packet. Dumping content...")
-                            found_data = True
-                            # Print this subtree
-                            dump_tree(child)
-
-            if not found_data:
+            data_packet = find_data_packet(root_xml)
+            if data_packet is not None:
+                print("Found data packet. Dumping content...")
+                # Print this subtree
+                dump_tree(data_packet)
+            else:
                 print(
                     "Could not find specific 'datasets/data' structure. Dumping everything..."
                 )
@@ -69,6 +52,15 @@ def main():
     except Exception as e:
         print(f"Error: {e}")
 
+    if acroform:
+        # Widget values often survive when third-party tools drop the XFA.
+        print("\n--- AcroForm Fields ---")
+        try:
+            for name, value in read_acroform_fields(file_path, resolver).items():
+                print(f"{name}: {value}")
+        except Exception as e:
+            print(f"Error reading AcroForm fields: {e}")
+
 
 def dump_tree(elem, level=0):
     indent = "  " * level
@@ -87,4 +79,16 @@ def dump_tree(elem, level=0):
 
 
 if __name__ == "__main__":
-    main()
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    run = partial(
+        main,
+        args[0] if args else FILE_PATH,
+        None if "--all-packets" in sys.argv else ("datasets",),
+        "--acroform" in sys.argv,
+    )
+    if "--trace" in sys.argv:
+        with instrument.tracing() as trace:
+            run()
+        instrument.print_trace(trace.to_dict())
+    else:
+        run()
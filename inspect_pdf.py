@@ -1,36 +1,50 @@
-import re
+import sys
+
+from xfa_extract.profile import profile_pdf
 
 FILE_PATH = "/Users/jacky/Desktop/tian/1.2 1344-validated.pdf"
 
 
 def inspect_pdf(file_path):
+    profile = profile_pdf(file_path)
+
     with open(file_path, "rb") as f:
-        content = f.read()
+        header = f.read(500)
+        f.seek(max(0, profile.size - 500))
+        footer = f.read(500)
 
-    print(f"File Size: {len(content)} bytes")
+    print(f"File Size: {profile.size} bytes (PDF {profile.version})")
     print("\n--- Header ---")
-    print(content[:500])
+    print(header)
 
     print("\n--- Footer ---")
-    print(content[-500:])
+    print(footer)
 
     print("\n--- Filters Used ---")
-    filters = set(re.findall(b"/Filter\s*/([A-Za-z0-9]+)", content))
-    print(filters)
+    for name, count in sorted(profile.streams_by_filter.items()):
+        print(f"{name}: {count}")
 
     print("\n--- AcroForm/XFA markers ---")
-    if b"/AcroForm" in content:
+    if profile.has_acroform:
         print("Found /AcroForm")
-    if b"/XFA" in content:
+    if profile.has_xfa:
         print("Found /XFA")
-    if b"/NeedAppearances" in content:
+    if profile.need_appearances:
         print("Found /NeedAppearances")
+    if profile.encrypted:
+        print("Found /Encrypt")
 
-    print("\n--- Stream Count ---")
-    stream_starts = len(re.findall(b"stream", content))
-    endstream_starts = len(re.findall(b"endstream", content))
-    print(f"stream: {stream_starts}, endstream: {endstream_starts}")
+    print("\n--- Structure ---")
+    print(f"objects: {profile.objects}, streams: {profile.streams}")
+    print(f"object streams: {profile.object_streams}")
+    print(
+        f"stream bytes: {profile.compressed_bytes} compressed, "
+        f"{profile.uncompressed_bytes} uncompressed"
+    )
+    print(f"image share: {profile.image_share:.1%}")
+    print(f"incremental updates: {profile.incremental_updates}")
+    print(f"profiled in {profile.elapsed_ms} ms")
 
 
 if __name__ == "__main__":
-    inspect_pdf(FILE_PATH)
+    inspect_pdf(sys.argv[1] if len(sys.argv) > 1 else FILE_PATH)
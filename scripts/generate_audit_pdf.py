@@ -2,6 +2,14 @@
 """
 Judicial Authority Theme - Immigration Audit Report Generator
 Generates professional PDF audit reports with verdict badges and color-coded risk assessment.
+
+Reports are built from structured audit results (see SAMPLE_AUDIT for the
+shape): verdicts, findings, checklist and recommendations.
+
+Usage:
+    python3 generate_audit_pdf.py [OUTPUT.pdf]                  # sample report
+    python3 generate_audit_pdf.py OUTPUT.pdf --input audit.json
+    python3 generate_audit_pdf.py --input cases.jsonl --output-dir reports/ [--workers N]
 """
 
 from reportlab.lib.pagesizes import letter, A4
@@ -23,46 +31,273 @@ from reportlab.platypus import (
 from reportlab.pdfgen import canvas
 from reportlab.lib import colors
 from reportlab.pdfbase import pdfmetrics
-from reportlab.pdfbase.ttfonts import TTFont
+from reportlab.pdfbase.pdfmetrics import registerFontFamily
+from reportlab.pdfbase import ttfonts
+from reportlab.pdfbase.ttfonts import TTEncoding, TTFNameBytes, TTFont, TTFontFace
+from reportlab import rl_config
 from datetime import datetime
+from fnmatch import fnmatch
+from functools import partial
+from weakref import WeakKeyDictionary
+from xml.sax.saxutils import escape
+import glob
+import hashlib
 import json
 import os
+import re
+import reportlab
+import sys
+import time
+
+# pool_map is shared with the extraction package at the repository root.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from xfa_extract.pool import pool_map
+
+from optimize_pdf import optimize_in_place
 
 # ============================================================================
-# REGISTER CHINESE FONTS (macOS)
+# CJK FONTS (registered lazily, on first CJK text)
 # ============================================================================
 
+# Font files tried for CJK text, in preference order: macOS system fonts,
+# then the usual Linux locations. ReportLab reads TrueType outlines only,
+# so CFF-based builds (most Noto CJK .ttc/.otf packages) are skipped when
+# they fail to load. Prepend your own files or directories with
+# AUDIT_PDF_FONT_PATH (os.pathsep-separated) or --font-path.
+DEFAULT_CJK_FONTS = [
+    "/System/Library/Fonts/PingFang.ttc",
+    "/System/Library/Fonts/STHeiti Medium.ttc",
+    "/System/Library/Fonts/Supplemental/Songti.ttc",
+    "/usr/share/fonts/truetype/noto/NotoSansSC-Regular.ttf",
+    "/usr/share/fonts/opentype/noto/NotoSansCJK-Regular.ttc",
+    "/usr/share/fonts/noto-cjk/NotoSansCJK-Regular.ttc",
+    "/usr/share/fonts/google-noto-cjk/NotoSansCJK-Regular.ttc",
+    "/usr/share/fonts/google-noto-sans-cjk-fonts/NotoSansCJK-Regular.ttc",
+    "/usr/share/fonts/truetype/wqy/wqy-microhei.ttc",
+    "/usr/share/fonts/truetype/wqy/wqy-zenhei.ttc",
+    "/usr/share/fonts/wenquanyi/wqy-zenhei/wqy-zenhei.ttc",
+    "/usr/share/fonts/truetype/droid/DroidSansFallbackFull.ttf",
+    "~/.local/share/fonts/NotoSansSC-Regular.ttf",
+]
+
+# Parsed metrics of each CJK font, as JSON keyed by the font file's sha256,
+# so later runs skip ReportLab's table parsing (the bulk of loading a large
+# .ttc collection). Entries are plain data; one that does not load is
+# discarded and the font parsed again.
+FONT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "audit-pdf-fonts")
+FONT_CACHE_FORMAT = 1
+
+# CJK ideographs, kana, hangul, CJK punctuation and full-width forms.
+_CJK_TEXT = re.compile(
+    "[\u2e80-\u9fff\uac00-\ud7af\uf900-\ufaff\ufe30-\ufe4f\uff00-\uffef]"
+)
+
 
-def register_chinese_fonts():
-    """Register system Chinese fonts with ReportLab"""
-    font_paths = {
-        "PingFang-Regular": "/System/Library/Fonts/PingFang.ttc",
-        "STHeiti-Medium": "/System/Library/Fonts/STHeiti Medium.ttc",
-        "Songti-Regular": "/System/Library/Fonts/Supplemental/Songti.ttc",
+def font_search_path(extra=()):
+    """Return candidate CJK font files: extra, AUDIT_PDF_FONT_PATH, defaults."""
+    entries = list(extra)
+    entries += os.environ.get("AUDIT_PDF_FONT_PATH", "").split(os.pathsep)
+    paths = []
+    for entry in filter(None, entries):
+        entry = os.path.expanduser(entry)
+        if os.path.isdir(entry):
+            paths += sorted(glob.glob(os.path.join(entry, "*.tt[cf]")))
+        else:
+            paths.append(entry)
+    return paths + [os.path.expanduser(p) for p in DEFAULT_CJK_FONTS]
+
+
+FONT_SEARCH_PATH = font_search_path()
+
+
+def _to_json(value):
+    """Encode face metrics as JSON-safe data, tagging non-JSON types."""
+    if isinstance(value, TTFNameBytes):
+        return {"name": value.ustr}
+    if isinstance(value, bytes):
+        return {"bytes": value.hex()}
+    if isinstance(value, tuple):
+        return {"tuple": [_to_json(v) for v in value]}
+    if isinstance(value, dict):
+        return {"dict": [[_to_json(k), _to_json(v)] for k, v in value.items()]}
+    if isinstance(value, list):
+        return [_to_json(v) for v in value]
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    raise TypeError(f"cannot cache {type(value).__name__}")
+
+
+def _from_json(value):
+    if isinstance(value, list):
+        return [_from_json(v) for v in value]
+    if not isinstance(value, dict):
+        return value
+    (tag, data), = value.items()
+    if tag == "name":
+        return TTFNameBytes(data.encode("utf8"))
+    if tag == "bytes":
+        return bytes.fromhex(data)
+    if tag == "tuple":
+        return tuple(_from_json(v) for v in data)
+    if tag == "dict":
+        return {_from_json(k): _from_json(v) for k, v in data}
+    raise ValueError(f"unknown cache tag {tag!r}")
+
+
+# Face attributes that belong to the file rather than its metrics.
+_FACE_FILE_ATTRS = ("_ttf_data", "filename", "_pdfScale")
+
+
+class _CachedFace(TTFontFace):
+    """A TTFontFace that takes its metrics from the cache, not extractInfo()."""
+
+    def __init__(self, filename, metrics, subfontIndex=0):
+        self._metrics = metrics
+        super().__init__(filename, subfontIndex=subfontIndex)
+
+    def extractInfo(self, charInfo=1):
+        self.__dict__.update(self.__dict__.pop("_metrics"))
+        scale = 1000 / self.unitsPerEm
+        self._pdfScale = lambda x: x * scale
+
+
+class _CachedTTFont(TTFont):
+    """TTFont.__init__ with a _CachedFace in place of the parsed one."""
+
+    def __init__(self, name, filename, metrics, subfontIndex=0):
+        self.fontName = name
+        self.face = _CachedFace(filename, metrics, subfontIndex)
+        self.encoding = TTEncoding()
+        self.state = WeakKeyDictionary()
+        self._asciiReadable = rl_config.ttfAsciiReadable
+        unshaped = getattr(ttfonts, "unShapedFontGlob", ())
+        self.shapable = not any(fnmatch(name, pattern) for pattern in unshaped)
+
+
+def _load_cached_font(cache_file, font_name, font_path, digest, subfont_index):
+    with open(cache_file, encoding="utf-8") as f:
+        entry = json.load(f)
+    expected = (FONT_CACHE_FORMAT, reportlab.Version, digest, subfont_index)
+    found = (entry["format"], entry["reportlab"], entry["sha256"], entry["subfont"])
+    if found != expected:
+        raise ValueError("stale font cache entry")
+    font = _CachedTTFont(
+        font_name, font_path, _from_json(entry["metrics"]), subfont_index
+    )
+    # The rebuilt objects must look exactly like the ones ReportLab made.
+    attrs = [sorted(vars(font)), sorted(vars(font.face))]
+    if attrs != [entry["font_attrs"], entry["face_attrs"]]:
+        raise ValueError("font cache entry does not match this ReportLab")
+    return font
+
+
+def _save_cached_font(cache_file, font, digest, subfont_index):
+    face = vars(font.face)
+    entry = {
+        "format": FONT_CACHE_FORMAT,
+        "reportlab": reportlab.Version,
+        "sha256": digest,
+        "subfont": subfont_index,
+        "font_attrs": sorted(vars(font)),
+        "face_attrs": sorted(face),
+        "metrics": _to_json(
+            {k: v for k, v in face.items() if k not in _FACE_FILE_ATTRS}
+        ),
     }
+    os.makedirs(FONT_CACHE_DIR, exist_ok=True)
+    tmp = f"{cache_file}.{os.getpid()}.tmp"
+    try:
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(entry, f, separators=(",", ":"))
+        os.replace(tmp, cache_file)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+
+def load_ttfont(font_name, font_path, subfont_index=0):
+    """
+    Return a TTFont for font_path, from the FONT_CACHE_DIR metrics when a
+    valid entry exists for the file's sha256, else parsed (and cached).
+    """
+    with open(font_path, "rb") as f:
+        digest = hashlib.sha256(f.read()).hexdigest()
+    cache_file = os.path.join(FONT_CACHE_DIR, f"{digest}-{subfont_index}.json")
+    if os.path.exists(cache_file):
+        try:
+            return _load_cached_font(
+                cache_file, font_name, font_path, digest, subfont_index
+            )
+        except Exception:
+            try:
+                os.remove(cache_file)
+            except OSError:
+                pass
+    font = TTFont(font_name, font_path, subfontIndex=subfont_index)
+    try:
+        _save_cached_font(cache_file, font, digest, subfont_index)
+    except (OSError, TypeError, ValueError):
+        pass  # unwritable cache dir or uncacheable metrics: parse next time
+    return font
 
-    registered_fonts = []
 
-    for font_name, font_path in font_paths.items():
-        if os.path.exists(font_path):
-            try:
-                # Try to register the font
-                pdfmetrics.registerFont(TTFont(font_name, font_path))
-                registered_fonts.append(font_name)
-                print(f"✓ Registered font: {font_name}")
-            except Exception as e:
-                print(f"✗ Failed to register {font_name}: {e}")
+_cjk_font = None
+
+
+def cjk_font():
+    """
+    Return the name of a registered CJK font, registering the first usable
+    one from FONT_SEARCH_PATH on first call ("Helvetica" if none loads).
+    """
+    global _cjk_font
+    if _cjk_font is not None:
+        return _cjk_font
+    for font_path in FONT_SEARCH_PATH:
+        if not os.path.exists(font_path):
+            continue
+        font_name = os.path.splitext(os.path.basename(font_path))[0].replace(" ", "-")
+        try:
+            pdfmetrics.registerFont(load_ttfont(font_name, font_path))
+        except Exception as e:
+            print(f"✗ Failed to register {font_name}: {e}")
+            continue
+        # One face for every weight, so <b>/<i> markup still resolves.
+        registerFontFamily(
+            font_name,
+            normal=font_name,
+            bold=font_name,
+            italic=font_name,
+            boldItalic=font_name,
+        )
+        print(f"✓ Registered font: {font_name}")
+        _cjk_font = font_name
+        return _cjk_font
+    print("⚠ No Chinese fonts registered, using Helvetica fallback")
+    _cjk_font = "Helvetica"
+    return _cjk_font
 
-    # Fallback to Helvetica if no Chinese fonts available
-    if not registered_fonts:
-        print("⚠ No Chinese fonts registered, using Helvetica fallback")
-        return "Helvetica"
 
-    return registered_fonts[0] if registered_fonts else "Helvetica"
+def has_cjk(text):
+    return _CJK_TEXT.search(text) is not None
 
 
-# Register fonts at module load time
-CHINESE_FONT = register_chinese_fonts()
+_cjk_styles = {}
+
+
+def cjk_style(style):
+    """Return a copy of ParagraphStyle style set in the CJK font (cached)."""
+    derived = _cjk_styles.get(style.name)
+    if derived is None:
+        derived = _cjk_styles[style.name] = ParagraphStyle(
+            name=f"{style.name}-CJK", parent=style, fontName=cjk_font()
+        )
+    return derived
+
+
+def para(text, style):
+    """Paragraph that switches to the CJK font only if text needs it."""
+    return Paragraph(text, cjk_style(style) if has_cjk(text) else style)
+
 
 # ============================================================================
 # JUDICIAL AUTHORITY THEME COLORS & TYPOGRAPHY
@@ -107,15 +342,44 @@ COLORS = {
     "dangerLight": colors.HexColor(THEME["dangerLight"]),
 }
 
+# Badge icon, labels, default risk level and colours for each verdict.
+VERDICTS = {
+    "go": {
+        "icon": "✓",
+        "label": "GO",
+        "heading": "GO - Approved",
+        "risk": "Low",
+        "text": COLORS["success"],
+        "bg": COLORS["successLight"],
+    },
+    "caution": {
+        "icon": "⚠",
+        "label": "CAUTION",
+        "heading": "CAUTION - Review Required",
+        "risk": "Medium",
+        "text": COLORS["warning"],
+        "bg": COLORS["warningLight"],
+    },
+    "no-go": {
+        "icon": "✗",
+        "label": "NO-GO",
+        "heading": "NO-GO - Critical Issues",
+        "risk": "High",
+        "text": COLORS["danger"],
+        "bg": COLORS["dangerLight"],
+    },
+}
+
 # ============================================================================
 # CUSTOM PAGE TEMPLATE WITH HEADERS & FOOTERS
 # ============================================================================
 
 
 class AuditPageTemplate:
-    def __init__(self, story, title, case_ref):
+    def __init__(self, story, title, case_ref, date=None):
         self.title = title
         self.case_ref = case_ref
+        self.date = date
         self.page_num = 1
 
     def header_footer(self, canvas, doc):
@@ -141,14 +405,14 @@ class AuditPageTemplate:
         canvas.rect(0, 0, page_width, 0.45 * inch, fill=1, stroke=0)
 
         # Footer text
-        canvas.setFont("Helvetica", 9)
+        canvas.setFont(cjk_font() if has_cjk(self.case_ref) else "Helvetica", 9)
         canvas.setFillColor(colors.white)
 
         # Left: Case reference
         canvas.drawString(0.5 * inch, 0.25 * inch, f"Case: {self.case_ref}")
 
         # Center: Date
-        today = datetime.now().strftime("%B %d, %Y")
+        today = self.date or datetime.now().strftime("%B %d, %Y")
         canvas.drawCentredString(page_width / 2, 0.25 * inch, today)
 
         # Right: Page number
@@ -170,31 +434,7 @@ def create_verdict_badge(verdict, label, description=""):
     Create a verdict badge with color, icon, and label.
     verdict: "go" | "caution" | "no-go"
     """
-    verdicts = {
-        "go": {
-            "bg": COLORS["successLight"],
-            "text": COLORS["success"],
-            "icon": "✓",
-            "label": "GO",
-            "border": COLORS["success"],
-        },
-        "caution": {
-            "bg": COLORS["warningLight"],
-            "text": COLORS["warning"],
-            "icon": "⚠",
-            "label": "CAUTION",
-            "border": COLORS["warning"],
-        },
-        "no-go": {
-            "bg": COLORS["dangerLight"],
-            "text": COLORS["danger"],
-            "icon": "✗",
-            "label": "NO-GO",
-            "border": COLORS["danger"],
-        },
-    }
-
-    v = verdicts.get(verdict, verdicts["caution"])
+    v = VERDICTS.get(verdict, VERDICTS["caution"])
 
     # Create styled paragraph for badge
     badge_text = f"""
@@ -204,7 +444,7 @@ def create_verdict_badge(verdict, label, description=""):
     return {
         "text": badge_text,
         "bg": v["bg"],
-        "border": v["border"],
+        "border": v["text"],
         "label": label,
         "description": description,
     }
@@ -222,7 +462,7 @@ def create_styles():
         ParagraphStyle(
             name="CustomTitle",
             parent=styles["Heading1"],
-            fontName=CHINESE_FONT if CHINESE_FONT != "Helvetica" else "Helvetica-Bold",
+            fontName="Helvetica-Bold",
             fontSize=36,
             textColor=COLORS["primary"],
             spaceAfter=12,
@@ -235,7 +475,7 @@ def create_styles():
         ParagraphStyle(
             name="CustomSubtitle",
             parent=styles["Heading2"],
-            fontName=CHINESE_FONT if CHINESE_FONT != "Helvetica" else "Helvetica",
+            fontName="Helvetica",
             fontSize=18,
             textColor=COLORS["secondary"],
             spaceAfter=24,
@@ -248,7 +488,7 @@ def create_styles():
         ParagraphStyle(
             name="SectionHeading",
             parent=styles["Heading2"],
-            fontName=CHINESE_FONT if CHINESE_FONT != "Helvetica" else "Helvetica-Bold",
+            fontName="Helvetica-Bold",
             fontSize=16,
             textColor=COLORS["primary"],
             spaceAfter=8,
@@ -264,7 +504,7 @@ def create_styles():
         ParagraphStyle(
             name="SubsectionHeading",
             parent=styles["Heading3"],
-            fontName=CHINESE_FONT if CHINESE_FONT != "Helvetica" else "Helvetica-Bold",
+            fontName="Helvetica-Bold",
             fontSize=13,
             textColor=COLORS["primary"],
             spaceAfter=6,
@@ -272,11 +512,14 @@ def create_styles():
         )
     )
 
+    # The sample sheet already defines BodyText; replace it rather than
+    # tripping StyleSheet1.add's duplicate check.
+    del styles.byName["BodyText"]
     styles.add(
         ParagraphStyle(
             name="BodyText",
             parent=styles["Normal"],
-            fontName=CHINESE_FONT if CHINESE_FONT != "Helvetica" else "Helvetica",
+            fontName="Helvetica",
             fontSize=11,
             textColor=COLORS["text"],
             alignment=TA_JUSTIFY,
@@ -288,203 +531,136 @@ def create_styles():
     styles.add(
         ParagraphStyle(
             name="VerdictLabel",
-            fontName=CHINESE_FONT if CHINESE_FONT != "Helvetica" else "Helvetica-Bold",
+            fontName="Helvetica-Bold",
             fontSize=10,
             textColor=COLORS["text"],
             spaceAfter=4,
         )
     )
 
+    # Table cells whose text needs the CJK font (see _cell).
+    styles.add(
+        ParagraphStyle(
+            name="TableCell",
+            parent=styles["Normal"],
+            fontSize=10,
+            textColor=COLORS["text"],
+            leading=12,
+        )
+    )
+
     return styles
 
 
 # ============================================================================
-# DOCUMENT GENERATOR
+# TABLE STYLES (compiled once, shared by every report)
 # ============================================================================
 
-
-def generate_audit_report(
-    output_file,
-    case_name="Immigration Case Audit Report",
-    case_ref="CASE-2026-001",
-    subtitle="Spousal Sponsorship Application Review",
-):
-    """Generate a professional immigration audit report with Judicial Authority theme"""
-
-    # Create PDF document
-    doc = SimpleDocTemplate(
-        output_file,
-        pagesize=letter,
-        rightMargin=0.75 * inch,
-        leftMargin=0.75 * inch,
-        topMargin=0.75 * inch + 0.5 * inch,  # Account for header
-        bottomMargin=0.75 * inch + 0.45 * inch,  # Account for footer
-    )
-
-    styles = create_styles()
-    story = []
-
-    # ========================================================================
-    # COVER PAGE
-    # ========================================================================
-
-    story.append(Spacer(1, 1.5 * inch))
-
-    # Main title
-    title = Paragraph(case_name, styles["CustomTitle"])
-    story.append(title)
-
-    # Subtitle
-    subtitle_para = Paragraph(subtitle, styles["CustomSubtitle"])
-    story.append(subtitle_para)
-
-    story.append(Spacer(1, 0.5 * inch))
-
-    # Case reference box
-    case_info = [
-        ["Case Reference:", case_ref],
-        ["Date Prepared:", datetime.now().strftime("%B %d, %Y")],
-        ["Status:", "FORMAL AUDIT REPORT"],
+CASE_INFO_STYLE = TableStyle(
+    [
+        ("BACKGROUND", (0, 0), (0, -1), COLORS["primary"]),
+        ("TEXTCOLOR", (0, 0), (0, -1), colors.white),
+        ("TEXTCOLOR", (1, 0), (1, -1), COLORS["text"]),
+        ("FONTNAME", (0, 0), (0, -1), "Helvetica-Bold"),
+        ("FONTSIZE", (0, 0), (-1, -1), 11),
+        ("PADDING", (0, 0), (-1, -1), 10),
+        ("BACKGROUND", (1, 0), (1, -1), COLORS["background"]),
+        ("LINEBELOW", (0, 0), (-1, -1), 2, COLORS["accent"]),
+        ("ALIGN", (0, 0), (0, -1), "RIGHT"),
+        ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
     ]
+)
 
-    case_table = Table(case_info, colWidths=[2 * inch, 3 * inch])
-    case_table.setStyle(
-        TableStyle(
-            [
-                ("BACKGROUND", (0, 0), (0, -1), COLORS["primary"]),
-                ("TEXTCOLOR", (0, 0), (0, -1), colors.white),
-                ("TEXTCOLOR", (1, 0), (1, -1), COLORS["text"]),
-                ("FONTNAME", (0, 0), (0, -1), "Helvetica-Bold"),
-                ("FONTSIZE", (0, 0), (-1, -1), 11),
-                ("PADDING", (0, 0), (-1, -1), 10),
-                ("BACKGROUND", (1, 0), (1, -1), COLORS["background"]),
-                ("LINEBELOW", (0, 0), (-1, -1), 2, COLORS["accent"]),
-                ("ALIGN", (0, 0), (0, -1), "RIGHT"),
-                ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
-            ]
-        )
-    )
-
-    story.append(case_table)
-    story.append(Spacer(1, 1 * inch))
-
-    # Disclaimer
-    disclaimer = Paragraph(
-        "<font size='9' color='#4B5563'><i>This report contains confidential information and is intended "
-        "for authorized personnel only. Unauthorized distribution is prohibited.</i></font>",
-        styles["Normal"],
-    )
-    story.append(disclaimer)
-
-    story.append(PageBreak())
-
-    # ========================================================================
-    # EXECUTIVE SUMMARY
-    # ========================================================================
-
-    story.append(Paragraph("Executive Summary", styles["SectionHeading"]))
-    story.append(Spacer(1, 0.15 * inch))
-
-    exec_summary_text = """
-    This audit report provides a comprehensive assessment of the spousal sponsorship application. 
-    The evaluation focuses on critical eligibility factors, document authenticity, and compliance with 
-    Immigration, Refugees and Citizenship Canada (IRCC) requirements. Three primary risk areas have been 
-    identified and evaluated according to the Judicial Authority assessment framework.
-    """
-
-    story.append(Paragraph(exec_summary_text, styles["BodyText"]))
-    story.append(Spacer(1, 0.2 * inch))
-
-    # Overall verdict
-    story.append(Paragraph("Overall Assessment", styles["SubsectionHeading"]))
-
-    overall_verdict = create_verdict_badge(
-        "caution",
-        "Proceed with Conditional Approval",
-        "Application meets most requirements with minor discrepancies requiring clarification.",
-    )
-
-    verdict_table = Table(
+VERDICT_BOX_STYLES = {
+    name: TableStyle(
         [
-            [
-                Paragraph(
-                    f"<font size='14' color='#{THEME['warning'][1:]}'><b>⚠ CAUTION</b></font>",
-                    styles["VerdictLabel"],
-                ),
-                Paragraph(
-                    "<font size='11'><b>Conditional Approval Recommended</b><br/>"
-                    "Application shows genuine intent with documentation concerns requiring clarification. "
-                    "Recommend conditional approval pending additional evidence submission.",
-                    styles["BodyText"],
-                ),
-            ]
-        ],
-        colWidths=[1.5 * inch, 4 * inch],
+            ("BACKGROUND", (0, 0), (-1, -1), v["bg"]),
+            ("LEFTPADDING", (0, 0), (-1, -1), 12),
+            ("RIGHTPADDING", (0, 0), (-1, -1), 12),
+            ("TOPPADDING", (0, 0), (-1, -1), 10),
+            ("BOTTOMPADDING", (0, 0), (-1, -1), 10),
+            ("BORDER", (0, 0), (-1, -1), 2, v["text"]),
+            ("VALIGN", (0, 0), (-1, -1), "TOP"),
+            ("FONTNAME", (0, 0), (0, 0), "Helvetica-Bold"),
+        ]
     )
+    for name, v in VERDICTS.items()
+}
 
-    verdict_table.setStyle(
-        TableStyle(
-            [
-                ("BACKGROUND", (0, 0), (-1, -1), COLORS["warningLight"]),
-                ("LEFTPADDING", (0, 0), (-1, -1), 12),
-                ("RIGHTPADDING", (0, 0), (-1, -1), 12),
-                ("TOPPADDING", (0, 0), (-1, -1), 10),
-                ("BOTTOMPADDING", (0, 0), (-1, -1), 10),
-                ("BORDER", (0, 0), (-1, -1), 2, COLORS["warning"]),
-                ("VALIGN", (0, 0), (-1, -1), "TOP"),
-                ("FONTNAME", (0, 0), (0, 0), "Helvetica-Bold"),
-            ]
-        )
-    )
+# Per-row status colours are added on top of these when a table is built.
+SUMMARY_TABLE_STYLE = TableStyle(
+    [
+        ("BACKGROUND", (0, 0), (-1, 0), COLORS["primary"]),
+        ("TEXTCOLOR", (0, 0), (-1, 0), colors.white),
+        ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
+        ("FONTSIZE", (0, 0), (-1, -1), 11),
+        ("GRID", (0, 0), (-1, -1), 1, COLORS["secondary"]),
+        ("FONTNAME", (2, 1), (2, -1), "Helvetica-Bold"),
+        ("PADDING", (0, 0), (-1, -1), 8),
+        ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
+        ("ALIGN", (0, 0), (-1, -1), "CENTER"),
+    ]
+)
 
-    story.append(verdict_table)
-    story.append(Spacer(1, 0.3 * inch))
+CHECKLIST_TABLE_STYLE = TableStyle(
+    [
+        ("BACKGROUND", (0, 0), (-1, 0), COLORS["primary"]),
+        ("TEXTCOLOR", (0, 0), (-1, 0), colors.white),
+        ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
+        ("FONTSIZE", (0, 0), (-1, -1), 10),
+        ("GRID", (0, 0), (-1, -1), 1, COLORS["secondary"]),
+        ("FONTNAME", (1, 1), (1, -1), "Helvetica-Bold"),
+        ("PADDING", (0, 0), (-1, -1), 8),
+        ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
+    ]
+)
 
-    # Summary statistics
-    story.append(Paragraph("Assessment Summary", styles["SubsectionHeading"]))
+_report_styles = None
 
-    summary_data = [
-        ["Assessment Area", "Status", "Risk Level"],
-        ["Relationship Genuineness", "✓ GO", "Low"],
-        ["Financial Capacity", "⚠ CAUTION", "Medium"],
-        ["Documentation Completeness", "✗ NO-GO", "High"],
-    ]
 
-    summary_table = Table(summary_data, colWidths=[2.5 * inch, 1.5 * inch, 1.5 * inch])
-    summary_table.setStyle(
-        TableStyle(
-            [
-                ("BACKGROUND", (0, 0), (-1, 0), COLORS["primary"]),
-                ("TEXTCOLOR", (0, 0), (-1, 0), colors.white),
-                ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
-                ("FONTSIZE", (0, 0), (-1, -1), 11),
-                ("GRID", (0, 0), (-1, -1), 1, COLORS["secondary"]),
-                ("BACKGROUND", (2, 1), (2, 1), COLORS["successLight"]),
-                ("BACKGROUND", (2, 2), (2, 2), COLORS["warningLight"]),
-                ("BACKGROUND", (2, 3), (2, 3), COLORS["dangerLight"]),
-                ("TEXTCOLOR", (2, 1), (2, 1), COLORS["success"]),
-                ("TEXTCOLOR", (2, 2), (2, 2), COLORS["warning"]),
-                ("TEXTCOLOR", (2, 3), (2, 3), COLORS["danger"]),
-                ("FONTNAME", (2, 1), (2, 3), "Helvetica-Bold"),
-                ("PADDING", (0, 0), (-1, -1), 8),
-                ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
-                ("ALIGN", (0, 0), (-1, -1), "CENTER"),
-            ]
-        )
-    )
+def report_styles():
+    """The create_styles() stylesheet, built once and shared by every report."""
+    global _report_styles
+    if _report_styles is None:
+        _report_styles = create_styles()
+    return _report_styles
 
-    story.append(summary_table)
-    story.append(PageBreak())
 
-    # ========================================================================
-    # RISK ASSESSMENT SECTIONS
-    # ========================================================================
+# ============================================================================
+# AUDIT DATA
+# ============================================================================
 
-    risk_assessments = [
+# An audit result, as read from JSON. All text is plain text: it is
+# escaped, never parsed as markup. Verdicts are "go", "caution" or
+# "no-go"; "date" defaults to today and "output" (the file name used in
+# batch mode) to the case reference.
+SAMPLE_AUDIT = {
+    "case_name": "Immigration Case Audit Report",
+    "case_ref": "CASE-2026-001",
+    "subtitle": "Spousal Sponsorship Application Review",
+    "summary": (
+        "This audit report provides a comprehensive assessment of the spousal "
+        "sponsorship application. The evaluation focuses on critical eligibility "
+        "factors, document authenticity, and compliance with Immigration, Refugees "
+        "and Citizenship Canada (IRCC) requirements. Three primary risk areas have "
+        "been identified and evaluated according to the Judicial Authority "
+        "assessment framework."
+    ),
+    "overall": {
+        "verdict": "caution",
+        "label": "Conditional Approval Recommended",
+        "description": (
+            "Application shows genuine intent with documentation concerns requiring "
+            "clarification. Recommend conditional approval pending additional "
+            "evidence submission."
+        ),
+    },
+    "assessments": [
         {
             "title": "Relationship Genuineness Assessment",
+            "area": "Relationship Genuineness",
             "verdict": "go",
-            "icon": "✓",
+            "risk": "Low",
             "findings": [
                 "Strong evidence of cohabitation (joint lease, utility bills, insurance)",
                 "Consistent timeline across all submitted documents",
@@ -495,8 +671,9 @@ def generate_audit_report(
         },
         {
             "title": "Financial Capacity Assessment",
+            "area": "Financial Capacity",
             "verdict": "caution",
-            "icon": "⚠",
+            "risk": "Medium",
             "findings": [
                 "Sponsor income verified at CAD $65,000 annually",
                 "Income exceeds minimum requirement by 15%",
@@ -508,8 +685,9 @@ def generate_audit_report(
         },
         {
             "title": "Documentation Completeness Assessment",
+            "area": "Documentation Completeness",
             "verdict": "no-go",
-            "icon": "✗",
+            "risk": "High",
             "findings": [
                 "Missing: Provincial health insurance documentation",
                 "Missing: Original certified copies of birth certificates (only notarized copies provided)",
@@ -519,173 +697,545 @@ def generate_audit_report(
             ],
             "recommendation": "Critical - Request all missing documents within 30 days. Application cannot proceed to final review without completion.",
         },
+    ],
+    "checklist": [
+        {"item": "Relationship documentation", "received": True},
+        {"item": "Financial documentation", "received": True},
+        {"item": "Police certificates", "received": False},
+        {"item": "Medical examination", "received": False},
+        {"item": "Proof of identity", "received": True},
+        {"item": "Proof of residence", "received": True},
+        {"item": "References (3 required)", "received": False},
+        {"item": "Statutory declaration", "received": True},
+        {"item": "Insurance/health coverage", "received": False},
+        {"item": "Background check authorization", "received": True},
+    ],
+    "recommendation": {
+        "status": "Conditional Approval Pending Documentation",
+        "actions": [
+            "Obtain and submit all missing documents within 30 days",
+            "Schedule and complete medical examination at approved panel physician",
+            "Obtain certified police certificates from all prior residence countries",
+            "Provide employment verification for recent job change (minimum 2 months post-hire)",
+            "Complete missing personal references",
+        ],
+        "timeline": (
+            "Upon receipt of all required documentation and medical results, final "
+            "decision can typically be rendered within 10-15 business days."
+        ),
+        "contact": (
+            "Applicant should respond to this notice of deficiency within the "
+            "specified timeframe. Failure to provide required documentation may "
+            "result in application rejection."
+        ),
+    },
+}
+
+
+def iter_audits(path):
+    """Yield audit dicts from a JSON file (one object or a list) or JSON Lines."""
+    with open(path, encoding="utf-8") as f:
+        if path.endswith((".jsonl", ".ndjson")):
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+            return
+        data = json.load(f)
+    yield from data if isinstance(data, list) else [data]
+
+
+def _verdict(entry):
+    verdict = str(entry.get("verdict", "")).lower()
+    if verdict not in VERDICTS:
+        raise ValueError(
+            f"Unknown verdict {entry.get('verdict')!r} "
+            f"(expected one of: {', '.join(VERDICTS)})"
+        )
+    return verdict
+
+
+def _hex(color):
+    return f"#{color.hexval()[2:]}"
+
+
+def _cell(text, style, color=None):
+    """
+    Table cell for text. Latin text stays a plain string and takes the
+    table's font; CJK text becomes a Paragraph in the CJK font, since
+    the standard fonts have no glyphs for it.
+    """
+    text = str(text)
+    if not has_cjk(text):
+        return text
+    markup = escape(text)
+    if color is not None:
+        markup = f"<font color='{_hex(color)}'><b>{markup}</b></font>"
+    return Paragraph(markup, cjk_style(style))
+
+
+# ============================================================================
+# DOCUMENT GENERATOR
+# ============================================================================
+
+
+def _cover(story, audit, styles, date):
+    story.append(Spacer(1, 1.5 * inch))
+
+    # Main title
+    case_name = audit.get("case_name", "Immigration Case Audit Report")
+    story.append(para(escape(case_name), styles["CustomTitle"]))
+
+    # Subtitle
+    if audit.get("subtitle"):
+        story.append(para(escape(audit["subtitle"]), styles["CustomSubtitle"]))
+
+    story.append(Spacer(1, 0.5 * inch))
+
+    # Case reference box
+    case_info = [
+        ["Case Reference:", _cell(audit.get("case_ref", ""), styles["TableCell"])],
+        ["Date Prepared:", _cell(date, styles["TableCell"])],
+        ["Status:", "FORMAL AUDIT REPORT"],
     ]
+    case_table = Table(case_info, colWidths=[2 * inch, 3 * inch])
+    case_table.setStyle(CASE_INFO_STYLE)
+    story.append(case_table)
+    story.append(Spacer(1, 1 * inch))
+
+    # Disclaimer
+    disclaimer = para(
+        "<font size='9' color='#4B5563'><i>This report contains confidential information and is intended "
+        "for authorized personnel only. Unauthorized distribution is prohibited.</i></font>",
+        styles["Normal"],
+    )
+    story.append(disclaimer)
+
+    story.append(PageBreak())
+
+
+def _executive_summary(story, audit, styles):
+    story.append(para("Executive Summary", styles["SectionHeading"]))
+    story.append(Spacer(1, 0.15 * inch))
+
+    if audit.get("summary"):
+        story.append(para(escape(audit["summary"]), styles["BodyText"]))
+        story.append(Spacer(1, 0.2 * inch))
 
-    for idx, assessment in enumerate(risk_assessments):
-        story.append(Paragraph(assessment["title"], styles["SectionHeading"]))
+    # Overall verdict
+    overall = audit.get("overall")
+    if overall:
+        verdict = _verdict(overall)
+        v = VERDICTS[verdict]
+        story.append(para("Overall Assessment", styles["SubsectionHeading"]))
+        verdict_table = Table(
+            [
+                [
+                    para(
+                        f"<font size='14' color='{_hex(v['text'])}'><b>{v['icon']} {v['label']}</b></font>",
+                        styles["VerdictLabel"],
+                    ),
+                    para(
+                        f"<font size='11'><b>{escape(overall.get('label', ''))}</b><br/>"
+                        f"{escape(overall.get('description', ''))}</font>",
+                        styles["BodyText"],
+                    ),
+                ]
+            ],
+            colWidths=[1.5 * inch, 4 * inch],
+        )
+        verdict_table.setStyle(VERDICT_BOX_STYLES[verdict])
+        story.append(verdict_table)
+        story.append(Spacer(1, 0.3 * inch))
+
+    # Summary statistics
+    assessments = audit.get("assessments") or []
+    if assessments:
+        story.append(para("Assessment Summary", styles["SubsectionHeading"]))
+
+        summary_data = [["Assessment Area", "Status", "Risk Level"]]
+        row_styles = []
+        for row, assessment in enumerate(assessments, 1):
+            v = VERDICTS[_verdict(assessment)]
+            area = assessment.get("area") or assessment.get("title", "")
+            risk = assessment.get("risk") or v["risk"]
+            summary_data.append(
+                [
+                    _cell(area, styles["TableCell"]),
+                    f"{v['icon']} {v['label']}",
+                    _cell(risk, styles["TableCell"], v["text"]),
+                ]
+            )
+            row_styles.append(("BACKGROUND", (2, row), (2, row), v["bg"]))
+            row_styles.append(("TEXTCOLOR", (2, row), (2, row), v["text"]))
+
+        summary_table = Table(
+            summary_data, colWidths=[2.5 * inch, 1.5 * inch, 1.5 * inch]
+        )
+        summary_table.setStyle(SUMMARY_TABLE_STYLE)
+        summary_table.setStyle(row_styles)
+        story.append(summary_table)
+
+    story.append(PageBreak())
+
+
+def _risk_assessments(story, audit, styles):
+    assessments = audit.get("assessments") or []
+    for idx, assessment in enumerate(assessments):
+        v = VERDICTS[_verdict(assessment)]
+        story.append(para(escape(assessment.get("title", "")), styles["SectionHeading"]))
         story.append(Spacer(1, 0.1 * inch))
 
         # Verdict badge
-        verdict_color_map = {
-            "go": (COLORS["successLight"], COLORS["success"]),
-            "caution": (COLORS["warningLight"], COLORS["warning"]),
-            "no-go": (COLORS["dangerLight"], COLORS["danger"]),
-        }
-
-        bg_color, text_color = verdict_color_map[assessment["verdict"]]
-
-        verdict_label_text = {
-            "go": "GO - Approved",
-            "caution": "CAUTION - Review Required",
-            "no-go": "NO-GO - Critical Issues",
-        }
-
-        badge_para = Paragraph(
-            f"<font size='12' color='#{verdict_label_text[assessment['verdict']]}'><b>{assessment['icon']} {verdict_label_text[assessment['verdict']]}</b></font>",
+        badge_para = para(
+            f"<font size='12' color='{_hex(v['text'])}'><b>{v['icon']} {v['heading']}</b></font>",
             styles["VerdictLabel"],
         )
-
         story.append(badge_para)
         story.append(Spacer(1, 0.08 * inch))
 
         # Findings
-        story.append(Paragraph("<b>Key Findings:</b>", styles["SubsectionHeading"]))
-
-        for finding in assessment["findings"]:
-            finding_para = Paragraph(f"• {finding}", styles["BodyText"])
-            story.append(finding_para)
-
-        story.append(Spacer(1, 0.1 * inch))
+        findings = assessment.get("findings") or []
+        if findings:
+            story.append(para("<b>Key Findings:</b>", styles["SubsectionHeading"]))
+            for finding in findings:
+                story.append(para(f"• {escape(finding)}", styles["BodyText"]))
+            story.append(Spacer(1, 0.1 * inch))
 
         # Recommendation
-        story.append(Paragraph("<b>Recommendation:</b>", styles["SubsectionHeading"]))
-        rec_para = Paragraph(assessment["recommendation"], styles["BodyText"])
-        story.append(rec_para)
+        if assessment.get("recommendation"):
+            story.append(para("<b>Recommendation:</b>", styles["SubsectionHeading"]))
+            story.append(para(escape(assessment["recommendation"]), styles["BodyText"]))
 
         story.append(Spacer(1, 0.25 * inch))
 
-        if idx < len(risk_assessments) - 1:
+        if idx < len(assessments) - 1:
             story.append(PageBreak())
 
-    story.append(PageBreak())
+    if assessments:
+        story.append(PageBreak())
 
-    # ========================================================================
-    # COMPLIANCE CHECKLIST
-    # ========================================================================
 
-    story.append(Paragraph("Compliance Checklist", styles["SectionHeading"]))
-    story.append(Spacer(1, 0.15 * inch))
+def _compliance_checklist(story, audit, styles):
+    checklist = audit.get("checklist") or []
+    if not checklist:
+        return
 
-    checklist_items = [
-        ("Relationship documentation", True),
-        ("Financial documentation", True),
-        ("Police certificates", False),
-        ("Medical examination", False),
-        ("Proof of identity", True),
-        ("Proof of residence", True),
-        ("References (3 required)", False),
-        ("Statutory declaration", True),
-        ("Insurance/health coverage", False),
-        ("Background check authorization", True),
-    ]
+    story.append(para("Compliance Checklist", styles["SectionHeading"]))
+    story.append(Spacer(1, 0.15 * inch))
 
     checklist_data = [["Item", "Status"]]
-
-    for item, status in checklist_items:
-        status_text = "✓ Received" if status else "✗ Missing"
-        checklist_data.append([item, status_text])
+    row_styles = []
+    for row, entry in enumerate(checklist, 1):
+        if isinstance(entry, dict):
+            item, received = entry.get("item", ""), entry.get("received")
+        else:
+            item, received = entry
+        checklist_data.append(
+            [_cell(item, styles["TableCell"]), "✓ Received" if received else "✗ Missing"]
+        )
+        v = VERDICTS["go" if received else "no-go"]
+        row_styles.append(("BACKGROUND", (1, row), (1, row), v["bg"]))
+        row_styles.append(("TEXTCOLOR", (1, row), (1, row), v["text"]))
 
     checklist_table = Table(checklist_data, colWidths=[4 * inch, 1.5 * inch])
-
-    style_list = [
-        ("BACKGROUND", (0, 0), (-1, 0), COLORS["primary"]),
-        ("TEXTCOLOR", (0, 0), (-1, 0), colors.white),
-        ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
-        ("FONTSIZE", (0, 0), (-1, -1), 10),
-        ("GRID", (0, 0), (-1, -1), 1, COLORS["secondary"]),
-        ("PADDING", (0, 0), (-1, -1), 8),
-        ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
-    ]
-
-    # Color-code status column
-    for i in range(1, len(checklist_items) + 1):
-        if checklist_items[i - 1][1]:  # Status is True (received)
-            style_list.append(("BACKGROUND", (1, i), (1, i), COLORS["successLight"]))
-            style_list.append(("TEXTCOLOR", (1, i), (1, i), COLORS["success"]))
-        else:  # Status is False (missing)
-            style_list.append(("BACKGROUND", (1, i), (1, i), COLORS["dangerLight"]))
-            style_list.append(("TEXTCOLOR", (1, i), (1, i), COLORS["danger"]))
-
-        style_list.append(("FONTNAME", (1, i), (1, i), "Helvetica-Bold"))
-
-    checklist_table.setStyle(TableStyle(style_list))
+    checklist_table.setStyle(CHECKLIST_TABLE_STYLE)
+    checklist_table.setStyle(row_styles)
     story.append(checklist_table)
 
     story.append(Spacer(1, 0.3 * inch))
 
-    # Recommendation summary
-    story.append(Paragraph("Final Recommendation", styles["SectionHeading"]))
+
+def _final_recommendation(story, audit, styles):
+    recommendation = audit.get("recommendation")
+    if not recommendation:
+        return
+    if isinstance(recommendation, str):
+        body = escape(recommendation)
+    else:
+        parts = []
+        if recommendation.get("status"):
+            parts.append(f"<b>Status:</b> {escape(recommendation['status'])}")
+        actions = recommendation.get("actions") or []
+        if actions:
+            steps = "<br/>".join(
+                f"{n}. {escape(action)}" for n, action in enumerate(actions, 1)
+            )
+            parts.append(f"<b>Required Actions:</b><br/>{steps}")
+        if recommendation.get("timeline"):
+            parts.append(f"<b>Timeline:</b> {escape(recommendation['timeline'])}")
+        if recommendation.get("contact"):
+            parts.append(f"<b>Contact:</b> {escape(recommendation['contact'])}")
+        body = "<br/><br/>".join(parts)
+
+    story.append(para("Final Recommendation", styles["SectionHeading"]))
     story.append(Spacer(1, 0.15 * inch))
+    story.append(para(body, styles["BodyText"]))
 
-    final_rec = Paragraph(
-        """
-        <b>Status:</b> Conditional Approval Pending Documentation<br/><br/>
-        
-        <b>Required Actions:</b><br/>
-        1. Obtain and submit all missing documents within 30 days<br/>
-        2. Schedule and complete medical examination at approved panel physician<br/>
-        3. Obtain certified police certificates from all prior residence countries<br/>
-        4. Provide employment verification for recent job change (minimum 2 months post-hire)<br/>
-        5. Complete missing personal references<br/><br/>
-        
-        <b>Timeline:</b> Upon receipt of all required documentation and medical results, 
-        final decision can typically be rendered within 10-15 business days.<br/><br/>
-        
-        <b>Contact:</b> Applicant should respond to this notice of deficiency within the specified timeframe. 
-        Failure to provide required documentation may result in application rejection.
-        """,
-        styles["BodyText"],
-    )
 
-    story.append(final_rec)
+def build_story(audit, styles=None, date=None):
+    """Return the flowables for audit (see SAMPLE_AUDIT for its shape)."""
+    styles = styles or report_styles()
+    date = date or audit.get("date") or datetime.now().strftime("%B %d, %Y")
+    story = []
+    _cover(story, audit, styles, date)
+    _executive_summary(story, audit, styles)
+    _risk_assessments(story, audit, styles)
+    _compliance_checklist(story, audit, styles)
+    _final_recommendation(story, audit, styles)
+    return story
+
 
-    # ========================================================================
-    # BUILD DOCUMENT
-    # ========================================================================
+def render_report(audit, output_file, styles=None):
+    """
+    Render one audit dict to output_file (a path or file object) and
+    return the number of pages written.
+    """
+    date = audit.get("date") or datetime.now().strftime("%B %d, %Y")
+    story = build_story(audit, styles, date)
 
-    # Create the PDF
-    template = AuditPageTemplate(story, "Immigration Audit Report", case_ref)
+    doc = SimpleDocTemplate(
+        output_file,
+        pagesize=letter,
+        rightMargin=0.75 * inch,
+        leftMargin=0.75 * inch,
+        topMargin=0.75 * inch + 0.5 * inch,  # Account for header
+        bottomMargin=0.75 * inch + 0.45 * inch,  # Account for footer
+    )
+    template = AuditPageTemplate(
+        story, "Immigration Audit Report", str(audit.get("case_ref", "")), date
+    )
     doc.build(
         story, onFirstPage=template.header_footer, onLaterPages=template.header_footer
     )
+    return doc.page
 
+
+def generate_audit_report(
+    output_file,
+    case_name="Immigration Case Audit Report",
+    case_ref="CASE-2026-001",
+    subtitle="Spousal Sponsorship Application Review",
+):
+    """Generate the sample report (SAMPLE_AUDIT) under the given case details."""
+    audit = dict(SAMPLE_AUDIT, case_name=case_name, case_ref=case_ref, subtitle=subtitle)
+    render_report(audit, output_file)
     return output_file
 
 
+def output_name(audit, index=0):
+    """File name for audit in batch mode: its "output", else its case_ref."""
+    name = audit.get("output") or audit.get("case_ref") or f"audit-{index + 1}"
+    name = re.sub(r"[^\w.-]+", "_", str(name)).strip("._")
+    name = name or f"audit-{index + 1}"
+    return name if name.lower().endswith(".pdf") else f"{name}.pdf"
+
+
+def render_file(index, audit, output_file, styles=None, optimize=True):
+    """
+    Render audit to output_file and return its batch record, with page
+    count, size and render time. The PDF is written to a temporary name
+    and renamed into place, so a failed render never leaves a partial
+    file. With optimize it goes through optimize_pdf first; the record
+    then also has bytes_before, or, if pypdf is missing or the pass
+    fails, optimize_error and the unoptimised file.
+    """
+    record = {"index": index, "case_ref": audit.get("case_ref"), "output": output_file}
+    tmp = f"{output_file}.{os.getpid()}.tmp"
+    start = time.perf_counter()
+    try:
+        record["pages"] = render_report(audit, tmp, styles)
+        if optimize:
+            result, warning = optimize_in_place(tmp)
+            if warning:
+                record["optimize_error"] = warning
+            else:
+                record["bytes_before"] = result.before
+                if result.full_fonts:
+                    record["full_fonts"] = result.full_fonts
+        record["bytes"] = os.path.getsize(tmp)
+        os.replace(tmp, output_file)
+        record["ok"] = True
+    except Exception as e:
+        record.update(ok=False, error=f"{type(e).__name__}: {e}")
+        if os.path.exists(tmp):
+            os.remove(tmp)
+    record["elapsed_ms"] = round((time.perf_counter() - start) * 1000, 3)
+    return record
+
+
+def _jobs(audits, output_dir):
+    """Yield (index, audit, output_file) per audit, or a failed record."""
+    used = set()
+    for index, audit in enumerate(audits):
+        if not isinstance(audit, dict):
+            error = f"audit must be a JSON object, not {type(audit).__name__}"
+            yield {"index": index, "ok": False, "error": error}
+            continue
+        name = stem = output_name(audit, index)[:-4]
+        n = 1
+        while name in used:
+            n += 1
+            name = f"{stem}-{n}"
+        used.add(name)
+        yield index, audit, os.path.join(output_dir, f"{name}.pdf")
+
+
+def _init_worker(font_search_path):
+    """Pool initializer: register the CJK font and build the styles up front."""
+    global FONT_SEARCH_PATH
+    FONT_SEARCH_PATH = font_search_path
+    cjk_font()
+    report_styles()
+
+
+def _render_job(job, optimize=True):
+    # _jobs hands over audits that failed validation as finished records.
+    return job if isinstance(job, dict) else render_file(*job, optimize=optimize)
+
+
+def _crashed(job, error):
+    index, audit, output_file = job
+    return {
+        "index": index,
+        "case_ref": audit.get("case_ref"),
+        "output": output_file,
+        "ok": False,
+        "error": error,
+    }
+
+
+def generate_audit_reports(
+    audits, output_dir, workers=None, max_pending=None, optimize=True
+):
+    """
+    Render every audit in audits (any iterable, consumed lazily) into
+    output_dir and yield one record per audit as its PDF lands on disk:
+    index, case_ref, output, ok, pages and elapsed_ms (or error).
+
+    Reports are spread over a pool of workers processes (default: one
+    per core), each of which registers the CJK font and builds the
+    stylesheet once when it starts; at most max_pending reports (default
+    twice the workers) are in flight, and records arrive in completion
+    order. workers=1 renders in this process instead. A bad audit fails
+    only its own record; after a worker crash the reports in flight are
+    retried one by one, so only a report that crashes a worker by
+    itself fails.
+    optimize runs each PDF through optimize_pdf (see render_file).
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    workers = workers or os.cpu_count() or 1
+    jobs = _jobs(audits, output_dir)
+    if workers > 1:
+        yield from pool_map(
+            partial(_render_job, optimize=optimize),
+            jobs,
+            workers,
+            max_pending or workers * 2,
+            _crashed,
+            _init_worker,
+            (FONT_SEARCH_PATH,),
+        )
+        return
+    styles = report_styles()
+    for job in jobs:
+        yield job if isinstance(job, dict) else render_file(*job, styles, optimize)
+
+
 # ============================================================================
 # MAIN EXECUTION
 # ============================================================================
 
 if __name__ == "__main__":
-    import sys
-
-    output_path = (
-        sys.argv[1]
-        if len(sys.argv) > 1
-        else "/Users/jacky/immi-os/sample-audit-report.pdf"
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Generate audit report PDFs")
+    parser.add_argument(
+        "output",
+        nargs="?",
+        help="PDF to write for a single report "
+        "(default: the sample report at /Users/jacky/immi-os/sample-audit-report.pdf)",
+    )
+    parser.add_argument(
+        "--input",
+        help="audit result(s) as JSON (an object or a list) or JSON Lines (.jsonl)",
+    )
+    parser.add_argument(
+        "--output-dir", help="render every audit in --input into this directory"
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="render processes for --output-dir (default: one per core)",
+    )
+    parser.add_argument("--max-pending", type=int, default=None)
+    parser.add_argument(
+        "--no-optimize",
+        dest="optimize",
+        action="store_false",
+        help="skip the size optimisation pass (optimize_pdf.py)",
+    )
+    parser.add_argument(
+        "--font-path",
+        action="append",
+        default=[],
+        help="CJK font file or directory to try first (repeatable)",
+    )
+    args = parser.parse_args()
+    FONT_SEARCH_PATH = font_search_path(args.font_path)
+
+    if args.input and (args.output_dir or not args.output):
+        # Batch: pre-warmed workers, one stylesheet and font load each.
+        total = failed = pages = size = size_before = 0
+        start = time.perf_counter()
+        for record in generate_audit_reports(
+            iter_audits(args.input),
+            args.output_dir or ".",
+            args.workers,
+            args.max_pending,
+            args.optimize,
+        ):
+            total += 1
+            if record["ok"]:
+                pages += record["pages"]
+                size += record["bytes"]
+                size_before += record.get("bytes_before", record["bytes"])
+                print(
+                    f"✓ {record['output']} ({record['pages']} pages, "
+                    f"{record['bytes'] / 1024:.1f}KB, {record['elapsed_ms']:.0f} ms)"
+                )
+                if record.get("full_fonts"):
+                    print(f"  ⚠ fonts not subset: {', '.join(record['full_fonts'])}")
+                if record.get("optimize_error"):
+                    print(f"  ⚠ not optimised: {record['optimize_error']}")
+            else:
+                failed += 1
+                print(f"✗ audit {record['index'] + 1}: {record['error']}")
+        elapsed = time.perf_counter() - start
+        print(
+            f"Rendered {total - failed} of {total} reports ({pages} pages) "
+            f"in {elapsed:.2f}s; {size_before / 1024:.1f}KB -> {size / 1024:.1f}KB"
+        )
+        sys.exit(1 if failed else 0)
+
+    if args.input:
+        audits = list(iter_audits(args.input))
+        if len(audits) != 1:
+            parser.error(f"{args.input} holds {len(audits)} audits; use --output-dir")
+        audit = audits[0]
+    else:
+        audit = SAMPLE_AUDIT
+    output_path = args.output or "/Users/jacky/immi-os/sample-audit-report.pdf"
 
     print(f"Generating Judicial Authority Theme Audit Report...")
     print(f"Output: {output_path}")
 
-    result = generate_audit_report(
-        output_path,
-        case_name="Immigration Case Audit Report",
-        case_ref="CASE-2026-001",
-        subtitle="Spousal Sponsorship Application Review",
-    )
+    render_report(audit, output_path)
 
-    print(f"✓ PDF generated successfully: {result}")
+    print(f"✓ PDF generated successfully: {output_path}")
+    if args.optimize:
+        result, warning = optimize_in_place(output_path)
+        print(f"  ⚠ Not optimised: {warning}" if warning else f"  Optimised: {result}")
     print(f"\nTheme Applied: Judicial Authority")
     print(f"  - Primary Color: Navy (#0A192F)")
     print(f"  - Accent Color: Gold (#C5A059)")
@@ -695,6 +1245,9 @@ if __name__ == "__main__":
     print(f"\nDocument Sections:")
     print(f"  1. Cover Page - Professional introduction")
     print(f"  2. Executive Summary - Overall assessment with verdict")
-    print(f"  3. Risk Assessments - 3 detailed evaluations with color-coded verdicts")
+    print(
+        f"  3. Risk Assessments - {len(audit.get('assessments') or [])} detailed "
+        f"evaluations with color-coded verdicts"
+    )
     print(f"  4. Compliance Checklist - Document status tracking")
     print(f"  5. Final Recommendation - Action items and timeline")
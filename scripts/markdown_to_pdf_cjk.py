@@ -6,8 +6,10 @@ from markdown2 import markdown
 from xhtml2pdf import pisa
 from io import BytesIO
 
-def markdown_to_pdf(input_md, output_pdf):
-    """Convert markdown to PDF with CJK (Chinese) font support"""
+from optimize_pdf import optimize_in_place
+
+def markdown_to_pdf(input_md, output_pdf, optimize=True):
+    """Convert markdown to PDF with CJK (Chinese) font support, then optimize_pdf it"""
     
     with open(input_md, 'r', encoding='utf-8') as f:
         md_content = f.read()
@@ -108,6 +110,9 @@ def markdown_to_pdf(input_md, output_pdf):
         pisa.CreatePDF(html_with_css, f, encoding='UTF-8')
     
     print(f"✓ PDF generated: {output_pdf}")
+    if optimize:
+        result, warning = optimize_in_place(output_pdf)
+        print(f"⚠ Not optimised: {warning}" if warning else f"✓ Optimised: {result}")
     return output_pdf
 
 if __name__ == '__main__':
@@ -24,6 +24,8 @@ import json
 import subprocess
 from pathlib import Path
 
+from optimize_pdf import optimize_in_place
+
 # Import the comprehensive markdown parser from document-generator skill
 SKILL_SCRIPTS_PATH = (
     Path.home() / ".claude" / "skills" / "document-generator" / "scripts"
@@ -60,8 +62,10 @@ except ImportError:
         return sections
 
 
-def markdown_to_pdf(input_md, output_pdf, title=None, theme=None, language=None):
-    """Convert Markdown file to PDF."""
+def markdown_to_pdf(
+    input_md, output_pdf, title=None, theme=None, language=None, optimize=True
+):
+    """Convert Markdown file to PDF, then shrink it with optimize_pdf if optimize."""
     with open(input_md, "r", encoding="utf-8") as f:
         md_content = f.read()
 
@@ -132,6 +136,9 @@ def markdown_to_pdf(input_md, output_pdf, title=None, theme=None, language=None)
     print(result.stdout)
 
     if Path(output_pdf).exists():
+        if optimize:
+            result, warning = optimize_in_place(output_pdf)
+            print(f"⚠ Not optimised: {warning}" if warning else f"✓ Optimised: {result}")
         size_kb = Path(output_pdf).stat().st_size / 1024
         print(f"✓ PDF generated: {output_pdf} ({size_kb:.1f}KB) [language={language}]")
         return output_pdf
@@ -155,6 +162,12 @@ if __name__ == "__main__":
         default="auto",
         help="Language for font selection: en (English), zh (Chinese), auto (detect)",
     )
+    parser.add_argument(
+        "--no-optimize",
+        dest="optimize",
+        action="store_false",
+        help="skip the size optimisation pass (optimize_pdf.py)",
+    )
 
     args = parser.parse_args()
 
@@ -164,6 +177,10 @@ if __name__ == "__main__":
 
     language = args.language if args.language != "auto" else None
     result = markdown_to_pdf(
-        args.input_md, args.output_pdf, args.title, language=language
+        args.input_md,
+        args.output_pdf,
+        args.title,
+        language=language,
+        optimize=args.optimize,
     )
     sys.exit(0 if result else 1)
@@ -1,176 +1,251 @@
 #!/usr/bin/env python3
+"""
+Markdown to PDF with CJK font support, rendered in-process by WeasyPrint.
+
+One FontConfiguration and the pre-parsed report stylesheet are shared by
+every document converted in the process, and the HTML is rendered from
+memory, so a batch pays for font discovery and CSS parsing only once.
+
+Usage:
+    python3 markdown_to_pdf_weasyprint.py <input.md> <output.pdf>
+    python3 markdown_to_pdf_weasyprint.py <a.md> <b.md> ... [--output-dir DIR]
+"""
 import sys
-import subprocess
 from pathlib import Path
 from markdown2 import markdown
+from weasyprint import CSS, HTML
+
+try:
+    from weasyprint.text.fonts import FontConfiguration
+except ImportError:  # WeasyPrint < 53
+    from weasyprint.fonts import FontConfiguration
+
+from optimize_pdf import optimize_in_place
+
+STYLESHEET = """
+body {
+    font-family: 'STHeiti', 'PingFang SC', 'Songti SC', 'Arial', sans-serif;
+    line-height: 1.6;
+    color: #1a1a1a;
+    background: #FDFBF7;
+    margin: 0.75in;
+    font-size: 11pt;
+}
+
+h1, h2, h3, h4 {
+    font-family: 'STHeiti', 'PingFang SC', Georgia, serif;
+    color: #0A192F;
+    margin-top: 1em;
+    margin-bottom: 0.5em;
+    font-weight: bold;
+}
+
+h1 { 
+    font-size: 28pt; 
+    text-align: center;
+    page-break-after: avoid;
+}
+h2 { 
+    font-size: 18pt;
+    border-bottom: 2px solid #C5A059;
+    padding-bottom: 0.5em;
+    page-break-after: avoid;
+}
+h3 { 
+    font-size: 14pt;
+    page-break-after: avoid;
+}
+h4 { 
+    font-size: 12pt;
+    page-break-after: avoid;
+}
+
+p { 
+    margin: 0.5em 0;
+    text-align: justify;
+}
+
+table {
+    width: 100%;
+    border-collapse: collapse;
+    margin: 1em 0;
+    page-break-inside: avoid;
+}
+
+th, td {
+    border: 1px solid #64748B;
+    padding: 8px;
+    text-align: left;
+}
+
+th {
+    background: #0A192F;
+    color: white;
+    font-weight: bold;
+}
+
+tr:nth-child(even) {
+    background: #F7F5F0;
+}
+
+.verdict {
+    padding: 1em;
+    border-left: 4px solid #C5A059;
+    background: #FEF3C7;
+    margin: 1em 0;
+    page-break-inside: avoid;
+}
+
+.success { 
+    border-left-color: #047857; 
+    background: #ECFDF5; 
+}
+
+.warning { 
+    border-left-color: #B45309; 
+    background: #FEF3C7; 
+}
+
+.danger { 
+    border-left-color: #BE123C; 
+    background: #FFE4E6; 
+}
+
+ul, ol { 
+    margin: 0.5em 0; 
+    padding-left: 2em;
+}
+li { 
+    margin: 0.25em 0;
+}
+
+code {
+    font-family: 'Monaco', 'Courier New', monospace;
+    background: #F7F5F0;
+    padding: 0.2em 0.4em;
+    border-radius: 3px;
+    font-size: 0.9em;
+}
+
+pre {
+    background: #F7F5F0;
+    padding: 1em;
+    border-radius: 5px;
+    overflow: auto;
+    font-family: 'Monaco', 'Courier New', monospace;
+    page-break-inside: avoid;
+}
+"""
 
-def markdown_to_pdf(input_md, output_pdf):
-    """Convert markdown to PDF with proper CJK font support using WeasyPrint CLI"""
+_renderer = None
+
+
+def renderer():
+    """Return the (FontConfiguration, CSS) pair shared by every conversion"""
+    global _renderer
+    if _renderer is None:
+        font_config = FontConfiguration()
+        _renderer = (font_config, CSS(string=STYLESHEET, font_config=font_config))
+    return _renderer
+
+
+def markdown_to_pdf(input_md, output_pdf, optimize=True):
+    """Convert markdown to PDF with proper CJK font support using WeasyPrint, then optimize_pdf it"""
     
     with open(input_md, 'r', encoding='utf-8') as f:
         md_content = f.read()
     
     html_content = markdown(md_content)
     
-    html_with_css = f"""
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <meta charset="UTF-8">
-        <style>
-            body {{
-                font-family: 'STHeiti', 'PingFang SC', 'Songti SC', 'Arial', sans-serif;
-                line-height: 1.6;
-                color: #1a1a1a;
-                background: #FDFBF7;
-                margin: 0.75in;
-                font-size: 11pt;
-            }}
-            
-            h1, h2, h3, h4 {{
-                font-family: 'STHeiti', 'PingFang SC', Georgia, serif;
-                color: #0A192F;
-                margin-top: 1em;
-                margin-bottom: 0.5em;
-                font-weight: bold;
-            }}
-            
-            h1 {{ 
-                font-size: 28pt; 
-                text-align: center;
-                page-break-after: avoid;
-            }}
-            h2 {{ 
-                font-size: 18pt;
-                border-bottom: 2px solid #C5A059;
-                padding-bottom: 0.5em;
-                page-break-after: avoid;
-            }}
-            h3 {{ 
-                font-size: 14pt;
-                page-break-after: avoid;
-            }}
-            h4 {{ 
-                font-size: 12pt;
-                page-break-after: avoid;
-            }}
-            
-            p {{ 
-                margin: 0.5em 0;
-                text-align: justify;
-            }}
-            
-            table {{
-                width: 100%;
-                border-collapse: collapse;
-                margin: 1em 0;
-                page-break-inside: avoid;
-            }}
-            
-            th, td {{
-                border: 1px solid #64748B;
-                padding: 8px;
-                text-align: left;
-            }}
-            
-            th {{
-                background: #0A192F;
-                color: white;
-                font-weight: bold;
-            }}
-            
-            tr:nth-child(even) {{
-                background: #F7F5F0;
-            }}
-            
-            .verdict {{
-                padding: 1em;
-                border-left: 4px solid #C5A059;
-                background: #FEF3C7;
-                margin: 1em 0;
-                page-break-inside: avoid;
-            }}
-            
-            .success {{ 
-                border-left-color: #047857; 
-                background: #ECFDF5; 
-            }}
-            
-            .warning {{ 
-                border-left-color: #B45309; 
-                background: #FEF3C7; 
-            }}
-            
-            .danger {{ 
-                border-left-color: #BE123C; 
-                background: #FFE4E6; 
-            }}
-            
-            ul, ol {{ 
-                margin: 0.5em 0; 
-                padding-left: 2em;
-            }}
-            li {{ 
-                margin: 0.25em 0;
-            }}
-            
-            code {{
-                font-family: 'Monaco', 'Courier New', monospace;
-                background: #F7F5F0;
-                padding: 0.2em 0.4em;
-                border-radius: 3px;
-                font-size: 0.9em;
-            }}
-            
-            pre {{
-                background: #F7F5F0;
-                padding: 1em;
-                border-radius: 5px;
-                overflow: auto;
-                font-family: 'Monaco', 'Courier New', monospace;
-                page-break-inside: avoid;
-            }}
-        </style>
-    </head>
-    <body>
-        {html_content}
-    </body>
-    </html>
-    """
-    
-    temp_html = Path(output_pdf).with_suffix('.html')
-    with open(temp_html, 'w', encoding='utf-8') as f:
-        f.write(html_with_css)
-    
-    result = subprocess.run(
-        ['weasyprint', str(temp_html), output_pdf],
-        capture_output=True,
-        text=True
-    )
-    
-    temp_html.unlink()
+    html = f"""<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="UTF-8">
+</head>
+<body>
+{html_content}
+</body>
+</html>
+"""
     
-    if result.returncode != 0:
-        print(f"Error: {result.stderr}")
-        return None
+    # Relative links (images) resolve against the markdown file's folder.
+    font_config, stylesheet = renderer()
+    document = HTML(string=html, base_url=str(Path(input_md).resolve().parent))
+    document.write_pdf(output_pdf, stylesheets=[stylesheet], font_config=font_config)
     
     print(f"✓ PDF generated successfully: {output_pdf}")
+    if optimize:
+        result, warning = optimize_in_place(output_pdf)
+        print(f"⚠ Not optimised: {warning}" if warning else f"✓ Optimised: {result}")
     return output_pdf
 
+
+def markdown_files_to_pdf(inputs, output_dir=None, optimize=True):
+    """
+    Convert every markdown file in inputs in this process, sharing one font
+    configuration and stylesheet. Each PDF is named after its markdown file
+    and written to output_dir (default: beside the markdown file); names
+    that would clash (a/report.md and b/report.md) get a -2, -3, ...
+    suffix. Returns {input: output path, or None if that file failed}.
+    """
+    if output_dir:
+        Path(output_dir).mkdir(parents=True, exist_ok=True)
+    results = {}
+    used = set()
+    for input_md in inputs:
+        folder = Path(output_dir) if output_dir else Path(input_md).parent
+        stem = name = Path(input_md).stem
+        n = 1
+        while (folder / name).resolve() in used:
+            n += 1
+            name = f'{stem}-{n}'
+        used.add((folder / name).resolve())
+        output_pdf = str(folder / (name + '.pdf'))
+        try:
+            results[input_md] = markdown_to_pdf(input_md, output_pdf, optimize)
+        except Exception as e:
+            print(f"Error: {input_md}: {e}")
+            results[input_md] = None
+    return results
+
+
 if __name__ == '__main__':
-    if len(sys.argv) < 3:
-        print("Usage: python3 markdown_to_pdf_weasyprint.py <input.md> <output.pdf>")
-        sys.exit(1)
+    import argparse
     
-    input_file = sys.argv[1]
-    output_file = sys.argv[2]
+    parser = argparse.ArgumentParser(
+        description="Convert Markdown to PDF using WeasyPrint with CJK support"
+    )
+    parser.add_argument(
+        'inputs', nargs='+', help="Markdown files, or <input.md> <output.pdf>"
+    )
+    parser.add_argument('--output-dir', help="Write every PDF into this directory")
+    parser.add_argument(
+        '--no-optimize',
+        dest='optimize',
+        action='store_false',
+        help="skip the size optimisation pass (optimize_pdf.py)",
+    )
+    args = parser.parse_args()
     
-    if not Path(input_file).exists():
-        print(f"Error: {input_file} not found")
-        sys.exit(1)
+    single = (
+        not args.output_dir
+        and len(args.inputs) == 2
+        and args.inputs[1].lower().endswith('.pdf')
+    )
+    sources = args.inputs[:1] if single else args.inputs
+    for input_file in sources:
+        if not Path(input_file).exists():
+            print(f"Error: {input_file} not found")
+            sys.exit(1)
     
-    try:
-        markdown_to_pdf(input_file, output_file)
-    except Exception as e:
-        print(f"Error: {e}")
-        sys.exit(1)
+    if single:
+        try:
+            markdown_to_pdf(args.inputs[0], args.inputs[1], args.optimize)
+        except Exception as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+    else:
+        results = markdown_files_to_pdf(args.inputs, args.output_dir, args.optimize)
+        failed = sum(output is None for output in results.values())
+        print(f"Converted {len(results) - failed} of {len(results)} files")
+        sys.exit(1 if failed else 0)
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+PDF output optimisation for generated reports.
+
+One pass over a finished PDF, using pypdf:
+
+- page content streams are re-deflated at level 9, and any other
+  unfiltered stream is deflated;
+- identical objects (fonts, images, resource dictionaries repeated
+  across pages or documents merged together) are stored once, and
+  unreferenced ones dropped;
+- every non-stream object is packed into compressed object streams and
+  the xref table is written as a compressed xref stream (PDF 1.5).
+
+Embedded fonts are checked on the way through: ReportLab, xhtml2pdf and
+WeasyPrint all subset by default (subset fonts are named "ABCDEF+Name"),
+and any fully embedded font is listed in the result so an oversized CJK
+face cannot slip through unnoticed.
+
+Usage:
+    python3 optimize_pdf.py input.pdf [output.pdf]
+"""
+
+import io
+import os
+import sys
+import zlib
+from dataclasses import dataclass, field
+
+try:
+    from pypdf import PdfReader, PdfWriter
+    from pypdf.generic import StreamObject
+except ImportError:  # optimize_in_place reports it; optimize_pdf needs pypdf
+    PdfReader = PdfWriter = StreamObject = None
+
+# Non-stream objects per object stream.
+OBJECTS_PER_STREAM = 100
+
+
+@dataclass
+class OptimizeResult:
+    """Sizes before and after optimize_pdf, and what it found."""
+
+    before: int
+    after: int
+    packed_objects: int = 0
+    full_fonts: list[str] = field(default_factory=list)
+
+    @property
+    def saved(self):
+        return self.before - self.after
+
+    def __str__(self):
+        percent = 100 * self.saved / self.before if self.before else 0
+        text = f"{self.before / 1024:.1f}KB -> {self.after / 1024:.1f}KB (-{percent:.0f}%)"
+        if self.full_fonts:
+            text += f"; not subset: {', '.join(self.full_fonts)}"
+        return text
+
+
+def _serialize(obj):
+    buffer = io.BytesIO()
+    obj.write_to_stream(buffer)
+    return buffer.getvalue()
+
+
+def _full_font(obj):
+    """FontName of a font descriptor whose embedded font is not a subset."""
+    if obj.get("/Type") != "/FontDescriptor":
+        return None
+    if not any(key in obj for key in ("/FontFile", "/FontFile2", "/FontFile3")):
+        return None
+    name = str(obj.get("/FontName", ""))[1:]
+    tag, plus, _ = name.partition("+")
+    return None if plus and len(tag) == 6 and tag.isupper() else name
+
+
+def _pack(reader, out):
+    """
+    Write reader's objects to out with non-stream objects in object
+    streams and a cross-reference stream. Returns (packed, full_fonts).
+    """
+    out.write(b"%PDF-1.7\n%\xe2\xe3\xcf\xd3\n")
+    entries = {}  # num -> (type, field2, field3), as in an xref stream
+    loose = []
+    full_fonts = []
+    numbers = sorted(set(reader.xref.get(0, {})) | set(reader.xref_objStm))
+    for num in numbers:
+        obj = reader.get_object(num)
+        if obj is None:
+            continue
+        if isinstance(obj, StreamObject):
+            if "/Filter" not in obj and obj.get("/Type") != "/Metadata":
+                obj = obj.flate_encode(level=9)
+            entries[num] = (1, out.tell(), 0)
+            out.write(b"%d 0 obj\n%s\nendobj\n" % (num, _serialize(obj)))
+            continue
+        name = _full_font(obj) if hasattr(obj, "get") else None
+        if name:
+            full_fonts.append(name)
+        loose.append((num, _serialize(obj)))
+
+    next_num = (numbers[-1] if numbers else 0) + 1
+    for start in range(0, len(loose), OBJECTS_PER_STREAM):
+        chunk = loose[start : start + OBJECTS_PER_STREAM]
+        offsets, body = [], bytearray()
+        for index, (num, data) in enumerate(chunk):
+            offsets.append(b"%d %d" % (num, len(body)))
+            body += data + b"\n"
+            entries[num] = (2, next_num, index)
+        header = b" ".join(offsets) + b"\n"
+        data = zlib.compress(header + bytes(body), 9)
+        entries[next_num] = (1, out.tell(), 0)
+        out.write(
+            b"%d 0 obj\n<< /Type /ObjStm /N %d /First %d /Filter /FlateDecode "
+            b"/Length %d >>\nstream\n%s\nendstream\nendobj\n"
+            % (next_num, len(chunk), len(header), len(data), data)
+        )
+        next_num += 1
+
+    # The xref stream describes itself too: it is object next_num.
+    xref_num, xref_offset = next_num, out.tell()
+    entries[xref_num] = (1, xref_offset, 0)
+    rows = bytearray()
+    for num in range(xref_num + 1):
+        kind, a, b = entries.get(num, (0, 0, 0xFFFF if num == 0 else 0))
+        rows += kind.to_bytes(1, "big") + a.to_bytes(4, "big") + b.to_bytes(2, "big")
+    data = zlib.compress(bytes(rows), 9)
+    trailer = reader.trailer
+    extra = b"/Root %s" % _serialize(trailer.raw_get("/Root"))
+    if "/Info" in trailer:
+        extra += b" /Info %s" % _serialize(trailer.raw_get("/Info"))
+    if "/ID" in trailer:
+        extra += b" /ID %s" % _serialize(trailer["/ID"])
+    out.write(
+        b"%d 0 obj\n<< /Type /XRef /Size %d /W [1 4 2] %s /Filter /FlateDecode "
+        b"/Length %d >>\nstream\n%s\nendstream\nendobj\nstartxref\n%d\n%%%%EOF\n"
+        % (xref_num, xref_num + 1, extra, len(data), data, xref_offset)
+    )
+    return len(loose), full_fonts
+
+
+def optimize_bytes(data):
+    """Return (optimised bytes, packed object count, full fonts) for PDF data."""
+    writer = PdfWriter(clone_from=io.BytesIO(data))
+    for page in writer.pages:
+        page.compress_content_streams(level=9)
+    writer.compress_identical_objects()
+    merged = io.BytesIO()
+    writer.write(merged)
+    out = io.BytesIO()
+    packed, full_fonts = _pack(PdfReader(merged), out)
+    return out.getvalue(), packed, full_fonts
+
+
+def optimize_pdf(src, dst=None):
+    """
+    Optimise the PDF at src into dst (default: in place) and return an
+    OptimizeResult. The original bytes are kept if the pass would not
+    make the file smaller; dst is replaced atomically either way, and
+    left as it was if the pass raises.
+    """
+    dst = dst or src
+    with open(src, "rb") as f:
+        data = f.read()
+    optimized, packed, full_fonts = optimize_bytes(data)
+    if len(optimized) >= len(data):
+        optimized, packed = data, 0
+    tmp = f"{dst}.{os.getpid()}.tmp"
+    try:
+        with open(tmp, "wb") as f:
+            f.write(optimized)
+        os.replace(tmp, dst)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+    return OptimizeResult(len(data), len(optimized), packed, full_fonts)
+
+
+def optimize_in_place(path):
+    """
+    Optimise a finished PDF in place for a converter that must keep it
+    either way. Returns (OptimizeResult, None), or (None, warning) when
+    pypdf is missing or the pass fails; the file is then left as it was.
+    """
+    if PdfWriter is None:
+        return None, "pypdf is not installed"
+    try:
+        return optimize_pdf(path), None
+    except Exception as e:
+        return None, f"{type(e).__name__}: {e}"
+
+
+if __name__ == "__main__":
+    if len(sys.argv) not in (2, 3):
+        print("Usage: python3 optimize_pdf.py input.pdf [output.pdf]")
+        sys.exit(1)
+    if PdfWriter is None:
+        print("optimize_pdf.py needs pypdf: pip install pypdf")
+        sys.exit(1)
+    result = optimize_pdf(*sys.argv[1:])
+    print(f"✓ {sys.argv[-1]}: {result}")
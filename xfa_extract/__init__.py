@@ -0,0 +1,50 @@
+"""
+XFA form extraction for IRCC PDFs.
+
+    from xfa_extract import extract
+    result = extract("/case/imm1344.pdf")
+    result.field_paths["form1.Page1.PersonalDetails.Name.FamilyName[0]"]
+
+The native "raw" engine needs only the standard library; the "pypdf"
+engine is imported on first use. engine="auto" probes each file and
+routes it to the cheapest adequate engine (see router).
+"""
+
+from .acroform import iter_acroform_fields, merge_fields
+from .api import ENGINES, extract
+from .cache import XfaCache
+from .crypt import EncryptionError
+from .datasets import extract_text_from_xml, parse_data_packet
+from .fields import FieldDiff, FieldMap, diff_fields, iter_field_paths
+from .filters import DecodeLimitError, DecodeLimits
+from .raw import extract_datasets
+from .results import ExtractionResult
+from .router import Router, classify
+from .scanner import find_xfa_data, iter_xfa_candidates
+from .xref import XrefError, XrefResolver, read_xfa_packets
+
+__all__ = [
+    "DecodeLimitError",
+    "DecodeLimits",
+    "ENGINES",
+    "EncryptionError",
+    "ExtractionResult",
+    "FieldDiff",
+    "FieldMap",
+    "Router",
+    "XfaCache",
+    "XrefError",
+    "XrefResolver",
+    "classify",
+    "diff_fields",
+    "extract",
+    "extract_datasets",
+    "extract_text_from_xml",
+    "find_xfa_data",
+    "iter_acroform_fields",
+    "iter_field_paths",
+    "iter_xfa_candidates",
+    "merge_fields",
+    "parse_data_packet",
+    "read_xfa_packets",
+]
@@ -0,0 +1,34 @@
+"""Print extraction results for one or more PDFs as JSON Lines."""
+
+import argparse
+import json
+import sys
+
+from .api import ENGINES, extract
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python3 -m xfa_extract", description=__doc__)
+    parser.add_argument("files", nargs="+")
+    parser.add_argument("--engine", choices=ENGINES, default="raw")
+    parser.add_argument("--include-datasets", action="store_true")
+    parser.add_argument(
+        "--trace", action="store_true", help="add per-stage timings and counters"
+    )
+    parser.add_argument(
+        "--trace-allocations", action="store_true", help="--trace plus tracemalloc"
+    )
+    parser.add_argument("--span-file", help="append OTLP/JSON spans to this file")
+    args = parser.parse_args(argv)
+
+    trace = "allocations" if args.trace_allocations else args.trace
+    failed = 0
+    for path in args.files:
+        result = extract(path, args.engine, trace=trace, span_file=args.span_file)
+        failed += not result.ok
+        print(json.dumps(result.to_dict(args.include_datasets), ensure_ascii=False))
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
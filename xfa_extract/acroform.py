@@ -0,0 +1,133 @@
+"""
+AcroForm widget field extraction and XFA/AcroForm reconciliation.
+
+Forms re-saved by third-party tools often drop or desynchronise the XFA
+datasets while the AcroForm /V values survive. iter_acroform_fields walks
+the /Fields tree iteratively (no recursion limit, cycle-safe) and yields
+fully qualified field names with their values. It works on either the
+native xref objects or pypdf objects: the caller supplies the resolve
+function, which is expected to memoise indirect objects.
+
+For XFA forms the AcroForm names mirror the template SOM with an index
+on every segment (`form1[0].Page1[0].Name[0]`); som_key maps them onto
+the datasets path convention of fields (`form1.Page1.Name[0]`) so both
+sides can be merged and compared in one sorted pass.
+"""
+
+import re
+
+from .xref import Name
+
+_INNER_ZERO_INDEX = re.compile(r"\[0\](?=\.)")
+
+
+def field_text(value, name_type=Name):
+    """Return a field value (/V) as text; names lose their leading slash."""
+    if isinstance(value, bytes):
+        if value.startswith(b"\xfe\xff"):
+            return value[2:].decode("utf-16-be", errors="replace")
+        if value.startswith(b"\xef\xbb\xbf"):
+            return value[3:].decode("utf-8", errors="replace")
+        # PDFDocEncoding matches Latin-1 for everything forms use in practice.
+        return value.decode("latin-1")
+    if isinstance(value, name_type):
+        return value[1:]
+    if isinstance(value, (list, tuple)):
+        return ", ".join(field_text(v, name_type) for v in value)
+    if value is None:
+        return ""
+    return str(value)
+
+
+def iter_acroform_fields(fields, resolve, text=field_text):
+    """
+    Yield (fully qualified name, value) for every terminal field under the
+    /Fields array `fields` that has a non-blank value. Partial names (/T)
+    are joined with dots; /V is inherited from ancestors as the spec allows.
+    Kids without /T are widget annotations of their parent, not fields.
+    """
+    roots = resolve(fields)
+    if not isinstance(roots, list):
+        return
+    stack = [(ref, "", None) for ref in reversed(roots)]
+    seen = set()
+    while stack:
+        ref, parent, inherited = stack.pop()
+        node = resolve(ref)
+        # resolve memoises, so the same object always comes back identical.
+        if not isinstance(node, dict) or id(node) in seen:
+            continue
+        seen.add(id(node))
+
+        partial = node.get("/T")
+        if partial is None:
+            name = parent
+        else:
+            partial = text(resolve(partial))
+            name = f"{parent}.{partial}" if parent else partial
+        value = node.get("/V", inherited)
+
+        kids = resolve(node.get("/Kids"))
+        child_fields = []
+        if isinstance(kids, list):
+            for kid in kids:
+                kid_node = resolve(kid)
+                if isinstance(kid_node, dict) and "/T" in kid_node:
+                    child_fields.append(kid)
+        if child_fields:
+            stack.extend((kid, name, value) for kid in reversed(child_fields))
+        elif name and value is not None:
+            value = text(resolve(value)).strip()
+            if value:
+                yield name, value
+
+
+def som_key(name):
+    """Map a fully qualified AcroForm name onto the datasets path convention."""
+    key = _INNER_ZERO_INDEX.sub("", name)
+    return key if key.endswith("]") else f"{key}[0]"
+
+
+def merge_fields(xfa_paths, acroform_names):
+    """
+    Merge XFA field_paths with AcroForm values in one pass over both sorted
+    key lists. Returns (merged, diff): merged holds every XFA value plus
+    AcroForm values for paths XFA lacks; diff counts matching paths and
+    lists AcroForm-only values and conflicting values.
+    """
+    acroform = {}
+    for name, value in acroform_names.items():
+        acroform[som_key(name)] = value
+    xfa_keys = sorted(xfa_paths)
+    acro_keys = sorted(acroform)
+
+    merged = {}
+    acroform_only = {}
+    conflicts = {}
+    matched = xfa_only = 0
+    i = j = 0
+    while i < len(xfa_keys) or j < len(acro_keys):
+        x = xfa_keys[i] if i < len(xfa_keys) else None
+        a = acro_keys[j] if j < len(acro_keys) else None
+        if a is None or (x is not None and x < a):
+            merged[x] = xfa_paths[x]
+            xfa_only += 1
+            i += 1
+        elif x is None or a < x:
+            merged[a] = acroform_only[a] = acroform[a]
+            j += 1
+        else:
+            merged[x] = xfa_paths[x]
+            if xfa_paths[x] == acroform[a]:
+                matched += 1
+            else:
+                conflicts[x] = {"xfa": xfa_paths[x], "acroform": acroform[a]}
+            i += 1
+            j += 1
+
+    return merged, {
+        "matched": matched,
+        "xfa_only": xfa_only,
+        "acroform_only": acroform_only,
+        "conflicts": conflicts,
+    }
@@ -0,0 +1,116 @@
+"""Single-document extraction entry point shared by the CLI, batch and worker."""
+
+import time
+from typing import Optional, Union
+
+from . import instrument, raw
+from .cache import XfaCache
+from .filters import DecodeLimits, decode_budget
+from .incremental import extract_incremental
+from .results import ExtractionResult
+
+# "auto" probes the file and picks one of the others (see router).
+ENGINES = ("auto", "raw", "acroform", "form", "pypdf", "pypdf_form", "text", "none")
+
+_RAW_ENGINES = {
+    "raw": raw.extract_datasets,
+    "acroform": raw.extract_acroform,
+    "form": raw.extract_form,
+}
+_PYPDF_ENGINES = {
+    "pypdf": "extract_datasets",
+    "pypdf_form": "extract_form",
+    "text": "extract_text",
+}
+
+
+def _skip(file_path):
+    return {
+        "candidates": 0,
+        "datasets": None,
+        "fields": {},
+        "field_paths": {},
+        "source": None,
+    }
+
+
+def _engine(name):
+    if name in _RAW_ENGINES:
+        return _RAW_ENGINES[name]
+    if name == "none":
+        return _skip
+    if name in _PYPDF_ENGINES:
+        # pypdf is optional and slow to import; only load it when asked for.
+        from . import pypdf_engine
+
+        return getattr(pypdf_engine, _PYPDF_ENGINES[name])
+    raise ValueError(f"Unknown engine: {name}")
+
+
+def extract(
+    file_path: str,
+    engine: str = "raw",
+    cache: Optional[XfaCache] = None,
+    trace: Union[bool, str] = False,
+    span_file: Optional[str] = None,
+    limits: Optional[DecodeLimits] = None,
+) -> ExtractionResult:
+    """
+    Extract the XFA datasets of file_path. Errors are captured in the
+    result rather than raised. With a cache, raw-engine results are
+    served from and stored in it; a file that only grew by an incremental
+    update is re-extracted from the appended section, and result.changes
+    lists the fields that changed since the cached revision. engine="auto"
+    classifies the file first and dispatches through the default router.
+
+    Stream decoding is bounded by limits (default filters.DEFAULT_LIMITS);
+    a document that inflates past them, or runs out of time decoding,
+    fails with DecodeLimitError instead of exhausting memory.
+
+    With trace, result.trace holds per-stage timings and byte/stream
+    counters (see instrument); trace="allocations" adds tracemalloc
+    figures. With span_file the run is also appended there as
+    OpenTelemetry spans.
+    """
+    if trace or span_file:
+        with instrument.tracing(
+            spans=span_file is not None,
+            allocations=trace == "allocations",
+            file=file_path,
+            engine=engine,
+        ) as run:
+            result = extract(file_path, engine, cache, limits=limits)
+        result.trace = run.to_dict()
+        if span_file:
+            instrument.write_spans(run, span_file)
+        return result
+
+    if engine == "auto":
+        from .router import default_router
+
+        with decode_budget(limits):
+            return default_router.extract(file_path, cache)
+
+    start = time.perf_counter()
+    result = ExtractionResult(file=file_path, engine=engine)
+    try:
+        run = _engine(engine)
+        with decode_budget(limits):
+            if cache is not None and engine == "raw":
+                payload, result.changes, result.cached = extract_incremental(
+                    file_path, cache
+                )
+            else:
+                payload = run(file_path)
+        result.source = payload["source"]
+        result.candidates = payload["candidates"]
+        result.datasets = payload["datasets"]
+        result.fields = payload["fields"]
+        result.field_paths = payload["field_paths"]
+        result.form_diff = payload.get("form_diff")
+        result.text = payload.get("text")
+    except Exception as e:
+        result.ok = False
+        result.error = f"{type(e).__name__}: {e}"
+    result.elapsed_ms = round((time.perf_counter() - start) * 1000, 3)
+    return result
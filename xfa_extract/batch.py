@@ -0,0 +1,183 @@
+"""
+Batch XFA extraction over a case folder.
+
+Fans PDFs out over a process pool and streams one JSON line per file as
+it finishes, with per-file timing. A failing file produces an error line
+and never stalls the batch; at most --max-pending files are in flight so
+memory stays flat on folders with thousands of documents. With --output
+and a directory target the file is a snapshot for xfa_extract.diff: its
+first line records the folder ({"snapshot_root": ...}).
+
+Usage:
+    python3 -m xfa_extract.batch <directory|glob> [--engine auto|raw|pypdf|...]
+        [--workers N] [--max-pending N] [--cache-dir DIR] [--trace]
+        [--max-stream-mb N] [--max-document-mb N] [--time-budget SECONDS]
+        [--output results.jsonl]
+"""
+
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+from functools import partial
+
+from .api import ENGINES, extract
+from .cache import XfaCache
+from .filters import DEFAULT_LIMITS, DecodeLimits
+from .pool import pool_map
+
+
+def iter_pdf_paths(target):
+    """Lazily yield PDF paths under a directory, or matching a glob pattern."""
+    if os.path.isdir(target):
+        for dirpath, dirnames, filenames in os.walk(target):
+            dirnames.sort()
+            for name in sorted(filenames):
+                if name.lower().endswith(".pdf"):
+                    yield os.path.join(dirpath, name)
+    else:
+        yield from glob.iglob(target, recursive=True)
+
+
+# One cache connection per worker process, opened on first use.
+_worker_cache = None
+
+
+def extract_file(
+    file_path,
+    engine="raw",
+    cache_dir=None,
+    include_datasets=False,
+    trace=False,
+    limits=None,
+):
+    """Extract one PDF and return its JSON-serialisable result record."""
+    global _worker_cache
+    cache = None
+    if cache_dir is not None:
+        if _worker_cache is None or _worker_cache.cache_dir != cache_dir:
+            _worker_cache = XfaCache(cache_dir)
+        cache = _worker_cache
+    result = extract(file_path, engine, cache, trace=trace, limits=limits)
+    return result.to_dict(include_datasets=include_datasets)
+
+
+def run_batch(
+    paths,
+    engine="raw",
+    workers=None,
+    max_pending=None,
+    cache_dir=None,
+    trace=False,
+    limits=None,
+):
+    """
+    Yield result records for paths as they complete.
+
+    Submission is throttled to max_pending in-flight files (default: twice
+    the worker count). If a worker process crashes, the files that were
+    in flight are retried one by one on a rebuilt pool, so only a file
+    that crashes a worker by itself is reported as failed. With
+    cache_dir set, raw-engine results go through the XfaCache there; with
+    trace, each record carries its per-stage trace (see instrument).
+    limits (a filters.DecodeLimits) bounds stream decoding per file.
+    """
+    workers = workers or os.cpu_count() or 1
+    job = partial(
+        extract_file, engine=engine, cache_dir=cache_dir, trace=trace, limits=limits
+    )
+
+    def failed(path, error):
+        return {"file": path, "engine": engine, "ok": False, "error": error}
+
+    yield from pool_map(job, paths, workers, max_pending or workers * 2, failed)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("target", help="directory of PDFs or glob pattern")
+    parser.add_argument("--engine", choices=ENGINES, default="raw")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--max-pending", type=int, default=None)
+    parser.add_argument(
+        "--cache-dir",
+        help="reuse raw-engine results from this content-addressed cache",
+    )
+    parser.add_argument(
+        "--trace", action="store_true", help="record per-stage timings for each file"
+    )
+    parser.add_argument(
+        "--max-stream-mb",
+        type=float,
+        default=DEFAULT_LIMITS.max_stream_bytes / 2**20,
+        help="fail a file whose single stream inflates past this",
+    )
+    parser.add_argument(
+        "--max-document-mb",
+        type=float,
+        default=DEFAULT_LIMITS.max_document_bytes / 2**20,
+        help="fail a file whose streams together inflate past this",
+    )
+    parser.add_argument(
+        "--time-budget",
+        type=float,
+        default=DEFAULT_LIMITS.time_budget,
+        help="seconds of stream decoding allowed per file",
+    )
+    parser.add_argument("--output", help="write JSON Lines here instead of stdout")
+    args = parser.parse_args(argv)
+    limits = DecodeLimits(
+        int(args.max_stream_mb * 2**20),
+        int(args.max_document_mb * 2**20),
+        args.time_budget,
+    )
+
+    out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    if args.output and os.path.isdir(args.target):
+        from .diff import snapshot_header
+
+        out.write(snapshot_header(args.target))
+    total = failed = 0
+    routes = {}
+    stages = {}
+    start = time.perf_counter()
+    try:
+        for record in run_batch(
+            iter_pdf_paths(args.target),
+            args.engine,
+            args.workers,
+            args.max_pending,
+            args.cache_dir,
+            args.trace,
+            limits,
+        ):
+            total += 1
+            failed += not record["ok"]
+            if record.get("route"):
+                count, ms = routes.get(record["route"], (0, 0.0))
+                routes[record["route"]] = (count + 1, ms + record["elapsed_ms"])
+            if record.get("trace"):
+                for name, totals in record["trace"]["stages"].items():
+                    stages[name] = stages.get(name, 0.0) + totals["ms"]
+            out.write(json.dumps(record, ensure_ascii=False) + "\n")
+            out.flush()
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    elapsed = time.perf_counter() - start
+    print(
+        f"Processed {total} files ({failed} failed) in {elapsed:.2f}s",
+        file=sys.stderr,
+    )
+    for route, (count, ms) in sorted(routes.items()):
+        print(f"  {route}: {count} files, {ms / 1000:.2f}s", file=sys.stderr)
+    for name, ms in sorted(stages.items(), key=lambda item: -item[1]):
+        print(f"  stage {name}: {ms / 1000:.2f}s", file=sys.stderr)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
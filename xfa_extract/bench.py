@@ -0,0 +1,209 @@
+"""
+Extraction benchmark over a synthetic XFA corpus.
+
+Generates a corpus (see synthetic.CorpusSpec), then runs each engine in
+its own freshly spawned process so peak RSS is attributable to that
+engine alone. Reports throughput (MB/s, docs/s), p50/p95 latency and
+peak RSS as JSON for regression tracking.
+
+Engines:
+    regex   original whole-file regex scan + full XML parse
+    mmap    object-aware mmap scan + datasets-only parse
+    raw     xref-directed lookup with scan fallback (default engine)
+    pypdf   pypdf reader, datasets packet only (skipped if not installed)
+
+Usage:
+    python3 -m xfa_extract.bench [--docs 20] [--fields 2000] [--images 8]
+        [--image-kb 256] [--no-compress] [--object-streams] [--updates 0]
+        [--repeat 3] [--engines regex,mmap,raw,pypdf] [--output bench.json]
+"""
+
+import argparse
+import importlib.util
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from multiprocessing import get_context
+
+from .synthetic import CorpusSpec, write_corpus
+
+ENGINES = ("regex", "mmap", "raw", "pypdf")
+
+
+def _run_regex(path):
+    from .datasets import extract_text_from_xml
+    from .scanner import find_xfa_data
+
+    fields = {}
+    for xml_bytes in find_xfa_data(path, scanner="regex"):
+        if b"form1" in xml_bytes or b"datasets" in xml_bytes:
+            fields.update(extract_text_from_xml(xml_bytes)[0])
+    return len(fields)
+
+
+def _run_mmap(path):
+    from .datasets import extract_text_from_xml
+    from .scanner import iter_xfa_candidates
+
+    fields = {}
+    for xml_bytes in iter_xfa_candidates(path):
+        if b"datasets" in xml_bytes:
+            fields.update(extract_text_from_xml(xml_bytes, datasets_only=True)[0])
+    return len(fields)
+
+
+def _run_raw(path):
+    from .raw import extract_datasets
+
+    return len(extract_datasets(path)["field_paths"])
+
+
+def _run_pypdf(path):
+    from .pypdf_engine import extract_datasets
+
+    return len(extract_datasets(path)["field_paths"])
+
+
+_RUNNERS = {
+    "regex": _run_regex,
+    "mmap": _run_mmap,
+    "raw": _run_raw,
+    "pypdf": _run_pypdf,
+}
+
+
+def _peak_rss_kb():
+    import resource
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is bytes on macOS, kilobytes on Linux.
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+def _percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    k = (len(sorted_values) - 1) * pct / 100
+    lo = int(k)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (k - lo)
+
+
+def _bench_engine(engine, paths, repeat):
+    """Runs in a fresh process: time every document `repeat` times."""
+    run = _RUNNERS[engine]
+    baseline_kb = _peak_rss_kb()
+    latencies = []
+    errors = 0
+    fields = 0
+    for _ in range(repeat):
+        for path in paths:
+            start = time.perf_counter()
+            try:
+                fields = max(fields, run(path))
+            except Exception:
+                errors += 1
+            latencies.append((time.perf_counter() - start) * 1000)
+    return {
+        "latencies_ms": latencies,
+        "errors": errors,
+        "max_fields": fields,
+        "baseline_rss_kb": baseline_kb,
+        "peak_rss_kb": _peak_rss_kb(),
+    }
+
+
+def summarise(raw, total_bytes, docs):
+    latencies = sorted(raw["latencies_ms"])
+    seconds = sum(latencies) / 1000
+    return {
+        "docs": docs,
+        "errors": raw["errors"],
+        "fields": raw["max_fields"],
+        "seconds": round(seconds, 4),
+        "docs_per_s": round(docs / seconds, 2) if seconds else None,
+        "mb_per_s": round(total_bytes / 1e6 / seconds, 2) if seconds else None,
+        "latency_ms": {
+            "p50": round(_percentile(latencies, 50), 3),
+            "p95": round(_percentile(latencies, 95), 3),
+            "max": round(latencies[-1], 3) if latencies else 0.0,
+        },
+        "peak_rss_kb": raw["peak_rss_kb"],
+        "baseline_rss_kb": raw["baseline_rss_kb"],
+    }
+
+
+def run_benchmark(paths, engines=ENGINES, repeat=3):
+    """Return {engine: summary} for the given corpus paths."""
+    total_bytes = sum(os.path.getsize(p) for p in paths) * repeat
+    docs = len(paths) * repeat
+    results = {}
+    ctx = get_context("spawn")
+    for engine in engines:
+        if engine == "pypdf" and importlib.util.find_spec("pypdf") is None:
+            results[engine] = {"skipped": "pypdf not installed"}
+            continue
+        with ProcessPoolExecutor(max_workers=1, mp_context=ctx) as pool:
+            raw = pool.submit(_bench_engine, engine, paths, repeat).result()
+        results[engine] = summarise(raw, total_bytes, docs)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="XFA extraction benchmark")
+    parser.add_argument("--docs", type=int, default=20)
+    parser.add_argument("--fields", type=int, default=2000)
+    parser.add_argument("--images", type=int, default=8)
+    parser.add_argument("--image-kb", type=int, default=256)
+    parser.add_argument("--no-compress", action="store_true")
+    parser.add_argument("--object-streams", action="store_true")
+    parser.add_argument("--updates", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--engines", default=",".join(ENGINES))
+    parser.add_argument("--corpus-dir", help="keep the generated corpus here")
+    parser.add_argument("--output", help="write the JSON report here")
+    args = parser.parse_args(argv)
+
+    engines = [e for e in args.engines.split(",") if e]
+    unknown = set(engines) - set(ENGINES)
+    if unknown:
+        parser.error(f"unknown engines: {', '.join(sorted(unknown))}")
+
+    spec = CorpusSpec(
+        fields=args.fields,
+        images=args.images,
+        image_bytes=args.image_kb * 1024,
+        compress=not args.no_compress,
+        object_streams=args.object_streams,
+        updates=args.updates,
+    )
+    with tempfile.TemporaryDirectory(prefix="xfa-bench-") as tmp:
+        paths = write_corpus(args.corpus_dir or tmp, args.docs, spec)
+        report = {
+            "generated_at": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "corpus": dict(
+                spec.to_dict(),
+                docs=len(paths),
+                bytes=sum(os.path.getsize(p) for p in paths),
+            ),
+            "repeat": args.repeat,
+            "engines": run_benchmark(paths, engines, args.repeat),
+        }
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,201 @@
+"""
+Content-addressed on-disk cache for extracted XFA datasets.
+
+Entries are keyed by a BLAKE2b digest of the PDF bytes plus
+EXTRACTOR_VERSION, so an edited form or a changed extractor never
+serves stale data. A (path, size, mtime) table lets unchanged files skip
+hashing entirely. The cache is a single SQLite file, safe to share
+between batch worker processes, and evicts least-recently-used entries
+once it grows past max_bytes.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import time
+import zlib
+
+# Bump when the cached payload layout changes.
+CACHE_SCHEMA = 3
+
+DEFAULT_CACHE_DIR = os.path.join(
+    os.environ.get("XDG_CACHE_HOME", os.path.expanduser("~/.cache")), "immi-os", "xfa"
+)
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+_HASH_CHUNK = 1024 * 1024
+
+# Package modules whose contents determine the extraction result.
+_EXTRACTOR_SOURCES = (
+    "acroform.py",
+    "crypt.py",
+    "datasets.py",
+    "fields.py",
+    "filters.py",
+    "raw.py",
+    "scanner.py",
+    "xref.py",
+)
+
+
+def _extractor_version():
+    digest = hashlib.blake2b(str(CACHE_SCHEMA).encode(), digest_size=8)
+    here = os.path.dirname(os.path.abspath(__file__))
+    for name in _EXTRACTOR_SOURCES:
+        with open(os.path.join(here, name), "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+EXTRACTOR_VERSION = _extractor_version()
+
+
+def file_digest(file_path):
+    """Return the hex BLAKE2b digest of file_path's contents."""
+    digest = hashlib.blake2b(digest_size=20)
+    with open(file_path, "rb") as f:
+        while chunk := f.read(_HASH_CHUNK):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class XfaCache:
+    """
+    Persistent extraction cache.
+
+    get()/put() take the PDF path; the payload is any JSON-serialisable
+    dict (normally the result of raw.extract_datasets).
+    """
+
+    def __init__(self, cache_dir=None, max_bytes=DEFAULT_MAX_BYTES, version=None):
+        self.cache_dir = cache_dir or os.environ.get("XFA_CACHE_DIR", DEFAULT_CACHE_DIR)
+        self.max_bytes = max_bytes
+        self.version = version or EXTRACTOR_VERSION
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._db = sqlite3.connect(
+            os.path.join(self.cache_dir, "xfa-cache.sqlite3"),
+            timeout=30,
+            isolation_level=None,
+        )
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS stat (
+                path TEXT PRIMARY KEY,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                digest TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS entries (
+                digest TEXT NOT NULL,
+                version TEXT NOT NULL,
+                payload BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                last_access REAL NOT NULL,
+                PRIMARY KEY (digest, version)
+            );
+            CREATE INDEX IF NOT EXISTS entries_lru ON entries (last_access);
+            """
+        )
+
+    def close(self):
+        self._db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def digest_for(self, file_path):
+        """Return file_path's content digest, hashing only if size/mtime changed."""
+        path = os.path.abspath(file_path)
+        st = os.stat(path)
+        row = self._db.execute(
+            "SELECT digest FROM stat WHERE path = ? AND size = ? AND mtime_ns = ?",
+            (path, st.st_size, st.st_mtime_ns),
+        ).fetchone()
+        if row:
+            return row[0]
+        digest = file_digest(path)
+        self.remember(path, st, digest)
+        return digest
+
+    def last_seen(self, file_path):
+        """Return (size, mtime_ns, digest) recorded for file_path, or None."""
+        return self._db.execute(
+            "SELECT size, mtime_ns, digest FROM stat WHERE path = ?",
+            (os.path.abspath(file_path),),
+        ).fetchone()
+
+    def remember(self, file_path, st, digest):
+        """Record digest as the content of file_path at stat result st."""
+        self._db.execute(
+            "INSERT OR REPLACE INTO stat (path, size, mtime_ns, digest) VALUES (?, ?, ?, ?)",
+            (os.path.abspath(file_path), st.st_size, st.st_mtime_ns, digest),
+        )
+
+    def get(self, file_path):
+        """Return the cached payload for file_path, or None on a miss."""
+        return self.get_digest(self.digest_for(file_path))
+
+    def get_digest(self, digest):
+        """Return the cached payload for a content digest, or None on a miss."""
+        row = self._db.execute(
+            "SELECT payload FROM entries WHERE digest = ? AND version = ?",
+            (digest, self.version),
+        ).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self._db.execute(
+            "UPDATE entries SET last_access = ? WHERE digest = ? AND version = ?",
+            (time.time(), digest, self.version),
+        )
+        self.hits += 1
+        return json.loads(zlib.decompress(row[0]))
+
+    def put(self, file_path, payload):
+        """Store payload for file_path and evict down to max_bytes."""
+        self.put_digest(self.digest_for(file_path), payload)
+
+    def put_digest(self, digest, payload):
+        """Store payload under a content digest and evict down to max_bytes."""
+        blob = zlib.compress(json.dumps(payload, ensure_ascii=False).encode("utf-8"))
+        self._db.execute(
+            "INSERT OR REPLACE INTO entries (digest, version, payload, size, last_access) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (digest, self.version, blob, len(blob), time.time()),
+        )
+        self.evict()
+
+    def get_or_extract(self, file_path, extract):
+        """Return the cached payload, or call extract(file_path) and cache it."""
+        payload = self.get(file_path)
+        if payload is None:
+            payload = extract(file_path)
+            self.put(file_path, payload)
+        return payload
+
+    def evict(self):
+        """Drop stale-version entries, then LRU entries until under max_bytes."""
+        self._db.execute("DELETE FROM entries WHERE version != ?", (self.version,))
+        (total,) = self._db.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM entries"
+        ).fetchone()
+        if total <= self.max_bytes:
+            return
+        rows = self._db.execute(
+            "SELECT digest, version, size FROM entries ORDER BY last_access"
+        ).fetchall()
+        for digest, version, size in rows:
+            if total <= self.max_bytes:
+                break
+            self._db.execute(
+                "DELETE FROM entries WHERE digest = ? AND version = ?", (digest, version)
+            )
+            total -= size
@@ -0,0 +1,325 @@
+"""
+PDF Standard security handler (decryption only).
+
+IRCC forms are usually owner-password protected: they open with the empty
+user password, so the file key can be derived from the /Encrypt
+dictionary alone. StandardSecurityHandler derives that key once and then
+decrypts individual strings and streams on demand, keyed by the object
+they belong to, so the resolver only pays for the objects it reads.
+
+Supported: RC4 40-128 bit (V1/V2, R2-R4), AES-128 (V4 /AESV2) and
+AES-256 (V5 /AESV3, R5 and R6). RC4 and AES use the `cryptography`
+package when it is installed and fall back to pure Python otherwise;
+XFA packets are small enough for the fallback to be usable.
+"""
+
+import hashlib
+import struct
+from functools import lru_cache
+
+try:
+    from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+except ImportError:  # optional; pure-Python fallback below
+    Cipher = None
+    ARC4 = None
+else:
+    try:
+        from cryptography.hazmat.decrepit.ciphers.algorithms import ARC4
+    except ImportError:  # cryptography < 43
+        ARC4 = algorithms.ARC4
+
+_PASSWORD_PADDING = bytes.fromhex(
+    "28bf4e5e4e758a4164004e56fffa01082e2e00b6d0683e802f0ca9fe6453697a"
+)
+
+
+class EncryptionError(ValueError):
+    """The document is encrypted in a way we cannot open without a password."""
+
+
+# -- ciphers ------------------------------------------------------------------
+
+
+def rc4(key, data):
+    if ARC4 is not None and len(key) >= 5:
+        try:
+            decryptor = Cipher(ARC4(key), mode=None).decryptor()
+            return decryptor.update(data) + decryptor.finalize()
+        except Exception:  # ARC4 may be unavailable in the OpenSSL build
+            pass
+    s = list(range(256))
+    j = 0
+    for i in range(256):
+        j = (j + s[i] + key[i % len(key)]) & 0xFF
+        s[i], s[j] = s[j], s[i]
+    out = bytearray(len(data))
+    i = j = 0
+    for n, byte in enumerate(data):
+        i = (i + 1) & 0xFF
+        j = (j + s[i]) & 0xFF
+        s[i], s[j] = s[j], s[i]
+        out[n] = byte ^ s[(s[i] + s[j]) & 0xFF]
+    return bytes(out)
+
+
+def _xtime(a):
+    a <<= 1
+    return (a ^ 0x11B) if a & 0x100 else a
+
+
+def _gf_mul(a, b):
+    result = 0
+    while b:
+        if b & 1:
+            result ^= a
+        a = _xtime(a)
+        b >>= 1
+    return result
+
+
+# FIPS-197 S-box: the multiplicative inverse in GF(2^8) followed by the
+# AES affine transform. A table rather than computed at import.
+_SBOX = bytes.fromhex(
+    "637c777bf26b6fc53001672bfed7ab76ca82c97dfa5947f0add4a2af9ca472c0"
+    "b7fd9326363ff7cc34a5e5f171d8311504c723c31896059a071280e2eb27b275"
+    "09832c1a1b6e5aa0523bd6b329e32f8453d100ed20fcb15b6acbbe394a4c58cf"
+    "d0efaafb434d338545f9027f503c9fa851a3408f929d38f5bcb6da2110fff3d2"
+    "cd0c13ec5f974417c4a77e3d645d197360814fdc222a908846eeb814de5e0bdb"
+    "e0323a0a4906245cc2d3ac629195e479e7c8376d8dd54ea96c56f4ea657aae08"
+    "ba78252e1ca6b4c6e8dd741f4bbd8b8a703eb5664803f60e613557b986c11d9e"
+    "e1f8981169d98e949b1e87e9ce5528df8ca1890dbfe6426841992d0fb054bb16"
+)
+_INV_SBOX = bytes(_SBOX.index(x) for x in range(256))
+
+
+@lru_cache(maxsize=None)
+def _mul(n):
+    """Table of x * n in GF(2^8), built on first pure-Python AES use."""
+    return [_gf_mul(x, n) for x in range(256)]
+
+
+def _expand_key(key):
+    nk = len(key) // 4
+    rounds = nk + 6
+    words = [list(key[4 * i : 4 * i + 4]) for i in range(nk)]
+    rcon = 1
+    for i in range(nk, 4 * (rounds + 1)):
+        word = list(words[i - 1])
+        if i % nk == 0:
+            word = [_SBOX[b] for b in word[1:] + word[:1]]
+            word[0] ^= rcon
+            rcon = _xtime(rcon)
+        elif nk > 6 and i % nk == 4:
+            word = [_SBOX[b] for b in word]
+        words.append([a ^ b for a, b in zip(words[i - nk], word)])
+    return [sum(words[4 * r : 4 * r + 4], []) for r in range(rounds + 1)]
+
+
+def _encrypt_block(round_keys, block):
+    m2, m3 = _mul(2), _mul(3)
+    state = [b ^ k for b, k in zip(block, round_keys[0])]
+    for r in range(1, len(round_keys)):
+        state = [_SBOX[b] for b in state]
+        state = [state[(i + 4 * (i % 4)) % 16] for i in range(16)]  # ShiftRows
+        if r != len(round_keys) - 1:
+            mixed = []
+            for c in range(4):
+                a0, a1, a2, a3 = state[4 * c : 4 * c + 4]
+                mixed += [
+                    m2[a0] ^ m3[a1] ^ a2 ^ a3,
+                    a0 ^ m2[a1] ^ m3[a2] ^ a3,
+                    a0 ^ a1 ^ m2[a2] ^ m3[a3],
+                    m3[a0] ^ a1 ^ a2 ^ m2[a3],
+                ]
+            state = mixed
+        state = [b ^ k for b, k in zip(state, round_keys[r])]
+    return bytes(state)
+
+
+def _decrypt_block(round_keys, block):
+    m9, m11, m13, m14 = _mul(9), _mul(11), _mul(13), _mul(14)
+    state = [b ^ k for b, k in zip(block, round_keys[-1])]
+    for r in range(len(round_keys) - 2, -1, -1):
+        state = [state[(i - 4 * (i % 4)) % 16] for i in range(16)]  # InvShiftRows
+        state = [_INV_SBOX[b] for b in state]
+        state = [b ^ k for b, k in zip(state, round_keys[r])]
+        if r:
+            mixed = []
+            for c in range(4):
+                a0, a1, a2, a3 = state[4 * c : 4 * c + 4]
+                mixed += [
+                    m14[a0] ^ m11[a1] ^ m13[a2] ^ m9[a3],
+                    m9[a0] ^ m14[a1] ^ m11[a2] ^ m13[a3],
+                    m13[a0] ^ m9[a1] ^ m14[a2] ^ m11[a3],
+                    m11[a0] ^ m13[a1] ^ m9[a2] ^ m14[a3],
+                ]
+            state = mixed
+    return bytes(state)
+
+
+def aes_cbc(key, iv, data, decrypt=True):
+    """AES-CBC over whole blocks, without padding."""
+    if Cipher is not None:
+        cipher = Cipher(algorithms.AES(key), modes.CBC(iv))
+        ctx = cipher.decryptor() if decrypt else cipher.encryptor()
+        return ctx.update(data) + ctx.finalize()
+    round_keys = _expand_key(key)
+    out = bytearray()
+    prev = iv
+    for pos in range(0, len(data), 16):
+        block = data[pos : pos + 16]
+        if decrypt:
+            out += bytes(a ^ b for a, b in zip(_decrypt_block(round_keys, block), prev))
+            prev = block
+        else:
+            prev = _encrypt_block(round_keys, bytes(a ^ b for a, b in zip(block, prev)))
+            out += prev
+    return bytes(out)
+
+
+def _aes_decrypt(key, data):
+    """Decrypt an IV-prefixed, PKCS#7-padded PDF string or stream."""
+    if len(data) < 32 or len(data) % 16:
+        # Some writers emit an IV-only (empty) string; anything else is damaged.
+        return b""
+    plain = aes_cbc(key, data[:16], data[16:])
+    pad = plain[-1]
+    return plain[:-pad] if 1 <= pad <= 16 else plain
+
+
+# -- key derivation -----------------------------------------------------------
+
+
+def _hash_r6(password, salt, user_key=b""):
+    """ISO 32000-2 algorithm 2.B."""
+    k = hashlib.sha256(password + salt + user_key).digest()
+    round_no = 0
+    while True:
+        k1 = (password + k + user_key) * 64
+        e = aes_cbc(k[:16], k[16:32], k1, decrypt=False)
+        digest = (hashlib.sha256, hashlib.sha384, hashlib.sha512)[sum(e[:16]) % 3]
+        k = digest(e).digest()
+        round_no += 1
+        if round_no >= 64 and e[-1] <= round_no - 32:
+            return k[:32]
+
+
+def _as_bytes(value):
+    if isinstance(value, bytes):
+        return value
+    if isinstance(value, str):
+        return value.encode("latin-1")
+    return b""
+
+
+class StandardSecurityHandler:
+    """File key and per-object decryption for the /Standard filter."""
+
+    def __init__(self, encrypt, first_id=b"", password=b""):
+        if encrypt.get("/Filter") != "/Standard":
+            raise EncryptionError(f"Unsupported security handler {encrypt.get('/Filter')}")
+        self.version = encrypt.get("/V", 0)
+        self.revision = encrypt.get("/R", 2)
+        self.encrypt_metadata = encrypt.get("/EncryptMetadata", True) is not False
+        self.string_method, self.stream_method = self._methods(encrypt)
+        owner = _as_bytes(encrypt.get("/O"))
+        user = _as_bytes(encrypt.get("/U"))
+        if self.revision >= 5:
+            self.key = self._key_aes256(password, user, _as_bytes(encrypt.get("/UE")))
+        else:
+            self.key = self._key_rc4(encrypt, password, owner, user, first_id)
+
+    def _methods(self, encrypt):
+        if self.version in (1, 2):
+            return "V2", "V2"
+        if self.version not in (4, 5):
+            raise EncryptionError(f"Unsupported encryption version {self.version}")
+        filters = encrypt.get("/CF") or {}
+
+        def method(name):
+            if name in (None, "/Identity"):
+                return None
+            cfm = (filters.get(name) or {}).get("/CFM")
+            if cfm in ("/V2", "/AESV2", "/AESV3"):
+                return cfm[1:]
+            if cfm in (None, "/None"):
+                return None
+            raise EncryptionError(f"Unsupported crypt filter method {cfm}")
+
+        return method(encrypt.get("/StrF")), method(encrypt.get("/StmF"))
+
+    def _key_length(self, encrypt):
+        """File key length in bytes for revisions 2-4."""
+        if self.revision == 2:
+            return 5
+        if self.version == 4:
+            # The crypt filter's /Length wins; writers put bytes (16) or bits
+            # (128) there. AESV2 is always 128-bit, and so is V4 by default.
+            if "AESV2" in (self.string_method, self.stream_method):
+                return 16
+            filters = encrypt.get("/CF") or {}
+            for name in (encrypt.get("/StmF"), encrypt.get("/StrF")):
+                length = (filters.get(name) or {}).get("/Length")
+                if isinstance(length, int) and length > 0:
+                    return length if length <= 16 else length // 8
+            return encrypt.get("/Length", 128) // 8
+        return encrypt.get("/Length", 40) // 8
+
+    def _key_rc4(self, encrypt, password, owner, user, first_id):
+        length = self._key_length(encrypt)
+        padded = (password + _PASSWORD_PADDING)[:32]
+        digest = hashlib.md5(
+            padded + owner + struct.pack("<I", encrypt.get("/P", 0) & 0xFFFFFFFF) + first_id
+        )
+        if self.revision >= 4 and not self.encrypt_metadata:
+            digest.update(b"\xff\xff\xff\xff")
+        key = digest.digest()
+        if self.revision >= 3:
+            for _ in range(50):
+                key = hashlib.md5(key[:length]).digest()
+        key = key[:length]
+
+        # Authenticate the (empty) user password before trusting the key.
+        if self.revision == 2:
+            valid = rc4(key, _PASSWORD_PADDING) == user[:32]
+        else:
+            check = rc4(key, hashlib.md5(_PASSWORD_PADDING + first_id).digest())
+            for i in range(1, 20):
+                check = rc4(bytes(b ^ i for b in key), check)
+            valid = check == user[:16]
+        if not valid:
+            raise EncryptionError("Document requires a user password")
+        return key
+
+    def _key_aes256(self, password, user, user_encrypted):
+        password = password[:127]
+        if self.revision == 5:
+            check = hashlib.sha256(password + user[32:40]).digest()
+            intermediate = hashlib.sha256(password + user[40:48]).digest()
+        else:
+            check = _hash_r6(password, user[32:40])
+            intermediate = _hash_r6(password, user[40:48])
+        if check != user[:32]:
+            raise EncryptionError("Document requires a user password")
+        return aes_cbc(intermediate, b"\x00" * 16, user_encrypted[:32])
+
+    def _object_key(self, num, gen, method):
+        if method == "AESV3":
+            return self.key
+        salt = b"sAlT" if method == "AESV2" else b""
+        seed = self.key + num.to_bytes(3, "little") + gen.to_bytes(2, "little") + salt
+        return hashlib.md5(seed).digest()[: min(len(self.key) + 5, 16)]
+
+    def _decrypt(self, data, num, gen, method):
+        if method is None:
+            return data
+        key = self._object_key(num, gen, method)
+        if method == "V2":
+            return rc4(key, data)
+        return _aes_decrypt(key, data)
+
+    def decrypt_string(self, data, num, gen):
+        return self._decrypt(data, num, gen, self.string_method)
+
+    def decrypt_stream(self, data, num, gen):
+        return self._decrypt(data, num, gen, self.stream_method)
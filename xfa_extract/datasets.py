@@ -0,0 +1,115 @@
+"""
+XFA datasets XML parsing: incremental extraction of the
+xfa:datasets/xfa:data subtree and the legacy bare-tag flattening.
+"""
+
+import re
+import xml.etree.ElementTree as ET
+
+from .instrument import count, stage
+
+_DATASETS_START = re.compile(rb"<(?:[A-Za-z_][\w.-]*:)?datasets[\s/>]")
+# Longest namespace prefix we look back over from a bare "datasets" hit.
+_MAX_PREFIX = 64
+
+# Feed size for the incremental datasets parser.
+PARSE_CHUNK = 64 * 1024
+
+
+def _local_name(tag):
+    return tag.split("}")[-1] if "}" in tag else tag
+
+
+def _flatten(root):
+    data = {}
+    for elem in root.iter():
+        if elem.text and elem.text.strip():
+            tag = _local_name(elem.tag)
+            data[tag] = elem.text.strip()
+            for k, v in elem.attrib.items():
+                data[f"{tag}_{_local_name(k)}"] = v
+    return data
+
+
+def _pull_data_packet(xml_bytes, start):
+    parser = ET.XMLPullParser(events=("start", "end"))
+    stack = []
+    data_elem = None
+    for offset in range(start, len(xml_bytes), PARSE_CHUNK):
+        parser.feed(xml_bytes[offset : offset + PARSE_CHUNK])
+        for event, elem in parser.read_events():
+            if event == "start":
+                stack.append(elem)
+                if (
+                    data_elem is None
+                    and len(stack) >= 2
+                    and _local_name(elem.tag) == "data"
+                    and _local_name(stack[-2].tag) == "datasets"
+                ):
+                    data_elem = elem
+                continue
+            stack.pop()
+            if elem is data_elem:
+                return data_elem
+            if data_elem is None:
+                if _local_name(elem.tag) == "datasets":
+                    return None
+                # Outside the data subtree: drop children as soon as they close.
+                elem.clear()
+    return None
+
+
+def _find_datasets_start(xml_bytes):
+    # bytes.find is an order of magnitude faster than a regex search over a
+    # multi-MB template, so find the bare word and confirm the tag around it.
+    pos = xml_bytes.find(b"datasets")
+    while pos != -1:
+        lt = xml_bytes.rfind(b"<", max(0, pos - _MAX_PREFIX), pos)
+        if lt != -1 and _DATASETS_START.match(xml_bytes, lt):
+            return lt
+        pos = xml_bytes.find(b"datasets", pos + 8)
+    return -1
+
+
+def parse_data_packet(xml_content):
+    """
+    Incrementally parse xml_content and return the xfa:datasets/xfa:data
+    element, or None if there is none.
+
+    Parsing starts at the datasets start tag when it can be found, so the
+    template and config packets are never tokenised, and stops as soon as
+    the data element closes. Elements outside the data subtree are cleared
+    as they end.
+    """
+    if isinstance(xml_content, str):
+        xml_content = xml_content.encode("utf-8")
+    start = _find_datasets_start(xml_content)
+    if start != -1:
+        try:
+            return _pull_data_packet(xml_content, start)
+        except ET.ParseError:
+            # Usually a namespace prefix declared on an ancestor we skipped.
+            pass
+    return _pull_data_packet(xml_content, 0)
+
+
+def extract_text_from_xml(xml_content, datasets_only=False):
+    """
+    Flatten XML text into {tag: text, tag_attr: value}.
+
+    With datasets_only, only the xfa:datasets/xfa:data subtree is parsed
+    (see parse_data_packet) and ({}, None) is returned if there is none.
+    """
+    count("xml_bytes_parsed", len(xml_content))
+    try:
+        with stage("parse"):
+            if datasets_only:
+                root = parse_data_packet(xml_content)
+            else:
+                root = ET.fromstring(xml_content)
+    except ET.ParseError:
+        return {}, None
+    if root is None:
+        return {}, None
+    with stage("flatten"):
+        return _flatten(root), root
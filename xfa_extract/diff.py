@@ -0,0 +1,161 @@
+"""
+Field-level diff between two extractions of the same form.
+
+Wraps fields.diff_fields, which merges two path-sorted FieldMaps in one
+linear pass and reports added, removed and changed fields. Snapshots are
+the JSON Lines written by the batch extractor (one record per PDF with
+its field_paths), so a whole case folder can be compared against the
+snapshot taken at the previous review in a single run; files are
+matched by their path relative to the folder (or snapshot) root. A
+snapshot of a folder starts with a {"snapshot_root": folder} header
+line; for older snapshots without one, the records' common directory
+is used. A single PDF compared with a folder or snapshot is keyed by
+its file name.
+
+Usage:
+    python3 -m xfa_extract.diff OLD NEW [--engine raw] [--workers N]
+        [--write-snapshot PATH] [--output diff.jsonl]
+
+OLD and NEW are each a PDF, a case folder or a snapshot (.jsonl); for
+two PDFs one diff is printed, otherwise one JSON line per file.
+"""
+
+import argparse
+import json
+import os
+import sys
+
+from .fields import diff_fields
+
+
+# -- snapshots ----------------------------------------------------------------
+
+
+def snapshot_header(root):
+    """The first line of a snapshot of folder root."""
+    return json.dumps({"snapshot_root": root}, ensure_ascii=False) + "\n"
+
+
+def read_snapshot(path):
+    """
+    Return ({file: record}, root) from a batch JSON Lines snapshot; root
+    is None when the snapshot has no header.
+    """
+    records = {}
+    root = None
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                record = json.loads(line)
+                if "snapshot_root" in record:
+                    root = record["snapshot_root"]
+                else:
+                    records[record["file"]] = record
+    return records, root
+
+
+def _relative(records, root=None):
+    """Key records by path relative to root (default: their common directory)."""
+    if not records:
+        return {}
+    if root is None:
+        files = list(records)
+        root = os.path.commonpath(files) if len(files) > 1 else os.path.dirname(files[0])
+        if root in records:  # a single-file snapshot
+            root = os.path.dirname(root)
+    return {os.path.relpath(f, root): r for f, r in records.items()}
+
+
+def _extract(paths, root, engine, workers, snapshot_out=None):
+    from .batch import run_batch
+
+    records = {}
+    out = open(snapshot_out, "w", encoding="utf-8") if snapshot_out else None
+    try:
+        if out:
+            out.write(snapshot_header(root))
+        for record in run_batch(paths, engine, workers):
+            records[record["file"]] = record
+            if out:
+                out.write(json.dumps(record, ensure_ascii=False) + "\n")
+    finally:
+        if out:
+            out.close()
+    return records
+
+
+def _load(target, engine, workers, snapshot_out=None):
+    if os.path.isdir(target):
+        from .batch import iter_pdf_paths
+
+        paths, root = iter_pdf_paths(target), target
+    elif target.lower().endswith(".pdf"):
+        paths, root = [target], os.path.dirname(target)
+    else:
+        return _relative(*read_snapshot(target))
+    return _relative(_extract(paths, root, engine, workers, snapshot_out), root)
+
+
+def diff_records(old, new):
+    """
+    Yield one diff record per file across two {relative path: record}
+    maps, in path order: status is added, removed, changed, unchanged or
+    failed (either side did not extract).
+    """
+    for name in sorted(old.keys() | new.keys()):
+        before, after = old.get(name), new.get(name)
+        if before is None:
+            yield {"file": name, "status": "added"}
+        elif after is None:
+            yield {"file": name, "status": "removed"}
+        elif not before.get("ok", True) or not after.get("ok", True):
+            error = after.get("error") or before.get("error")
+            yield {"file": name, "status": "failed", "error": error}
+        else:
+            diff = diff_fields(before["field_paths"], after["field_paths"])
+            status = "changed" if diff else "unchanged"
+            yield dict({"file": name, "status": status}, **diff.to_dict())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("old", help="PDF, case folder or snapshot (.jsonl)")
+    parser.add_argument("new", help="PDF, case folder or snapshot (.jsonl)")
+    parser.add_argument("--engine", default="raw")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument(
+        "--write-snapshot", help="save the NEW side's extraction as a snapshot"
+    )
+    parser.add_argument("--output", help="write JSON Lines here instead of stdout")
+    args = parser.parse_args(argv)
+
+    if args.old.lower().endswith(".pdf") and args.new.lower().endswith(".pdf"):
+        from .api import extract
+
+        before, after = extract(args.old, args.engine), extract(args.new, args.engine)
+        for result in (before, after):
+            if not result.ok:
+                print(f"{result.file}: {result.error}", file=sys.stderr)
+                return 1
+        diff = diff_fields(before.field_map, after.field_map)
+        print(json.dumps(diff.to_dict(), ensure_ascii=False, indent=2))
+        return 0
+
+    old = _load(args.old, args.engine, args.workers)
+    new = _load(args.new, args.engine, args.workers, args.write_snapshot)
+    out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    counts = {}
+    try:
+        for record in diff_records(old, new):
+            counts[record["status"]] = counts.get(record["status"], 0) + 1
+            out.write(json.dumps(record, ensure_ascii=False) + "\n")
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    summary = ", ".join(f"{n} {status}" for status, n in sorted(counts.items()))
+    print(f"Compared {sum(counts.values())} files: {summary or 'none'}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,182 @@
+"""
+Path-preserving field map for XFA datasets.
+
+Every value is keyed by its full SOM-style path, e.g.
+`form1.Page1.PersonalDetails.Name.FamilyName[0]`, so repeated rows
+(family members, address history) no longer overwrite each other. Path
+conventions:
+
+- the leaf segment always carries its index among same-named siblings;
+- inner segments carry it only when it is not 0 (`form1.Row[1].Amount[0]`);
+- attributes are stored as SOM properties: `form1.Row[1].Amount[0].#currency`.
+
+FieldMap keeps paths and values in two parallel, path-sorted lists with
+interned path strings (identical forms across a batch share them), plus a
+dict index for O(1) lookup. Prefix queries bisect the sorted path list.
+"""
+
+import sys
+from bisect import bisect_left
+from dataclasses import dataclass, field
+
+
+def _local_name(tag):
+    return tag.split("}")[-1] if "}" in tag else tag
+
+
+def iter_field_paths(elem, include_root=False):
+    """
+    Yield (path, value) for every element under elem with non-blank text,
+    plus its attributes. Iterative, so deep trees cannot hit the recursion
+    limit. With include_root=False elem itself (normally xfa:data) is not
+    part of the path.
+    """
+    # Stack of (element, parent path, local name, index among siblings).
+    stack = []
+
+    def push_children(parent, parent_path):
+        seen = {}
+        children = []
+        for child in parent:
+            if not isinstance(child.tag, str):
+                continue  # comments / processing instructions
+            name = _local_name(child.tag)
+            index = seen.get(name, 0)
+            seen[name] = index + 1
+            children.append((child, name, index))
+        for child, name, index in reversed(children):
+            stack.append((child, parent_path, name, index))
+
+    if include_root:
+        stack.append((elem, "", _local_name(elem.tag), 0))
+    else:
+        push_children(elem, "")
+
+    while stack:
+        node, parent_path, name, index = stack.pop()
+        prefix = f"{parent_path}." if parent_path else ""
+        inner = f"{prefix}{name}[{index}]" if index else f"{prefix}{name}"
+        text = node.text.strip() if node.text else ""
+        if text:
+            path = f"{prefix}{name}[{index}]"
+            yield path, text
+            for key, value in node.attrib.items():
+                yield f"{path}.#{_local_name(key)}", value
+        push_children(node, inner)
+
+
+class FieldMap:
+    """Immutable, path-sorted mapping of SOM field paths to string values."""
+
+    __slots__ = ("_paths", "_values", "_index")
+
+    def __init__(self, items=()):
+        merged = {}
+        for path, value in items:
+            merged[sys.intern(path)] = value
+        self._paths = sorted(merged)
+        self._values = [merged[p] for p in self._paths]
+        self._index = {p: i for i, p in enumerate(self._paths)}
+
+    @classmethod
+    def from_element(cls, elem, include_root=False):
+        return cls(iter_field_paths(elem, include_root))
+
+    @classmethod
+    def from_dict(cls, mapping):
+        return cls(mapping.items())
+
+    def __len__(self):
+        return len(self._paths)
+
+    def __contains__(self, path):
+        return path in self._index
+
+    def __getitem__(self, path):
+        return self._values[self._index[path]]
+
+    def __iter__(self):
+        return iter(self._paths)
+
+    def __eq__(self, other):
+        if not isinstance(other, FieldMap):
+            return NotImplemented
+        return self._paths == other._paths and self._values == other._values
+
+    def __repr__(self):
+        return f"FieldMap({len(self)} fields)"
+
+    def get(self, path, default=None):
+        i = self._index.get(path)
+        return default if i is None else self._values[i]
+
+    def keys(self):
+        return list(self._paths)
+
+    def values(self):
+        return list(self._values)
+
+    def items(self):
+        return zip(self._paths, self._values)
+
+    def iter_prefix(self, prefix):
+        """
+        Yield (path, value) for paths starting with prefix, in path order.
+        Pass a trailing "." to stay below one node (`form1.Page1.`).
+        """
+        paths = self._paths
+        i = bisect_left(paths, prefix)
+        while i < len(paths) and paths[i].startswith(prefix):
+            yield paths[i], self._values[i]
+            i += 1
+
+    def to_dict(self):
+        return dict(zip(self._paths, self._values))
+
+
+@dataclass
+class FieldDiff:
+    """Differences between an old and a new field map."""
+
+    added: dict[str, str] = field(default_factory=dict)
+    removed: dict[str, str] = field(default_factory=dict)
+    changed: dict[str, list] = field(default_factory=dict)
+    unchanged: int = 0
+
+    def __bool__(self):
+        return bool(self.added or self.removed or self.changed)
+
+    def to_dict(self):
+        return {"added": self.added, "removed": self.removed, "changed": self.changed}
+
+
+def _as_field_map(fields):
+    return fields if isinstance(fields, FieldMap) else FieldMap.from_dict(fields)
+
+
+def diff_fields(old, new):
+    """
+    Return the FieldDiff from old to new (FieldMaps or {path: value}
+    dicts). Both sides are walked once in path order, so the cost is
+    linear once they are sorted; FieldMaps already are.
+    """
+    result = FieldDiff()
+    old_items = iter(_as_field_map(old).items())
+    new_items = iter(_as_field_map(new).items())
+    a = next(old_items, None)
+    b = next(new_items, None)
+    while a is not None or b is not None:
+        if b is None or (a is not None and a[0] < b[0]):
+            result.removed[a[0]] = a[1]
+            a = next(old_items, None)
+        elif a is None or b[0] < a[0]:
+            result.added[b[0]] = b[1]
+            b = next(new_items, None)
+        else:
+            if a[1] == b[1]:
+                result.unchanged += 1
+            else:
+                result.changed[a[0]] = [a[1], b[1]]
+            a = next(old_items, None)
+            b = next(new_items, None)
+    return result
@@ -0,0 +1,339 @@
+"""
+PDF stream filter decoding for XFA candidates.
+
+Only filters that can carry XML are decoded (FlateDecode with predictors,
+ASCII85Decode, ASCIIHexDecode); image and other filters are rejected
+from the stream dictionary alone.
+
+Decoding is bounded so a decompression bomb cannot exhaust memory: Flate
+output is produced INFLATE_CHUNK bytes at a time and checked against the
+active DecodeLimits after every chunk. Outside decode_budget() only the
+per-stream cap applies; inside it, one document's streams also share an
+output allowance and a wall-clock deadline. Crossing any limit raises
+DecodeLimitError, which aborts the document rather than skipping the
+stream.
+"""
+
+import base64
+import binascii
+import re
+import time
+import zlib
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Optional
+
+from .instrument import count, stage
+
+_FILTER_ENTRY = re.compile(rb"/Filter\s*(\[[^\]]*\]|/[A-Za-z0-9]+)")
+_DECODE_PARMS_ENTRY = re.compile(rb"/DecodeParms\s*(<<.*?>>|\[.*?\])", re.DOTALL)
+_NAME = re.compile(rb"/([A-Za-z0-9]+)")
+_PARMS_ELEMENT = re.compile(rb"null|<<.*?>>", re.DOTALL)
+_INT_PARAM = re.compile(rb"/([A-Za-z]+)\s+(-?\d+)")
+_WHITESPACE = re.compile(rb"\s+")
+
+FILTER_ALIASES = {
+    "Fl": "FlateDecode",
+    "A85": "ASCII85Decode",
+    "AHx": "ASCIIHexDecode",
+    "DCT": "DCTDecode",
+    "CCF": "CCITTFaxDecode",
+    "RL": "RunLengthDecode",
+    "LZW": "LZWDecode",
+}
+
+# Filters we can decode to text. Anything else (DCT, JPX, JBIG2, CCITT,
+# LZW, RunLength, Crypt) cannot hold an XFA packet we can read, so the
+# stream is skipped without touching its body.
+TEXT_FILTERS = {"FlateDecode", "ASCII85Decode", "ASCIIHexDecode"}
+
+# Bytes of decoded output inspected before committing to a full inflate.
+PEEK_BYTES = 4096
+# Flate output produced per decompress() call between limit checks.
+INFLATE_CHUNK = 1024 * 1024
+
+
+class DecodeLimitError(Exception):
+    """
+    A stream or document decoded past its DecodeLimits. Deliberately not a
+    ValueError, so xref-to-scan fallbacks do not retry the same bomb.
+    """
+
+
+@dataclass(frozen=True)
+class DecodeLimits:
+    """Output and time caps for stream decoding; None disables a cap."""
+
+    max_stream_bytes: Optional[int] = 64 * 1024 * 1024
+    max_document_bytes: Optional[int] = 256 * 1024 * 1024
+    time_budget: Optional[float] = 30.0
+
+
+DEFAULT_LIMITS = DecodeLimits()
+
+
+class _Budget:
+    """What is left of one document's DecodeLimits."""
+
+    __slots__ = ("limits", "remaining", "deadline")
+
+    def __init__(self, limits):
+        self.limits = limits
+        self.remaining = limits.max_document_bytes
+        self.deadline = (
+            time.monotonic() + limits.time_budget
+            if limits.time_budget is not None
+            else None
+        )
+
+    def stream_limit(self):
+        caps = (self.limits.max_stream_bytes, self.remaining)
+        return min((c for c in caps if c is not None), default=None)
+
+    def _over_document(self):
+        return DecodeLimitError(
+            f"Document decodes past {self.limits.max_document_bytes} bytes"
+        )
+
+    def check(self, produced, limit):
+        if limit is not None and produced > limit:
+            if limit == self.limits.max_stream_bytes:
+                raise DecodeLimitError(f"Stream decodes past {limit} bytes")
+            raise self._over_document()
+        if self.deadline is not None and time.monotonic() > self.deadline:
+            raise DecodeLimitError(
+                f"Decoding exceeded the {self.limits.time_budget:g}s time budget"
+            )
+
+    def charge(self, n):
+        if self.remaining is not None:
+            self.remaining -= n
+            if self.remaining < 0:
+                raise self._over_document()
+
+
+_budget = ContextVar("xfa_extract_decode_budget", default=None)
+# Used outside decode_budget(): the per-stream cap only.
+_STREAM_ONLY = _Budget(
+    DecodeLimits(
+        DEFAULT_LIMITS.max_stream_bytes, max_document_bytes=None, time_budget=None
+    )
+)
+
+
+@contextmanager
+def decode_budget(limits=None):
+    """
+    Apply limits (default DEFAULT_LIMITS) to every stream decoded in the
+    enclosed block, which should cover one document. If a budget is
+    already active and limits is None, the outer one keeps applying.
+    """
+    if limits is None and _budget.get() is not None:
+        yield _budget.get()
+        return
+    budget = _Budget(limits or DEFAULT_LIMITS)
+    token = _budget.set(budget)
+    try:
+        yield budget
+    finally:
+        _budget.reset(token)
+
+
+def parse_stream_filters(dict_bytes):
+    """
+    Return ([filter names], [decode parms dict or None]) from a stream
+    dictionary. Abbreviated filter names are expanded.
+    """
+    match = _FILTER_ENTRY.search(dict_bytes)
+    if not match:
+        return [], []
+    filters = [
+        FILTER_ALIASES.get(name, name)
+        for name in (n.decode("latin-1") for n in _NAME.findall(match.group(1)))
+    ]
+
+    parms = [None] * len(filters)
+    match = _DECODE_PARMS_ENTRY.search(dict_bytes)
+    if match:
+        raw = match.group(1)
+        elements = [raw] if raw.startswith(b"<<") else _PARMS_ELEMENT.findall(raw)
+        for i, element in enumerate(elements[: len(filters)]):
+            if element != b"null":
+                parms[i] = {
+                    k.decode("latin-1"): int(v) for k, v in _INT_PARAM.findall(element)
+                }
+    return filters, parms
+
+
+def _decode_ascii_hex(data):
+    data = _WHITESPACE.sub(b"", bytes(data))
+    end = data.find(b">")
+    if end != -1:
+        data = data[:end]
+    if len(data) % 2:
+        data += b"0"
+    return binascii.unhexlify(data)
+
+
+def _decode_ascii85(data):
+    data = _WHITESPACE.sub(b"", bytes(data))
+    if data.startswith(b"<~"):
+        data = data[2:]
+    end = data.find(b"~>")
+    if end != -1:
+        data = data[:end]
+    return base64.a85decode(data)
+
+
+def _paeth(a, b, c):
+    p = a + b - c
+    pa, pb, pc = abs(p - a), abs(p - b), abs(p - c)
+    if pa <= pb and pa <= pc:
+        return a
+    return b if pb <= pc else c
+
+
+def apply_predictor(data, parms):
+    """Undo a TIFF (2) or PNG (>= 10) predictor over whole rows of data."""
+    predictor = parms.get("Predictor", 1)
+    if predictor == 1:
+        return data
+    colors = parms.get("Colors", 1)
+    bpc = parms.get("BitsPerComponent", 8)
+    columns = parms.get("Columns", 1)
+    bpp = max(1, colors * bpc // 8)
+    row_len = (colors * bpc * columns + 7) // 8
+
+    if predictor == 2:
+        out = bytearray(data)
+        for start in range(0, len(out) - len(out) % row_len, row_len):
+            for i in range(start + bpp, start + row_len):
+                out[i] = (out[i] + out[i - bpp]) & 0xFF
+        return bytes(out)
+
+    out = bytearray()
+    prev = bytearray(row_len)
+    stride = row_len + 1
+    for start in range(0, len(data) - len(data) % stride, stride):
+        kind = data[start]
+        row = bytearray(data[start + 1 : start + stride])
+        if kind == 1:
+            for i in range(bpp, row_len):
+                row[i] = (row[i] + row[i - bpp]) & 0xFF
+        elif kind == 2:
+            for i in range(row_len):
+                row[i] = (row[i] + prev[i]) & 0xFF
+        elif kind == 3:
+            for i in range(row_len):
+                left = row[i - bpp] if i >= bpp else 0
+                row[i] = (row[i] + ((left + prev[i]) >> 1)) & 0xFF
+        elif kind == 4:
+            for i in range(row_len):
+                left = row[i - bpp] if i >= bpp else 0
+                up_left = prev[i - bpp] if i >= bpp else 0
+                row[i] = (row[i] + _paeth(left, prev[i], up_left)) & 0xFF
+        out += row
+        prev = row
+    return bytes(out)
+
+
+def _predicted_prefix(data, parms):
+    # Only whole rows can be un-predicted, so trim a peek to a row boundary.
+    if not parms or parms.get("Predictor", 1) == 1:
+        return data
+    colors = parms.get("Colors", 1)
+    bpc = parms.get("BitsPerComponent", 8)
+    row_len = (colors * bpc * parms.get("Columns", 1) + 7) // 8
+    stride = row_len if parms["Predictor"] == 2 else row_len + 1
+    return apply_predictor(data[: len(data) - len(data) % stride], parms)
+
+
+def _looks_like_xml(prefix):
+    prefix = prefix.lstrip(b"\xef\xbb\xbf \t\r\n\x00")
+    return prefix.startswith(b"<") or b"<?xml" in prefix or b"<xfa:" in prefix
+
+
+def _inflate(data, parms, peek, budget):
+    inflater = zlib.decompressobj()
+    limit = budget.stream_limit()
+    chunks = []
+    produced = 0
+    if peek:
+        head = inflater.decompress(data, PEEK_BYTES)
+        if not _looks_like_xml(_predicted_prefix(head, parms)):
+            return None
+        chunks.append(head)
+        produced = len(head)
+        data = inflater.unconsumed_tail
+    while True:
+        chunk = inflater.decompress(data, INFLATE_CHUNK)
+        chunks.append(chunk)
+        produced += len(chunk)
+        budget.check(produced, limit)
+        data = inflater.unconsumed_tail
+        if not data:
+            break
+    # All input is consumed, so zlib holds at most one window of output.
+    chunks.append(inflater.flush())
+    produced += len(chunks[-1])
+    budget.check(produced, limit)
+    decoded = b"".join(chunks)
+    if parms:
+        decoded = apply_predictor(decoded, parms)
+    return decoded
+
+
+def decode_filters(data, filters, parms, peek=False):
+    """
+    Run data through a /Filter chain (names without the leading slash).
+
+    Returns None for image/unsupported filters, for undecodable data, and
+    (when peek is set) for Flate output whose first PEEK_BYTES do not
+    look like XML. Raises DecodeLimitError past the active limits (see
+    decode_budget).
+    """
+    count("streams_attempted")
+    if any(f not in TEXT_FILTERS for f in filters):
+        count("streams_rejected")
+        return None
+    budget = _budget.get() or _STREAM_ONLY
+    budget.check(0, None)
+    try:
+        with stage("inflate"):
+            for i, name in enumerate(filters):
+                last = i == len(filters) - 1
+                if name == "FlateDecode":
+                    data = _inflate(data, parms[i], peek and last, budget)
+                    if data is None:
+                        count("streams_rejected")
+                        return None
+                elif name == "ASCII85Decode":
+                    data = _decode_ascii85(data)
+                elif name == "ASCIIHexDecode":
+                    data = _decode_ascii_hex(data)
+    except (zlib.error, ValueError, binascii.Error):
+        count("streams_rejected")
+        return None
+    budget.charge(len(data))
+    count("streams_decoded")
+    count("bytes_inflated", len(data))
+    return bytes(data)
+
+
+def decode_stream(dict_bytes, body, peek=True):
+    """
+    Decode a stream body according to the /Filter chain in its raw
+    dictionary bytes. Image streams are rejected up front, and unfiltered
+    bodies are only returned if they look like XML when peek is set.
+    """
+    if b"/Subtype /Image" in dict_bytes or b"/Subtype/Image" in dict_bytes:
+        count("streams_attempted")
+        count("streams_rejected")
+        return None
+    filters, parms = parse_stream_filters(dict_bytes)
+    if not filters and peek and not _looks_like_xml(bytes(body[:PEEK_BYTES])):
+        count("streams_attempted")
+        count("streams_rejected")
+        return None
+    return decode_filters(body, filters, parms, peek)
@@ -0,0 +1,116 @@
+"""
+Incremental re-extraction for PDFs that grew by an incremental update.
+
+Adobe Reader saves a form by appending the changed objects and a new
+xref section to the end of the file, leaving the earlier bytes intact.
+The cache remembers each path's last size and content digest; when the
+file has only grown and its first `size` bytes still hash to the old
+digest, the new digest is finished from the appended bytes alone (one
+read of the file, no second hash), and only the xref sections past the
+old end are consulted. If none of them touches the catalog -> AcroForm
+-> XFA -> datasets chain the cached payload is reused as-is; otherwise
+just the new datasets packet is parsed. Either way the caller gets the
+fields that changed since the previous revision.
+"""
+
+import hashlib
+import os
+
+from .cache import _HASH_CHUNK
+from .crypt import EncryptionError
+from .fields import diff_fields
+from .raw import _packet_payload, extract_datasets
+from .xref import Ref, XrefError, XrefResolver
+
+_PATCH_ERRORS = (XrefError, EncryptionError, KeyError, TypeError, ValueError, IndexError)
+
+
+def _digest_after_prefix(file_path, prefix_size, prefix_digest):
+    """
+    Hash file_path once. Returns (digest, prefix_ok) where prefix_ok says
+    whether its first prefix_size bytes hash to prefix_digest.
+    """
+    digest = hashlib.blake2b(digest_size=20)
+    prefix_ok = False
+    remaining = prefix_size
+    with open(file_path, "rb") as f:
+        while remaining > 0:
+            chunk = f.read(min(_HASH_CHUNK, remaining))
+            if not chunk:
+                return digest.hexdigest(), False
+            digest.update(chunk)
+            remaining -= len(chunk)
+        prefix_ok = digest.copy().hexdigest() == prefix_digest
+        while chunk := f.read(_HASH_CHUNK):
+            digest.update(chunk)
+    return digest.hexdigest(), prefix_ok
+
+
+def _xfa_chain(resolver):
+    """Object numbers the datasets packet is reached through."""
+    nums = set()
+    value = resolver.trailer.get("/Root")
+    for key in ("/AcroForm", "/XFA"):
+        if isinstance(value, Ref):
+            nums.add(value.num)
+        value = resolver.resolve(value)
+        value = value.get(key) if isinstance(value, dict) else None
+    if isinstance(value, Ref):
+        nums.add(value.num)
+    xfa = resolver.resolve(value)
+    if isinstance(xfa, list):
+        for ref in xfa[1::2]:
+            if isinstance(ref, Ref):
+                nums.add(ref.num)
+    return nums
+
+
+def _patch(file_path, old_size, previous):
+    """Return the payload for the grown file, reusing previous where possible."""
+    with XrefResolver(file_path) as resolver:
+        updated = resolver.objects_since(old_size)
+        if not updated & _xfa_chain(resolver):
+            return previous
+        packet = resolver.xfa_packets().get("datasets")
+    return _packet_payload(packet) if packet else None
+
+
+def extract_incremental(file_path, cache):
+    """
+    Return (payload, changes, cached) for file_path using cache.
+
+    payload is what raw.extract_datasets would return; changes is the
+    diff against the previously cached revision of the same path, as
+    fields.FieldDiff.to_dict() (None when there is none or nothing changed
+    on disk); cached is True when no extraction work was done at all.
+    """
+    st = os.stat(file_path)
+    seen = cache.last_seen(file_path)
+    if seen and seen[0] == st.st_size and seen[1] == st.st_mtime_ns:
+        payload = cache.get_digest(seen[2])
+        if payload is not None:
+            return payload, None, True
+
+    previous = cache.get_digest(seen[2]) if seen else None
+    grown = previous is not None and st.st_size > seen[0]
+    digest, prefix_ok = _digest_after_prefix(
+        file_path, seen[0] if grown else 0, seen[2] if grown else None
+    )
+    cache.remember(file_path, st, digest)
+
+    payload = cache.get_digest(digest)
+    cached = payload is not None
+    if payload is None and grown and prefix_ok and previous.get("source") == "xref":
+        try:
+            payload = _patch(file_path, seen[0], previous)
+        except _PATCH_ERRORS:
+            payload = None
+    if payload is None:
+        payload = extract_datasets(file_path)
+    if not cached:
+        cache.put_digest(digest, payload)
+
+    changes = None
+    if previous is not None and seen[2] != digest:
+        changes = diff_fields(previous["field_paths"], payload["field_paths"]).to_dict()
+    return payload, changes, cached
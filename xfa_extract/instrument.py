@@ -0,0 +1,279 @@
+"""
+Opt-in instrumentation for the extraction pipeline.
+
+Hot paths wrap units of work in stage(name) and report volumes with
+count(name, n). Outside tracing() both are a context-variable lookup
+that returns a shared no-op, so disabled instrumentation costs well
+under a microsecond per stream. Inside it they fill a Trace:
+
+    with tracing() as trace:
+        extract_datasets(path)
+    trace.to_dict()
+    # {"elapsed_ms": 41.2,
+    #  "stages": {"xref": {"calls": 1, "ms": 0.9}, "inflate": {...}, ...},
+    #  "counters": {"bytes_read": 18234, "streams_decoded": 2, ...}}
+    print_trace(trace.to_dict())  # the same, as text on stderr
+
+Stages (times are inclusive of nested stages):
+
+    xref        loading the cross-reference chain
+    scan        the stream-scan fallback as a whole (its inflate and
+                parse stages nest inside)
+    decrypt     per-object stream decryption
+    inflate     running a /Filter chain
+    parse       XML parsing of a candidate or datasets packet
+    flatten     bare-tag flattening of the parsed tree
+    fields      building the SOM path -> value map
+    pypdf_open  opening a document with pypdf
+    pypdf_read  pypdf object resolution and stream decoding
+
+Counters: bytes_read (xref reads), bytes_mapped (size of files walked by
+the stream scan; bodies are skipped, not read), objects_scanned (object
+headers the scan stepped over), bytes_inflated (filter output),
+streams_attempted, streams_decoded, streams_rejected, xml_bytes_parsed,
+and the pypdf engine's cache results: pypdf_object_hits,
+pypdf_object_misses, pypdf_stream_hits and pypdf_stream_misses.
+
+With allocations=True tracemalloc runs for the duration; each stage also
+reports the net bytes it left allocated and the trace its peak. With
+spans=True every stage is recorded as a span and write_spans() appends
+the trace to a file as OTLP/JSON, one ExportTraceServiceRequest per line
+(what the OpenTelemetry Collector's file exporter writes and its
+otlpjsonfile receiver reads), so no OpenTelemetry SDK is needed here.
+"""
+
+import json
+import os
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+_current = ContextVar("xfa_extract_trace", default=None)
+
+SERVICE_NAME = "xfa_extract"
+# OTLP span kind and status codes.
+_SPAN_KIND_INTERNAL = 1
+_STATUS_ERROR = 2
+
+
+class _NullStage:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_STAGE = _NullStage()
+
+
+class _Stage:
+    __slots__ = ("trace", "name", "start", "alloc", "span")
+
+    def __init__(self, trace, name):
+        self.trace = trace
+        self.name = name
+        self.alloc = 0
+        self.span = None
+
+    def __enter__(self):
+        trace = self.trace
+        if trace.allocations:
+            self.alloc = tracemalloc.get_traced_memory()[0]
+        if trace.spans is not None:
+            self.span = trace._open_span(self.name)
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        elapsed = time.perf_counter_ns() - self.start
+        trace = self.trace
+        totals = trace.stages.get(self.name)
+        if totals is None:
+            totals = trace.stages[self.name] = [0, 0, 0]
+        totals[0] += 1
+        totals[1] += elapsed
+        if trace.allocations:
+            totals[2] += tracemalloc.get_traced_memory()[0] - self.alloc
+        if self.span is not None:
+            trace._close_span(self.span, exc)
+        return False
+
+
+class Trace:
+    """Stage timings, counters and (optionally) spans for one traced run."""
+
+    def __init__(self, name="extract", spans=False, allocations=False, attributes=None):
+        self.name = name
+        self.attributes = dict(attributes or {})
+        self.allocations = allocations
+        # name -> [calls, nanoseconds, net allocated bytes]
+        self.stages = {}
+        self.counters = {}
+        self.elapsed_ns = 0
+        self.peak_alloc_bytes = None
+        self.trace_id = os.urandom(16).hex()
+        self.spans = [] if spans else None
+        self._open = []
+
+    def count(self, name, n=1):
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def _open_span(self, name, attributes=None):
+        span = {
+            "spanId": os.urandom(8).hex(),
+            "parentSpanId": self._open[-1]["spanId"] if self._open else "",
+            "name": name,
+            "start": time.time_ns(),
+            "attributes": attributes or {},
+        }
+        self._open.append(span)
+        return span
+
+    def _close_span(self, span, exc=None):
+        span["end"] = time.time_ns()
+        if exc is not None:
+            span["error"] = f"{type(exc).__name__}: {exc}"
+        self._open.remove(span)
+        self.spans.append(span)
+
+    def to_dict(self):
+        stages = {}
+        for name, (calls, ns, alloc) in sorted(self.stages.items()):
+            stages[name] = {"calls": calls, "ms": round(ns / 1e6, 3)}
+            if self.allocations:
+                stages[name]["alloc_bytes"] = alloc
+        data = {
+            "elapsed_ms": round(self.elapsed_ns / 1e6, 3),
+            "stages": stages,
+            "counters": dict(sorted(self.counters.items())),
+        }
+        if self.peak_alloc_bytes is not None:
+            data["peak_alloc_bytes"] = self.peak_alloc_bytes
+        return data
+
+
+def current():
+    """Return the active Trace, or None when instrumentation is off."""
+    return _current.get()
+
+
+def stage(name):
+    """Context manager timing one unit of work under the active trace."""
+    trace = _current.get()
+    return _NULL_STAGE if trace is None else _Stage(trace, name)
+
+
+def count(name, n=1):
+    """Add n to counter name of the active trace, if any."""
+    trace = _current.get()
+    if trace is not None:
+        trace.counters[name] = trace.counters.get(name, 0) + n
+
+
+def print_trace(trace, file=None):
+    """Print a Trace.to_dict() summary, one stage or counter per line."""
+    file = file or sys.stderr
+    print("\n--- Trace ---", file=file)
+    for name, totals in trace["stages"].items():
+        print(f"{name}: {totals['ms']:.3f} ms ({totals['calls']} calls)", file=file)
+    for name, value in trace["counters"].items():
+        print(f"{name}: {value}", file=file)
+
+
+@contextmanager
+def tracing(name="extract", spans=False, allocations=False, **attributes):
+    """
+    Activate a Trace for the enclosed block (and anything it calls in the
+    same thread or task) and yield it. attributes are attached to the
+    root span. Nested tracing() blocks shadow the outer one.
+    """
+    trace = Trace(name, spans, allocations, attributes)
+    started_tracemalloc = allocations and not tracemalloc.is_tracing()
+    if started_tracemalloc:
+        tracemalloc.start()
+    if allocations:
+        tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+    root = trace._open_span(name, trace.attributes) if spans else None
+    token = _current.set(trace)
+    start = time.perf_counter_ns()
+    error = None
+    try:
+        yield trace
+    except BaseException as e:
+        error = e
+        raise
+    finally:
+        trace.elapsed_ns = time.perf_counter_ns() - start
+        _current.reset(token)
+        if root is not None:
+            trace._close_span(root, error)
+        if allocations:
+            trace.peak_alloc_bytes = tracemalloc.get_traced_memory()[1] - baseline
+            if started_tracemalloc:
+                tracemalloc.stop()
+
+
+# -- OTLP/JSON export -----------------------------------------------------------
+
+
+def _otlp_value(value):
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}  # int64 is a string in OTLP/JSON
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _otlp_attributes(attributes):
+    return [{"key": k, "value": _otlp_value(v)} for k, v in attributes.items()]
+
+
+def _otlp_span(trace, span):
+    attributes = dict(span["attributes"])
+    if not span["parentSpanId"]:
+        # Counters describe the whole run; hang them off the root span.
+        attributes.update((f"xfa.{k}", v) for k, v in trace.counters.items())
+    otlp = {
+        "traceId": trace.trace_id,
+        "spanId": span["spanId"],
+        "parentSpanId": span["parentSpanId"],
+        "name": span["name"],
+        "kind": _SPAN_KIND_INTERNAL,
+        "startTimeUnixNano": str(span["start"]),
+        "endTimeUnixNano": str(span["end"]),
+        "attributes": _otlp_attributes(attributes),
+    }
+    if "error" in span:
+        otlp["status"] = {"code": _STATUS_ERROR, "message": span["error"]}
+    return otlp
+
+
+def write_spans(trace, path):
+    """Append trace's spans to path as one OTLP/JSON line."""
+    if trace.spans is None:
+        raise ValueError("trace was not recorded with spans=True")
+    request = {
+        "resourceSpans": [
+            {
+                "resource": {
+                    "attributes": _otlp_attributes({"service.name": SERVICE_NAME})
+                },
+                "scopeSpans": [
+                    {
+                        "scope": {"name": __name__},
+                        "spans": [_otlp_span(trace, s) for s in trace.spans],
+                    }
+                ],
+            }
+        ]
+    }
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(request, ensure_ascii=False) + "\n")
@@ -0,0 +1,71 @@
+"""
+Process-pool map that survives crashing workers.
+
+Shared by the batch extractor and scripts/generate_audit_pdf.py, so the
+crash handling has one implementation.
+"""
+
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+
+
+def pool_map(job, items, workers, max_pending, failed, initializer=None, initargs=()):
+    """
+    Yield job(item) for each of items from a process pool, in completion
+    order, with at most max_pending items in flight.
+
+    A worker that dies (BrokenProcessPool) takes down every item in
+    flight, so those are retried one at a time on a fresh pool: only an
+    item that breaks the pool on its own is given up on, yielding
+    failed(item, error) in place of its result.
+    """
+    new_pool = partial(
+        ProcessPoolExecutor,
+        max_workers=workers,
+        initializer=initializer,
+        initargs=initargs,
+    )
+    executor = new_pool()
+    items = iter(items)
+    pending = {}
+    suspects = deque()
+    try:
+        while True:
+            alone = bool(suspects)
+            if alone:
+                item = suspects.popleft()
+                pending[executor.submit(job, item)] = item
+            else:
+                for item in items:
+                    pending[executor.submit(job, item)] = item
+                    if len(pending) >= max_pending:
+                        break
+            if not pending:
+                return
+
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            broken = False
+            while done:
+                for future in done:
+                    item = pending.pop(future)
+                    try:
+                        result = future.result()
+                    except BrokenProcessPool as e:
+                        broken = True
+                        if alone:
+                            yield failed(item, f"BrokenProcessPool: {e}")
+                        else:
+                            suspects.append(item)
+                    else:
+                        yield result
+                # A broken pool resolves all its futures; collect the rest.
+                done = wait(pending)[0] if broken and pending else ()
+            if broken:
+                # Its workers are already gone; joining it is quick and keeps
+                # its wake-up pipe from being written to after close.
+                executor.shutdown(wait=True, cancel_futures=True)
+                executor = new_pool()
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
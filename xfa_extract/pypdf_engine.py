@@ -0,0 +1,279 @@
+"""
+pypdf-backed XFA extraction engine.
+
+Imported lazily by the API so the native engine never pays for pypdf.
+All object access goes through a CachedResolver, so multi-pass work on
+one document (catalog -> AcroForm -> XFA, the /Fields tree) resolves,
+decrypts and decodes each object at most once.
+"""
+
+from collections import OrderedDict
+from functools import partial
+
+from pypdf import PdfReader
+from pypdf.generic import ArrayObject, IndirectObject, NameObject
+
+from .acroform import field_text, iter_acroform_fields, merge_fields
+from .datasets import parse_data_packet
+from .fields import iter_field_paths
+from .instrument import count, stage
+
+
+def resolve_obj(obj):
+    if isinstance(obj, IndirectObject):
+        return obj.get_object()
+    return obj
+
+
+def open_reader(file_path):
+    """Open file_path with pypdf, trying the empty user password if encrypted."""
+    with stage("pypdf_open"):
+        reader = PdfReader(file_path)
+        if reader.is_encrypted:
+            reader.decrypt("")
+    return reader
+
+
+class CachedResolver:
+    """
+    Memoising front end to a PdfReader.
+
+    Resolved objects are kept in an LRU bounded by max_objects and decoded
+    stream bodies in an LRU bounded by max_stream_bytes, both keyed by
+    (object number, generation). Direct (inline) objects are returned
+    as-is and never cached. Hits and misses are kept on the resolver
+    (stats()) and reported to the active trace as pypdf_object_hits,
+    pypdf_object_misses, pypdf_stream_hits and pypdf_stream_misses.
+    """
+
+    def __init__(self, reader, max_objects=4096, max_stream_bytes=64 * 1024 * 1024):
+        self.reader = reader
+        self.max_objects = max_objects
+        self.max_stream_bytes = max_stream_bytes
+        self._objects = OrderedDict()
+        self._streams = OrderedDict()
+        self._stream_bytes = 0
+        self.object_hits = 0
+        self.object_misses = 0
+        self.stream_hits = 0
+        self.stream_misses = 0
+
+    def resolve(self, obj):
+        """Follow indirect references to the underlying object."""
+        while isinstance(obj, IndirectObject):
+            key = (obj.idnum, obj.generation)
+            cached = self._objects.get(key)
+            if cached is not None:
+                self._objects.move_to_end(key)
+                self.object_hits += 1
+                count("pypdf_object_hits")
+                obj = cached
+                continue
+            self.object_misses += 1
+            count("pypdf_object_misses")
+            with stage("pypdf_read"):
+                obj = obj.get_object()
+            self._objects[key] = obj
+            if len(self._objects) > self.max_objects:
+                self._objects.popitem(last=False)
+        return obj
+
+    def stream_data(self, obj):
+        """Return the decoded body of a stream (or a reference to one)."""
+        key = (obj.idnum, obj.generation) if isinstance(obj, IndirectObject) else None
+        if key is not None and key in self._streams:
+            self._streams.move_to_end(key)
+            self.stream_hits += 1
+            count("pypdf_stream_hits")
+            return self._streams[key]
+        self.stream_misses += 1
+        count("pypdf_stream_misses")
+        stream = self.resolve(obj)
+        with stage("pypdf_read"):
+            data = stream.get_data()
+        if key is not None and len(data) <= self.max_stream_bytes:
+            self._streams[key] = data
+            self._stream_bytes += len(data)
+            while self._stream_bytes > self.max_stream_bytes:
+                _, evicted = self._streams.popitem(last=False)
+                self._stream_bytes -= len(evicted)
+        return data
+
+    @property
+    def root(self):
+        return self.resolve(self.reader.trailer["/Root"])
+
+    def stats(self):
+        return {
+            "object_hits": self.object_hits,
+            "object_misses": self.object_misses,
+            "objects_cached": len(self._objects),
+            "stream_hits": self.stream_hits,
+            "stream_misses": self.stream_misses,
+            "stream_bytes_cached": self._stream_bytes,
+        }
+
+
+def open_resolver(file_path, reader=None):
+    """
+    Return a CachedResolver for file_path. reader may be an open PdfReader
+    (wrapped) or an existing CachedResolver (returned unchanged).
+    """
+    if isinstance(reader, CachedResolver):
+        return reader
+    return CachedResolver(reader or open_reader(file_path))
+
+
+def read_xfa_packets(file_path, packets=("datasets",), reader=None):
+    """
+    Return {packet name: bytes} for the requested packets of the /XFA array,
+    in document order. Only those streams are decoded; pass packets=None to
+    decode every packet, including the template. A single-stream /XFA cannot
+    be split and is returned whole under the name "xdp". reader may be a
+    PdfReader or a CachedResolver to share with other passes.
+    """
+    resolver = open_resolver(file_path, reader)
+    acroform = resolver.resolve(resolver.root["/AcroForm"])
+    xfa_ref = acroform["/XFA"]
+    xfa = resolver.resolve(xfa_ref)
+
+    if isinstance(xfa, list) or isinstance(xfa, ArrayObject):
+        result = {}
+        for i in range(0, len(xfa) - 1, 2):
+            name = str(resolver.resolve(xfa[i]))
+            if packets is not None and name not in packets:
+                continue
+            if hasattr(resolver.resolve(xfa[i + 1]), "get_data"):
+                result[name] = resolver.stream_data(xfa[i + 1])
+        return result
+    if hasattr(xfa, "get_data"):
+        return {"xdp": resolver.stream_data(xfa_ref)}
+    return {}
+
+
+def read_xfa_xml(file_path, packets=None):
+    """Return the XFA packet streams of file_path joined into one bytes object."""
+    return b"".join(read_xfa_packets(file_path, packets).values())
+
+
+def find_data_packet(root_xml):
+    """Return the xfa:datasets/xfa:data element of a parsed XFA tree, or None."""
+    for elem in root_xml.iter():
+        if "datasets" in elem.tag:
+            for child in elem:
+                if "data" in child.tag:
+                    return child
+    return None
+
+
+def flatten_tree(elem):
+    """Return the {tag: text} pairs dump_tree would print for elem's subtree."""
+    fields = {}
+    for node in elem.iter():
+        text = node.text.strip() if node.text else ""
+        if text:
+            fields[node.tag.split("}")[-1]] = text
+    return fields
+
+
+def _data_packet(xml_bytes):
+    if not xml_bytes:
+        return None
+    count("xml_bytes_parsed", len(xml_bytes))
+    with stage("parse"):
+        return parse_data_packet(xml_bytes)
+
+
+def extract_datasets(file_path):
+    """
+    pypdf counterpart of raw.extract_datasets: reads only the datasets
+    packet and returns the same dict shape, with source "pypdf".
+    """
+    packets = read_xfa_packets(file_path)
+    xml_bytes = packets.get("datasets") or packets.get("xdp") or b""
+    data_packet = _data_packet(xml_bytes)
+    if data_packet is None:
+        return {
+            "candidates": 0,
+            "datasets": None,
+            "fields": {},
+            "field_paths": {},
+            "source": "pypdf",
+        }
+    with stage("fields"):
+        field_paths = dict(sorted(iter_field_paths(data_packet)))
+    return {
+        "candidates": 1,
+        "datasets": xml_bytes.decode("utf-8", errors="ignore"),
+        "fields": flatten_tree(data_packet),
+        "field_paths": field_paths,
+        "source": "pypdf",
+    }
+
+
+def read_acroform_fields(file_path, reader=None):
+    """Return {fully qualified name: value} for the AcroForm /Fields tree."""
+    resolver = open_resolver(file_path, reader)
+    acroform = resolver.resolve(resolver.root.get("/AcroForm"))
+    if not isinstance(acroform, dict):
+        return {}
+    text = partial(field_text, name_type=NameObject)
+    return dict(iter_acroform_fields(acroform.get("/Fields"), resolver.resolve, text))
+
+
+def _acroform_payload(names):
+    return {
+        "candidates": len(names),
+        "datasets": None,
+        "fields": {name.rsplit(".", 1)[-1]: value for name, value in names.items()},
+        "field_paths": dict(sorted(names.items())),
+        "source": "pypdf-acroform",
+    }
+
+
+def extract_acroform(file_path):
+    """Return AcroForm widget values keyed by fully qualified field name."""
+    return _acroform_payload(read_acroform_fields(file_path))
+
+
+def extract_form(file_path):
+    """
+    pypdf counterpart of raw.extract_form: one CachedResolver serves both
+    the datasets packet and the AcroForm values, which are merged and
+    diffed.
+    """
+    resolver = open_resolver(file_path)
+    names = read_acroform_fields(file_path, resolver)
+    try:
+        packets = read_xfa_packets(file_path, reader=resolver)
+    except KeyError:  # AcroForm-only document
+        packets = {}
+    xml_bytes = packets.get("datasets") or packets.get("xdp") or b""
+    data_packet = _data_packet(xml_bytes)
+    if data_packet is None:
+        payload = _acroform_payload(names)
+        payload["form_diff"] = merge_fields({}, names)[1]
+        return payload
+    field_paths, form_diff = merge_fields(dict(iter_field_paths(data_packet)), names)
+    return {
+        "candidates": 1,
+        "datasets": xml_bytes.decode("utf-8", errors="ignore"),
+        "fields": flatten_tree(data_packet),
+        "field_paths": field_paths,
+        "form_diff": form_diff,
+        "source": "pypdf+acroform",
+    }
+
+
+def extract_text(file_path):
+    """Return the text layer of every page, for PDFs without form data."""
+    reader = open_reader(file_path)
+    text = "\n".join(page.extract_text() or "" for page in reader.pages)
+    return {
+        "candidates": 0,
+        "datasets": None,
+        "fields": {},
+        "field_paths": {},
+        "text": text,
+        "source": "text",
+    }
@@ -0,0 +1,137 @@
+"""
+Native (dependency-free) XFA extraction engine: xref-directed packet
+lookup with a stream-scan fallback.
+"""
+
+from .acroform import iter_acroform_fields, merge_fields
+from .crypt import EncryptionError
+from .datasets import extract_text_from_xml
+from .fields import iter_field_paths
+from .instrument import stage
+from .scanner import iter_xfa_candidates
+from .xref import XrefError, XrefResolver, read_xfa_packets
+
+_XREF_ERRORS = (XrefError, KeyError, TypeError, ValueError, IndexError)
+
+
+def _packet_payload(packet):
+    fields, root = extract_text_from_xml(packet, datasets_only=True)
+    with stage("fields"):
+        field_paths = dict(sorted(iter_field_paths(root))) if root is not None else {}
+    return {
+        "candidates": 1,
+        "datasets": packet.decode("utf-8", errors="ignore"),
+        "fields": fields,
+        "field_paths": field_paths,
+        "source": "xref",
+    }
+
+
+def extract_datasets(file_path):
+    """
+    Return a JSON-serialisable dict with the datasets packet (str or None),
+    the flattened field map keyed by bare tag ("fields"), the collision-free
+    map keyed by SOM path ("field_paths", see fields), the number of XML
+    candidates seen and the source ("xref" or "scan").
+
+    The datasets packet is first resolved through the cross-reference
+    table, which reads only a few KB; files without usable xref data or
+    without an /XFA array fall back to a full stream scan. Encrypted files
+    are decrypted object by object; if they cannot be opened the
+    EncryptionError is raised, since scanning ciphertext finds nothing.
+    """
+    try:
+        packet = read_xfa_packets(file_path).get("datasets")
+    except EncryptionError:
+        raise
+    except _XREF_ERRORS:
+        packet = None
+    if packet:
+        return _packet_payload(packet)
+    return _scan_datasets(file_path)
+
+
+def _scan_datasets(file_path):
+    datasets = None
+    fields = {}
+    field_paths = {}
+    candidates = 0
+    with stage("scan"):
+        for xml_bytes in iter_xfa_candidates(file_path):
+            candidates += 1
+            if b"form1" in xml_bytes or b"datasets" in xml_bytes:
+                data, root = extract_text_from_xml(xml_bytes, datasets_only=True)
+                if root is not None:
+                    with stage("fields"):
+                        field_paths.update(iter_field_paths(root))
+                else:
+                    data, root = extract_text_from_xml(xml_bytes)
+                    if root is not None:
+                        with stage("fields"):
+                            field_paths.update(
+                                iter_field_paths(root, include_root=True)
+                            )
+                fields.update(data)
+                if datasets is None and b"datasets" in xml_bytes:
+                    datasets = xml_bytes.decode("utf-8", errors="ignore")
+    return {
+        "candidates": candidates,
+        "datasets": datasets,
+        "fields": fields,
+        "field_paths": dict(sorted(field_paths.items())),
+        "source": "scan",
+    }
+
+
+def _acroform_names(resolver):
+    acroform = resolver.resolve(resolver.catalog().get("/AcroForm"))
+    if not isinstance(acroform, dict):
+        return {}
+    return dict(iter_acroform_fields(acroform.get("/Fields"), resolver.resolve))
+
+
+def _acroform_payload(names, source):
+    return {
+        "candidates": len(names),
+        "datasets": None,
+        "fields": {name.rsplit(".", 1)[-1]: value for name, value in names.items()},
+        "field_paths": dict(sorted(names.items())),
+        "source": source,
+    }
+
+
+def extract_acroform(file_path):
+    """
+    Return AcroForm widget values (/V) keyed by fully qualified field name,
+    in the same dict shape as extract_datasets, with source "acroform".
+    """
+    with XrefResolver(file_path) as resolver:
+        return _acroform_payload(_acroform_names(resolver), "acroform")
+
+
+def extract_form(file_path):
+    """
+    Extract the XFA datasets and the AcroForm values through one resolver
+    and merge them (see acroform.merge_fields): XFA wins, AcroForm fills
+    the paths XFA lacks, and "form_diff" reports where the two disagree.
+    Falls back to extract_datasets when the xref cannot be used.
+    """
+    try:
+        with XrefResolver(file_path) as resolver:
+            names = _acroform_names(resolver)
+            packet = resolver.xfa_packets().get("datasets")
+    except EncryptionError:
+        raise
+    except _XREF_ERRORS:
+        return extract_datasets(file_path)
+
+    if not packet:
+        payload = _acroform_payload(names, "acroform")
+        payload["form_diff"] = merge_fields({}, names)[1]
+        return payload
+    payload = _packet_payload(packet)
+    payload["field_paths"], payload["form_diff"] = merge_fields(
+        payload["field_paths"], names
+    )
+    payload["source"] = "xref+acroform"
+    return payload
@@ -0,0 +1,44 @@
+"""Typed result objects returned by the extraction API."""
+
+from dataclasses import asdict, dataclass, field, fields
+from typing import Optional
+
+from .fields import FieldMap
+
+
+@dataclass
+class ExtractionResult:
+    """Outcome of extracting one PDF. Never raised; check ok/error."""
+
+    file: str
+    engine: str
+    route: Optional[str] = None
+    ok: bool = True
+    error: Optional[str] = None
+    source: Optional[str] = None
+    candidates: int = 0
+    datasets: Optional[str] = None
+    fields: dict[str, str] = field(default_factory=dict)
+    field_paths: dict[str, str] = field(default_factory=dict)
+    form_diff: Optional[dict] = None
+    changes: Optional[dict] = None
+    text: Optional[str] = None
+    cached: bool = False
+    elapsed_ms: float = 0.0
+    trace: Optional[dict] = None
+
+    @property
+    def field_map(self) -> FieldMap:
+        """The field_paths as a sorted, prefix-searchable FieldMap."""
+        return FieldMap.from_dict(self.field_paths)
+
+    def to_dict(self, include_datasets: bool = True) -> dict:
+        data = asdict(self)
+        if not include_datasets:
+            data.pop("datasets")
+        return data
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "ExtractionResult":
+        names = {f.name for f in fields(cls)}
+        return cls(**{k: v for k, v in data.items() if k in names})
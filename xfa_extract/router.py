@@ -0,0 +1,181 @@
+"""
+Per-document engine routing.
+
+Classifies a PDF with a cheap probe and hands it to the cheapest engine
+that can handle it:
+
+    xfa_dynamic   /XFA, no AcroForm widgets       -> raw
+    xfa_static    /XFA plus /Fields widgets       -> form
+    xfa_encrypted /XFA behind unsupported /Encrypt -> pypdf
+    acroform      /Fields without /XFA            -> acroform
+    text          pages with fonts, no form       -> text
+    scanned       pages with images only          -> none
+    unknown       probe found nothing usable      -> raw
+
+The probe goes trailer -> /Root -> /AcroForm through the xref and looks
+at the first few pages' resources, so it reads a few kilobytes rather
+than the whole file. Damaged files, and encrypted ones the native
+security handler cannot open, fall back to a one-pass profile without
+inflating streams. Each route keeps counters of files,
+failures, probe time and extraction time.
+"""
+
+import time
+
+from .api import extract as extract_with
+from .crypt import EncryptionError
+from .xref import Ref, Stream, XrefError, XrefResolver
+
+ROUTE_ENGINES = {
+    "xfa_dynamic": "raw",
+    "xfa_static": "form",
+    "xfa_encrypted": "pypdf",
+    "acroform": "acroform",
+    "text": "text",
+    "scanned": "none",
+    "unknown": "raw",
+}
+
+# Leaf pages inspected when deciding between text and scanned.
+PROBE_PAGES = 3
+# Image share above which a profiled (non-probed) file counts as scanned.
+SCANNED_IMAGE_SHARE = 0.9
+
+
+def _page_kind(resolver, resources):
+    resources = resolver.resolve(resources)
+    if not isinstance(resources, dict):
+        return None
+    if resolver.resolve(resources.get("/Font")):
+        return "text"
+    xobjects = resolver.resolve(resources.get("/XObject"))
+    if isinstance(xobjects, dict):
+        for ref in xobjects.values():
+            xobject = resolver.resolve(ref)
+            if isinstance(xobject, Stream) and xobject.get("/Subtype") == "/Image":
+                return "scanned"
+    return None
+
+
+def _probe_pages(resolver, catalog):
+    """Classify by the resources of the first PROBE_PAGES leaf pages."""
+    stack = [(catalog.get("/Pages"), None)]
+    seen = set()
+    kinds = []
+    while stack and len(kinds) < PROBE_PAGES:
+        ref, inherited = stack.pop()
+        if isinstance(ref, Ref):
+            if ref.num in seen:
+                continue
+            seen.add(ref.num)
+        node = resolver.resolve(ref)
+        if not isinstance(node, dict):
+            continue
+        resources = node.get("/Resources", inherited)
+        kids = resolver.resolve(node.get("/Kids"))
+        if isinstance(kids, list):
+            stack.extend((kid, resources) for kid in reversed(kids))
+        else:
+            kinds.append(_page_kind(resolver, resources))
+    if "text" in kinds:
+        return "text"
+    if "scanned" in kinds:
+        return "scanned"
+    return "unknown"
+
+
+def _probe_xref(file_path):
+    with XrefResolver(file_path) as resolver:
+        # Encrypted files we can open (empty user password, Standard
+        # handler) route like plain ones; catalog() raises otherwise.
+        catalog = resolver.catalog()
+        acroform = resolver.resolve(catalog.get("/AcroForm"))
+        if isinstance(acroform, dict):
+            has_xfa = acroform.get("/XFA") is not None
+            fields = resolver.resolve(acroform.get("/Fields"))
+            if has_xfa:
+                if catalog.get("/NeedsRendering") is True or not fields:
+                    return "xfa_dynamic"
+                return "xfa_static"
+            if fields:
+                return "acroform"
+        return _probe_pages(resolver, catalog)
+
+
+def _probe_profile(file_path):
+    # Imported here so `python -m xfa_extract.profile` runs a fresh module.
+    from .profile import profile_pdf
+
+    profile = profile_pdf(file_path, measure_uncompressed=False)
+    if profile.has_xfa:
+        return "xfa_encrypted" if profile.encrypted else "xfa_dynamic"
+    if profile.has_acroform:
+        return "acroform"
+    if profile.image_share > SCANNED_IMAGE_SHARE:
+        return "scanned"
+    return "text" if profile.text_bytes else "unknown"
+
+
+def classify(file_path):
+    """Return the route name for file_path (see ROUTE_ENGINES)."""
+    try:
+        return _probe_xref(file_path)
+    except (XrefError, EncryptionError, KeyError, TypeError, ValueError, IndexError):
+        return _probe_profile(file_path)
+
+
+class Router:
+    """Classifies documents, dispatches them and counts time per route."""
+
+    def __init__(self, routes=None):
+        self.routes = dict(ROUTE_ENGINES, **(routes or {}))
+        self._stats = {}
+
+    def _count(self, route):
+        stats = self._stats.get(route)
+        if stats is None:
+            stats = self._stats[route] = {
+                "files": 0,
+                "failed": 0,
+                "probe_ms": 0.0,
+                "extract_ms": 0.0,
+            }
+        return stats
+
+    def extract(self, file_path, cache=None):
+        """Classify file_path and extract it with the route's engine."""
+        start = time.perf_counter()
+        try:
+            route = classify(file_path)
+        except Exception:
+            route = "unknown"
+        probe_ms = (time.perf_counter() - start) * 1000
+
+        result = extract_with(file_path, self.routes[route], cache)
+        result.route = route
+        stats = self._count(route)
+        stats["files"] += 1
+        stats["failed"] += not result.ok
+        stats["probe_ms"] += probe_ms
+        stats["extract_ms"] += result.elapsed_ms
+        result.elapsed_ms = round(result.elapsed_ms + probe_ms, 3)
+        return result
+
+    def stats(self):
+        """Return {route: {files, failed, probe_ms, extract_ms, engine}}."""
+        return {
+            route: dict(
+                stats,
+                engine=self.routes[route],
+                probe_ms=round(stats["probe_ms"], 3),
+                extract_ms=round(stats["extract_ms"], 3),
+            )
+            for route, stats in sorted(self._stats.items())
+        }
+
+    def reset(self):
+        self._stats.clear()
+
+
+# Shared by extract(engine="auto"); one per process.
+default_router = Router()
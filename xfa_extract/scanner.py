@@ -0,0 +1,159 @@
+"""
+Object-aware stream scanner.
+
+Walks `N G obj ... stream` headers over a memory map, slices bodies by
+/Length and yields decoded XML-like payloads. The original whole-file
+regex pass is kept as scanner="regex" for comparison.
+"""
+
+import mmap
+import os
+import re
+from contextlib import contextmanager
+
+from .filters import decode_filters, decode_stream
+from .instrument import count, stage
+
+_OBJ_HEADER = re.compile(rb"(\d+)\s+(\d+)\s+obj\b")
+_STREAM_KEYWORD = re.compile(rb"\bstream(?:\r\n|\n|\r)")
+_LENGTH_ENTRY = re.compile(rb"/Length(?![A-Za-z0-9])\s*(\d+)(\s+\d+\s+R)?")
+_ENDSTREAM_EOL = re.compile(rb"[\r\n]*endstream")
+
+# How far past an object header we look for its `stream` keyword before
+# deciding the object is not a stream. Stream dictionaries are small.
+DICT_WINDOW = 64 * 1024
+
+
+def _is_xml_candidate(decompressed):
+    if (
+        b"<?xml" in decompressed
+        or b"<xfa:" in decompressed
+        or b"<form1" in decompressed
+    ):
+        return True
+    if decompressed.strip().startswith(b"<") and b">" in decompressed:
+        return b"<pdf" not in decompressed and len(decompressed) > 20
+    return False
+
+
+def stream_body_end(buf, dict_bytes, body_start):
+    """
+    Return the end offset of a stream body starting at body_start, using a
+    direct /Length when it lands on `endstream` and a forward search
+    otherwise. Returns -1 if there is no `endstream` at all.
+    """
+    length = _LENGTH_ENTRY.search(dict_bytes)
+    if length and not length.group(2):
+        candidate_end = body_start + int(length.group(1))
+        if candidate_end <= len(buf) and _ENDSTREAM_EOL.match(buf, candidate_end):
+            return candidate_end
+
+    body_end = buf.find(b"endstream", body_start)
+    if body_end == -1:
+        return -1
+    while body_end > body_start and buf[body_end - 1] in b"\r\n":
+        body_end -= 1
+    return body_end
+
+
+@contextmanager
+def mapped(file_path):
+    """Yield a read-only mmap of file_path (b"" for an empty file)."""
+    with open(file_path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            yield b""
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            yield mm
+
+
+def iter_streams(buf):
+    """
+    Walk `N G obj ... stream` headers in buf and yield
+    (obj_num, gen, dict_bytes, body) for each stream object.
+
+    body is a zero-copy memoryview honouring the stream's /Length; it is
+    released when the generator advances, so copy it if you need to keep it.
+    Indirect or wrong /Length values fall back to a forward search for
+    `endstream`. Stream bodies are skipped, never scanned for headers.
+    """
+    view = memoryview(buf)
+    size = len(buf)
+    pos = 0
+    count("bytes_mapped", size)
+    try:
+        while True:
+            header = _OBJ_HEADER.search(buf, pos)
+            if header is None:
+                return
+            count("objects_scanned")
+            head_end = header.end()
+            window_end = min(size, head_end + DICT_WINDOW)
+            endobj = buf.find(b"endobj", head_end, window_end)
+            keyword = _STREAM_KEYWORD.search(
+                buf, head_end, endobj if endobj != -1 else window_end
+            )
+            if keyword is None:
+                pos = endobj + 6 if endobj != -1 else head_end
+                continue
+
+            dict_bytes = bytes(buf[head_end : keyword.start()])
+            body_start = keyword.end()
+            body_end = stream_body_end(buf, dict_bytes, body_start)
+            if body_end == -1:
+                return
+
+            body = view[body_start:body_end]
+            try:
+                yield int(header.group(1)), int(header.group(2)), dict_bytes, body
+            finally:
+                body.release()
+            pos = body_end
+    finally:
+        view.release()
+
+
+def iter_xfa_candidates(file_path):
+    """
+    Memory-map file_path and yield decoded XML-like stream payloads.
+    Runs in memory proportional to the largest stream, not the file.
+    Image and non-text filters are skipped without inflating the body.
+    """
+    with mapped(file_path) as mm:
+        for _num, _gen, dict_bytes, body in iter_streams(mm):
+            decoded = decode_stream(dict_bytes, body)
+            if decoded is not None and _is_xml_candidate(decoded):
+                yield decoded
+
+
+def _find_xfa_data_regex(file_path):
+    with open(file_path, "rb") as f:
+        content = f.read()
+
+    candidates = []
+
+    stream_pattern = re.compile(rb"stream\s*[\r\n]+(.*?)[\r\n]+\s*endstream", re.DOTALL)
+
+    for match in stream_pattern.finditer(content):
+        # Bounded inflate (see filters.DecodeLimits); None if not Flate data.
+        decompressed = decode_filters(match.group(1), ["FlateDecode"], [None])
+        if decompressed is not None and _is_xml_candidate(decompressed):
+            candidates.append(decompressed)
+
+    return candidates
+
+
+def find_xfa_data(file_path, scanner="mmap"):
+    """
+    Return XML-like stream payloads from file_path.
+
+    scanner="mmap" (default) walks object headers over a memory map;
+    scanner="regex" is the original whole-file DOTALL regex pass.
+    """
+    if scanner == "regex":
+        return _find_xfa_data_regex(file_path)
+    if scanner != "mmap":
+        raise ValueError(f"Unknown scanner: {scanner}")
+
+    with stage("scan"):
+        return list(iter_xfa_candidates(file_path))
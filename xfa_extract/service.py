@@ -0,0 +1,374 @@
+"""
+Asyncio extraction service over a Unix socket or stdio.
+
+Speaks the same line-delimited JSON-RPC 2.0 protocol as the worker, but
+serves many clients and many concurrent requests from one process:
+
+- CPU work runs in a process pool, one job per worker at a time;
+- at most --max-pending requests are admitted at once, and at most
+  --max-pending extractions (an extract_many counts once per path) are
+  queued or running; beyond that the service stops reading, so clients
+  feel backpressure instead of an unbounded queue building up;
+- each request may carry a deadline ("timeout" seconds, default
+  --timeout) and can be cancelled with the "cancel" method;
+- simultaneous requests for the same file, engine and datasets flag are
+  coalesced onto one extraction.
+
+Responses are written as jobs finish, so they may arrive out of order;
+match them by id. Methods, in addition to the worker's extract,
+extract_many, ping, stats and shutdown:
+
+    cancel  {id}  -> {"cancelled": bool}; the cancelled request answers
+                     with error -32800
+
+Usage:
+    python3 -m xfa_extract.service [--socket PATH] [--workers N]
+        [--max-pending N] [--timeout SECONDS] [--cache-dir DIR]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from concurrent.futures.process import BrokenProcessPool
+
+from .api import ENGINES
+from .batch import extract_file
+from .worker import INVALID_PARAMS, _error, _handler, _result, _RpcError, parse_request
+
+DEADLINE_EXCEEDED = -32001
+REQUEST_CANCELLED = -32800
+
+DEFAULT_TIMEOUT = 60.0
+# Longest request line accepted (extract_many can carry many paths).
+LINE_LIMIT = 16 * 1024 * 1024
+
+
+def _valid_id(request_id):
+    return isinstance(request_id, (str, int)) and not isinstance(request_id, bool)
+
+
+class _Job:
+    """One extraction shared by every request waiting on the same key."""
+
+    __slots__ = ("key", "future", "waiters", "started")
+
+    def __init__(self, key, future):
+        self.key = key
+        self.future = future
+        self.waiters = 0
+        self.started = False
+
+
+class ExtractionService:
+    """Coalescing, deadline-aware front end to a process pool of extractors."""
+
+    def __init__(
+        self, workers=None, max_pending=None, timeout=DEFAULT_TIMEOUT, cache_dir=None
+    ):
+        self.workers = workers or os.cpu_count() or 1
+        self.max_pending = max_pending or self.workers * 4
+        self.timeout = timeout
+        self.cache_dir = cache_dir
+        self.counters = dict.fromkeys(
+            ("requests", "coalesced", "completed", "failed", "timeouts", "cancelled"), 0
+        )
+        self._pool = None
+        self._queue = None
+        self._jobs = {}
+        self._dispatchers = []
+        self._admission = None
+        self._slots = None
+        self._stopped = None
+        self._connections = {}
+
+    async def start(self):
+        self._pool = ProcessPoolExecutor(max_workers=self.workers)
+        self._queue = asyncio.Queue(maxsize=self.max_pending)
+        self._admission = asyncio.Semaphore(self.max_pending)
+        # One slot per distinct job from enqueue until it finishes.
+        self._slots = asyncio.Semaphore(self.max_pending)
+        self._stopped = asyncio.Event()
+        self._dispatchers = [
+            asyncio.create_task(self._dispatch()) for _ in range(self.workers)
+        ]
+
+    async def close(self):
+        for task in self._dispatchers:
+            task.cancel()
+        await asyncio.gather(*self._dispatchers, return_exceptions=True)
+        for job in self._jobs.values():
+            job.future.cancel()
+        self._jobs.clear()
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    # -- jobs ---------------------------------------------------------------
+
+    async def _dispatch(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            job = await self._queue.get()
+            try:
+                if not job.future.done():  # else every waiter gave up first
+                    await self._run(loop, job)
+            finally:
+                self._slots.release()
+
+    async def _run(self, loop, job):
+        job.started = True
+        path, engine, include_datasets = job.key
+        pool = self._pool
+        try:
+            result = await loop.run_in_executor(
+                pool, extract_file, path, engine, self.cache_dir, include_datasets
+            )
+        except Exception as e:
+            # Every dispatcher on the broken pool lands here; only the first
+            # replaces it, so a later one cannot shut down the new pool.
+            if isinstance(e, BrokenProcessPool) and self._pool is pool:
+                pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = ProcessPoolExecutor(max_workers=self.workers)
+            error = f"{type(e).__name__}: {e}"
+            result = {"file": path, "engine": engine, "ok": False, "error": error}
+        if self._jobs.get(job.key) is job:
+            del self._jobs[job.key]
+        self.counters["completed"] += 1
+        self.counters["failed"] += not result["ok"]
+        if not job.future.done():
+            job.future.set_result(result)
+
+    async def _enqueue(self, job):
+        await self._slots.acquire()
+        await self._queue.put(job)
+
+    async def _wait(self, job, enqueue):
+        if enqueue:
+            # Shielded: if this waiter times out, coalesced waiters still need it queued.
+            await asyncio.shield(self._enqueue(job))
+        return await asyncio.shield(job.future)
+
+    async def extract(self, path, engine="raw", include_datasets=False, timeout=None):
+        """Return the result record for path, sharing any in-flight extraction."""
+        key = (os.path.realpath(path), engine, include_datasets)
+        self.counters["requests"] += 1
+        job = self._jobs.get(key)
+        enqueue = job is None
+        if enqueue:
+            job = self._jobs[key] = _Job(key, asyncio.get_running_loop().create_future())
+        else:
+            self.counters["coalesced"] += 1
+        job.waiters += 1
+        try:
+            result = await asyncio.wait_for(
+                self._wait(job, enqueue), self.timeout if timeout is None else timeout
+            )
+        except asyncio.TimeoutError:
+            self.counters["timeouts"] += 1
+            raise _RpcError(DEADLINE_EXCEEDED, f"Deadline exceeded for {path}")
+        except asyncio.CancelledError:
+            self.counters["cancelled"] += 1
+            raise
+        finally:
+            job.waiters -= 1
+            if not job.waiters and not job.started and not job.future.done():
+                job.future.cancel()
+                if self._jobs.get(key) is job:
+                    del self._jobs[key]
+        # Records are shared between coalesced waiters; hand out copies.
+        return dict(result, file=path)
+
+    # -- RPC methods ---------------------------------------------------------
+
+    def _params(self, params):
+        engine = params.get("engine", "raw")
+        if engine not in ENGINES:
+            raise _RpcError(INVALID_PARAMS, f"Unknown engine: {engine}")
+        timeout = params.get("timeout")
+        if timeout is not None and not isinstance(timeout, (int, float)):
+            raise _RpcError(INVALID_PARAMS, "params.timeout must be a number")
+        return engine, bool(params.get("include_datasets")), timeout
+
+    async def rpc_extract(self, params):
+        path = params.get("path")
+        if not isinstance(path, str):
+            raise _RpcError(INVALID_PARAMS, "params.path must be a string")
+        return await self.extract(path, *self._params(params))
+
+    async def rpc_extract_many(self, params):
+        paths = params.get("paths")
+        if not isinstance(paths, list) or not all(isinstance(p, str) for p in paths):
+            raise _RpcError(INVALID_PARAMS, "params.paths must be a list of strings")
+        args = self._params(params)
+        results = await asyncio.gather(
+            *(self.extract(p, *args) for p in paths), return_exceptions=True
+        )
+        return [
+            {"file": p, "ok": False, "error": str(r)} if isinstance(r, BaseException) else r
+            for p, r in zip(paths, results)
+        ]
+
+    async def rpc_ping(self, params):
+        return {"pid": os.getpid(), "engines": list(ENGINES), "workers": self.workers}
+
+    async def rpc_stats(self, params):
+        return dict(
+            self.counters,
+            in_flight=len(self._jobs),
+            queued=self._queue.qsize(),
+        )
+
+    async def rpc_shutdown(self, params):
+        self._stopped.set()
+        return None
+
+    # -- transport ----------------------------------------------------------
+
+    async def _respond(self, request, write):
+        request_id = request.get("id")
+        try:
+            result = await _handler(self, request)(request["params"])
+            response = _result(request, result)
+        except _RpcError as e:
+            response = _error(request_id, e.code, e.message)
+        except asyncio.CancelledError:
+            response = _error(request_id, REQUEST_CANCELLED, "Request cancelled")
+        finally:
+            self._admission.release()
+        if response is not None and "id" in request:
+            await write(response)
+
+    def _finished(self, request, write, tasks, task):
+        request_id = request.get("id")
+        if _valid_id(request_id) and tasks.get(request_id) is task:
+            del tasks[request_id]
+        if task.cancelled():
+            # Cancelled before it ever ran, so _respond did not clean up.
+            self.counters["cancelled"] += 1
+            self._admission.release()
+            if "id" in request:
+                error = _error(request["id"], REQUEST_CANCELLED, "Request cancelled")
+                asyncio.ensure_future(write(error))
+
+    async def handle_connection(self, reader, writer):
+        """Serve one client until it disconnects or asks for shutdown."""
+        self._connections[reader] = asyncio.current_task()
+        tasks = {}
+        lock = asyncio.Lock()
+
+        async def write(response):
+            line = json.dumps(response, ensure_ascii=False) + "\n"
+            async with lock:
+                try:
+                    writer.write(line.encode("utf-8"))
+                    await writer.drain()
+                except ConnectionError:
+                    pass  # client went away; its requests still finish
+
+        try:
+            while not self._stopped.is_set():
+                try:
+                    line = await reader.readline()
+                except (ValueError, ConnectionError):
+                    break  # over-long line or reset connection
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                request, error = parse_request(line)
+                if error is not None:
+                    await write(error)
+                    continue
+                if request["method"] == "cancel":
+                    params = request["params"]
+                    target = params.get("id") if isinstance(params, dict) else None
+                    task = tasks.get(target) if _valid_id(target) else None
+                    if task is not None:
+                        task.cancel()
+                    response = _result(request, {"cancelled": task is not None})
+                    if response is not None:
+                        await write(response)
+                    continue
+                # Blocks once max_pending requests are in flight: backpressure.
+                await self._admission.acquire()
+                task = asyncio.create_task(self._respond(request, write))
+                task.add_done_callback(partial(self._finished, request, write, tasks))
+                if _valid_id(request.get("id")):
+                    tasks[request["id"]] = task
+            if tasks:
+                await asyncio.gather(*tasks.values(), return_exceptions=True)
+        finally:
+            del self._connections[reader]
+            writer.close()
+
+    async def serve_unix(self, socket_path):
+        server = await asyncio.start_unix_server(
+            self.handle_connection, socket_path, limit=LINE_LIMIT
+        )
+        try:
+            async with server:
+                await self._stopped.wait()
+                # End every read loop as if the client hung up; requests
+                # already admitted still get their responses.
+                handlers = list(self._connections.values())
+                for reader in self._connections:
+                    reader.feed_eof()
+                await asyncio.gather(*handlers, return_exceptions=True)
+        finally:
+            if os.path.exists(socket_path):
+                os.unlink(socket_path)
+
+    async def serve_stdio(self):
+        loop = asyncio.get_running_loop()
+        reader = asyncio.StreamReader(limit=LINE_LIMIT)
+        read_transport, _ = await loop.connect_read_pipe(
+            lambda: asyncio.StreamReaderProtocol(reader), sys.stdin
+        )
+        stdout = os.fdopen(os.dup(sys.__stdout__.fileno()), "wb")
+        transport, protocol = await loop.connect_write_pipe(
+            asyncio.streams.FlowControlMixin, stdout
+        )
+        writer = asyncio.StreamWriter(transport, protocol, reader, loop)
+        # On shutdown, stop reading stdin so the read loop sees EOF (as
+        # serve_unix does with feed_eof) instead of waiting for the caller
+        # to close it; requests already admitted still get their responses.
+        stopped = asyncio.create_task(self._stopped.wait())
+        stopped.add_done_callback(lambda task: read_transport.close())
+        try:
+            await self.handle_connection(reader, writer)
+        finally:
+            stopped.cancel()
+
+
+async def _serve(args):
+    service = ExtractionService(
+        args.workers, args.max_pending, args.timeout, args.cache_dir
+    )
+    await service.start()
+    try:
+        if args.socket:
+            await service.serve_unix(args.socket)
+        else:
+            await service.serve_stdio()
+    finally:
+        await service.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Asyncio XFA extraction service")
+    parser.add_argument("--socket", help="listen on this Unix socket instead of stdio")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--max-pending", type=int, default=None)
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT)
+    parser.add_argument("--cache-dir", help="serve raw-engine results from this cache")
+    args = parser.parse_args(argv)
+    # Keep stray prints from library code off the protocol stream.
+    sys.stdout = sys.stderr
+    asyncio.run(_serve(args))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,198 @@
+"""
+Synthetic XFA PDF generator for benchmarks and engine comparisons.
+
+Produces structurally valid PDFs with an XFA form (preamble, template,
+datasets, postamble packets), optional image streams, object streams
+with an xref stream, and appended incremental updates that rewrite the
+datasets packet. No real applicant data is involved.
+"""
+
+import os
+import random
+import zlib
+from dataclasses import asdict, dataclass
+
+_XFA_DATA_NS = "http://www.xfa.org/schema/xfa-data/1.0/"
+_TEMPLATE_NS = "http://www.xfa.org/schema/xfa-template/3.3/"
+
+
+@dataclass
+class CorpusSpec:
+    """Shape of one synthetic document."""
+
+    fields: int = 500
+    images: int = 4
+    image_bytes: int = 64 * 1024
+    compress: bool = True
+    object_streams: bool = False
+    updates: int = 0
+    seed: int = 0
+
+    def to_dict(self):
+        return asdict(self)
+
+
+def datasets_xml(fields, revision=0, rng=None):
+    """Return a datasets packet with `fields` leaf values in repeating rows."""
+    rng = rng or random.Random(0)
+    rows = []
+    for i in range(0, fields, 5):
+        cells = "".join(
+            f"<Cell{j}>r{revision}-{i + j}-{rng.randrange(10**6)}</Cell{j}>"
+            for j in range(min(5, fields - i))
+        )
+        rows.append(f"<Row>{cells}</Row>")
+    return (
+        f'<xfa:datasets xmlns:xfa="{_XFA_DATA_NS}"><xfa:data><form1>'
+        f"<Page1><PersonalDetails><Name><FamilyName>Applicant</FamilyName>"
+        f"<GivenName>Test</GivenName></Name></PersonalDetails>"
+        f"<History>{''.join(rows)}</History></Page1>"
+        f"</form1></xfa:data></xfa:datasets>"
+    ).encode("utf-8")
+
+
+def template_xml(fields):
+    """Return a template packet roughly proportional in size to `fields`."""
+    body = "".join(
+        f'<field name="Cell{i % 5}" w="40mm" h="9mm"><caption><value>'
+        f"<text>Caption {i}</text></value></caption><ui><textEdit/></ui></field>"
+        for i in range(fields)
+    )
+    return (
+        f'<template xmlns="{_TEMPLATE_NS}"><subform name="form1">'
+        f'<subform name="Page1">{body}</subform></subform></template>'
+    ).encode("utf-8")
+
+
+class _Writer:
+    def __init__(self, spec):
+        self.spec = spec
+        self.out = bytearray(b"%PDF-1.7\n%\xe2\xe3\xcf\xd3\n")
+        self.offsets = {}
+        self.compressed = {}
+
+    def stream_object(self, raw, extra=b"", flate=None):
+        flate = self.spec.compress if flate is None else flate
+        body = zlib.compress(raw) if flate else raw
+        head = b"<< /Length %d" % len(body)
+        if flate:
+            head += b" /Filter /FlateDecode"
+        return head + extra + b" >>\nstream\n" + body + b"\nendstream"
+
+    def add(self, num, body):
+        self.offsets[num] = len(self.out)
+        self.out += b"%d 0 obj\n" % num + body + b"\nendobj\n"
+
+    def xref_table(self, nums, size, prev=None):
+        start = len(self.out)
+        self.out += b"xref\n0 1\n0000000000 65535 f \n"
+        for num in sorted(nums):
+            self.out += b"%d 1\n%010d 00000 n \n" % (num, self.offsets[num])
+        self.out += b"trailer\n<< /Size %d /Root 1 0 R" % size
+        if prev is not None:
+            self.out += b" /Prev %d" % prev
+        self.out += b" >>\nstartxref\n%d\n%%%%EOF\n" % start
+        return start
+
+    def xref_stream(self, num, nums, size, prev=None):
+        start = len(self.out)
+        self.offsets[num] = start
+        rows = [(0, 0, 65535)]
+        index = [0, 1]
+        for n in sorted(set(nums) | {num}):
+            if n in self.compressed:
+                rows.append((2,) + self.compressed[n])
+            else:
+                rows.append((1, self.offsets[n], 0))
+            index += [n, 1]
+        data = b"".join(
+            bytes([t]) + a.to_bytes(4, "big") + b.to_bytes(2, "big") for t, a, b in rows
+        )
+        extra = b" /Type /XRef /W [1 4 2] /Size %d /Root 1 0 R /Index [%s]" % (
+            size,
+            " ".join(map(str, index)).encode(),
+        )
+        if prev is not None:
+            extra += b" /Prev %d" % prev
+        self.add(num, self.stream_object(data, extra, flate=True))
+        self.out += b"startxref\n%d\n%%%%EOF\n" % start
+        return start
+
+
+def build_pdf(spec):
+    """Return the bytes of a synthetic XFA PDF described by spec."""
+    rng = random.Random(spec.seed)
+    w = _Writer(spec)
+
+    # 1 catalog, 2 AcroForm, 3-6 XFA packets, 7.. images, then ObjStm/xref.
+    image_nums = list(range(7, 7 + spec.images))
+    next_num = 7 + spec.images
+    catalog = b"<< /Type /Catalog /AcroForm 2 0 R >>"
+    acroform = (
+        b"<< /Fields [] /XFA [(preamble) 3 0 R (template) 4 0 R "
+        b"(datasets) 5 0 R (postamble) 6 0 R] >>"
+    )
+
+    if spec.object_streams:
+        objstm_num = next_num
+        next_num += 1
+        header = b"1 0 2 %d " % (len(catalog) + 1)
+        w.compressed[1] = (objstm_num, 0)
+        w.compressed[2] = (objstm_num, 1)
+        w.add(
+            objstm_num,
+            w.stream_object(
+                header + catalog + b" " + acroform,
+                b" /Type /ObjStm /N 2 /First %d" % len(header),
+                flate=True,
+            ),
+        )
+    else:
+        w.add(1, catalog)
+        w.add(2, acroform)
+
+    w.add(3, w.stream_object(b'<xdp:xdp xmlns:xdp="http://ns.adobe.com/xdp/">'))
+    w.add(4, w.stream_object(template_xml(spec.fields)))
+    w.add(5, w.stream_object(datasets_xml(spec.fields, 0, rng)))
+    w.add(6, w.stream_object(b"</xdp:xdp>"))
+    for num in image_nums:
+        w.add(
+            num,
+            w.stream_object(
+                rng.randbytes(spec.image_bytes),
+                b" /Type /XObject /Subtype /Image /Width 64 /Height 64"
+                b" /ColorSpace /DeviceRGB /BitsPerComponent 8 /Filter /DCTDecode",
+                flate=False,
+            ),
+        )
+
+    nums = [n for n in w.offsets]
+    size = next_num + 1
+    if spec.object_streams:
+        prev = w.xref_stream(next_num, nums + [1, 2], size)
+    else:
+        prev = w.xref_table(nums, size)
+
+    for revision in range(1, spec.updates + 1):
+        w.add(5, w.stream_object(datasets_xml(spec.fields, revision, rng)))
+        if spec.object_streams:
+            next_num += 1
+            size = next_num + 1
+            prev = w.xref_stream(next_num, [5], size, prev)
+        else:
+            prev = w.xref_table([5], size, prev)
+
+    return bytes(w.out)
+
+
+def write_corpus(directory, count, spec):
+    """Write `count` documents (seeds spec.seed..) into directory; return paths."""
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+    for i in range(count):
+        doc = CorpusSpec(**dict(spec.to_dict(), seed=spec.seed + i))
+        path = os.path.join(directory, f"synthetic-{i:05d}.pdf")
+        with open(path, "wb") as f:
+            f.write(build_pdf(doc))
+        paths.append(path)
+    return paths
@@ -0,0 +1,170 @@
+"""
+Long-running JSON-RPC 2.0 worker over stdin/stdout.
+
+Keeps one warm interpreter (pypdf imported once, cache connection open)
+so callers do not pay interpreter start-up per document. Each request
+and response is one line of JSON:
+
+    -> {"jsonrpc": "2.0", "id": 1, "method": "extract",
+        "params": {"path": "/case/imm1344.pdf", "engine": "raw"}}
+    <- {"jsonrpc": "2.0", "id": 1, "result": {"file": ..., "ok": true, ...}}
+
+Methods:
+    extract       {path, engine?, include_datasets?}  -> ExtractionResult dict
+    extract_many  {paths, engine?, include_datasets?} -> list of the above
+    ping          {}                                  -> {"pid", "engines"}
+    stats         {}                                  -> per-route counters
+    shutdown      {}                                  -> null, then exit
+
+Extraction failures are reported inside the result (ok=false); JSON-RPC
+errors are reserved for malformed requests. Anything the extractors
+print goes to stderr so stdout carries protocol lines only.
+
+Usage:
+    python3 -m xfa_extract.worker [--cache-dir DIR]
+"""
+
+import argparse
+import json
+import os
+import sys
+
+from .api import ENGINES, extract
+from .cache import XfaCache
+
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+
+
+class _RpcError(Exception):
+    def __init__(self, code, message):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+
+
+class Worker:
+    """Dispatches JSON-RPC requests to the extraction API."""
+
+    def __init__(self, cache_dir=None):
+        self.cache = XfaCache(cache_dir) if cache_dir else None
+        self.running = True
+
+    def _extract(self, params):
+        path = params.get("path")
+        if not isinstance(path, str):
+            raise _RpcError(INVALID_PARAMS, "params.path must be a string")
+        engine = params.get("engine", "raw")
+        if engine not in ENGINES:
+            raise _RpcError(INVALID_PARAMS, f"Unknown engine: {engine}")
+        result = extract(path, engine, self.cache)
+        return result.to_dict(include_datasets=bool(params.get("include_datasets")))
+
+    def rpc_extract(self, params):
+        return self._extract(params)
+
+    def rpc_extract_many(self, params):
+        paths = params.get("paths")
+        if not isinstance(paths, list):
+            raise _RpcError(INVALID_PARAMS, "params.paths must be a list")
+        return [self._extract(dict(params, path=p)) for p in paths]
+
+    def rpc_ping(self, params):
+        return {"pid": os.getpid(), "engines": list(ENGINES)}
+
+    def rpc_stats(self, params):
+        from .router import default_router
+
+        return default_router.stats()
+
+    def rpc_shutdown(self, params):
+        self.running = False
+        return None
+
+    def handle_line(self, line):
+        """Return the response dict for one request line (None for notifications)."""
+        request, error = parse_request(line)
+        if error is not None:
+            return error
+
+        request_id = request.get("id")
+        try:
+            handler = _handler(self, request)
+            result = handler(request["params"])
+        except _RpcError as e:
+            return _error(request_id, e.code, e.message)
+        return _result(request, result)
+
+    def serve(self, stdin=None, stdout=None):
+        stdin = stdin or sys.stdin
+        stdout = stdout or sys.stdout
+        # Keep stray prints from library code off the protocol stream.
+        saved = sys.stdout
+        sys.stdout = sys.stderr
+        try:
+            for line in stdin:
+                if not line.strip():
+                    continue
+                response = self.handle_line(line)
+                if response is not None:
+                    stdout.write(json.dumps(response, ensure_ascii=False) + "\n")
+                    stdout.flush()
+                if not self.running:
+                    break
+        finally:
+            sys.stdout = saved
+            if self.cache is not None:
+                self.cache.close()
+
+
+def parse_request(line):
+    """
+    Decode one JSON-RPC request line. Returns (request, None) with
+    request["params"] normalised to a dict-or-invalid value, or
+    (None, error response) for unparseable or malformed lines.
+    """
+    try:
+        request = json.loads(line)
+    except json.JSONDecodeError as e:
+        return None, _error(None, PARSE_ERROR, f"Parse error: {e}")
+    if not isinstance(request, dict) or not isinstance(request.get("method"), str):
+        return None, _error(None, INVALID_REQUEST, "Invalid request")
+    request["params"] = request.get("params") or {}
+    return request, None
+
+
+def _handler(target, request):
+    handler = getattr(target, f"rpc_{request['method']}", None)
+    if handler is None:
+        raise _RpcError(METHOD_NOT_FOUND, f"Method not found: {request['method']}")
+    if not isinstance(request["params"], dict):
+        raise _RpcError(INVALID_PARAMS, "params must be an object")
+    return handler
+
+
+def _result(request, result):
+    if "id" not in request:
+        return None
+    return {"jsonrpc": "2.0", "id": request["id"], "result": result}
+
+
+def _error(request_id, code, message):
+    return {
+        "jsonrpc": "2.0",
+        "id": request_id,
+        "error": {"code": code, "message": message},
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="XFA extraction JSON-RPC worker")
+    parser.add_argument("--cache-dir", help="serve raw-engine results from this cache")
+    args = parser.parse_args(argv)
+    Worker(args.cache_dir).serve()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
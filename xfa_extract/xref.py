@@ -0,0 +1,648 @@
+"""
+Lightweight PDF cross-reference resolver.
+
+Reads `startxref` from the file tail, follows the xref chain (classic
+tables, xref streams, hybrid /XRefStm sections and /Prev incremental
+updates) and then seeks only to the objects it is asked for. Objects
+stored in object streams are resolved through their container. Used to
+jump straight from the trailer to /Root -> /AcroForm -> /XFA without
+scanning the whole file.
+
+Parsed values map to plain Python types: dict (keys keep their leading
+slash, e.g. "/AcroForm"), list, int, float, bool, None, bytes for
+strings, Name for names, Ref for indirect references and Stream for
+stream objects.
+
+Encrypted documents are opened with the empty user password (the usual
+case for owner-protected forms): the file key is derived once, on first
+access, and only the objects actually read are decrypted.
+"""
+
+import os
+import re
+from collections import namedtuple
+
+from .crypt import StandardSecurityHandler
+from .filters import FILTER_ALIASES, decode_filters
+from .instrument import count, stage
+
+# How much of the file tail to read when looking for `startxref`.
+TAIL_BYTES = 2048
+# Initial read size for an object; doubled until the object parses.
+OBJECT_WINDOW = 4096
+# Guard against /Prev loops in damaged files.
+MAX_XREF_SECTIONS = 1024
+# Trailer entries merged across revisions (newest wins). Xref stream
+# dictionaries double as trailers, so their /W, /Filter etc. are dropped.
+TRAILER_KEYS = ("/Root", "/Info", "/Encrypt", "/ID", "/Size")
+
+Ref = namedtuple("Ref", "num gen")
+
+
+class Name(str):
+    """A PDF name, stored with its leading slash."""
+
+
+class Stream:
+    """A stream object: its dictionary plus the location of its raw body."""
+
+    __slots__ = ("dict", "offset", "length", "ref")
+
+    def __init__(self, dictionary, offset, length, ref=None):
+        self.dict = dictionary
+        self.offset = offset
+        self.length = length
+        # The indirect object holding this stream; keys its decryption.
+        self.ref = ref
+
+    def get(self, key, default=None):
+        return self.dict.get(key, default)
+
+    def __getitem__(self, key):
+        return self.dict[key]
+
+    def __contains__(self, key):
+        return key in self.dict
+
+
+class XrefError(Exception):
+    """The file's cross-reference data is missing, damaged or unsupported."""
+
+
+class _NeedMore(Exception):
+    pass
+
+
+_WHITESPACE = b" \t\r\n\x0c\x00"
+_DELIMITERS = b"()<>[]{}/%"
+_NUMBER = re.compile(rb"[+-]?(?:\d+\.?\d*|\.\d+)")
+_REF_TAIL = re.compile(rb"\s+(\d+)\s+R(?![A-Za-z0-9])")
+_OBJ_HEADER = re.compile(rb"\s*(\d+)\s+(\d+)\s+obj")
+_STREAM_START = re.compile(rb"stream(?:\r\n|\n|\r)")
+_STARTXREF = re.compile(rb"startxref\s+(\d+)")
+_SUBSECTION = re.compile(rb"\s*(\d+)\s+(\d+)[ \t]*(?:\r\n|\n|\r)")
+_STRING_ESCAPES = {
+    ord("n"): b"\n",
+    ord("r"): b"\r",
+    ord("t"): b"\t",
+    ord("b"): b"\b",
+    ord("f"): b"\f",
+    ord("("): b"(",
+    ord(")"): b")",
+    ord("\\"): b"\\",
+}
+
+
+class _Parser:
+    """Recursive-descent parser over a byte window of the file."""
+
+    def __init__(self, data, pos=0, complete=False):
+        self.data = data
+        self.pos = pos
+        # complete=True means data runs to EOF, so running out is an error
+        # rather than a request for a bigger window.
+        self.complete = complete
+
+    def _eof(self):
+        if self.complete:
+            raise XrefError("Unexpected end of file")
+        raise _NeedMore()
+
+    def skip_ws(self):
+        data = self.data
+        while True:
+            if self.pos >= len(data):
+                return
+            c = data[self.pos]
+            if c in _WHITESPACE:
+                self.pos += 1
+            elif c == 0x25:  # %
+                end = data.find(b"\n", self.pos)
+                self.pos = len(data) if end == -1 else end + 1
+            else:
+                return
+
+    def parse(self):
+        self.skip_ws()
+        data = self.data
+        if self.pos >= len(data):
+            self._eof()
+        c = data[self.pos]
+        if c == 0x3C:  # <
+            if data[self.pos + 1 : self.pos + 2] == b"<":
+                return self._dict()
+            return self._hex_string()
+        if c == 0x5B:  # [
+            return self._array()
+        if c == 0x28:  # (
+            return self._string()
+        if c == 0x2F:  # /
+            return self._name()
+        match = _NUMBER.match(data, self.pos)
+        if match:
+            return self._number(match)
+        return self._keyword()
+
+    def _dict(self):
+        self.pos += 2
+        result = {}
+        while True:
+            self.skip_ws()
+            if self.pos + 1 >= len(self.data):
+                self._eof()
+            if self.data[self.pos : self.pos + 2] == b">>":
+                self.pos += 2
+                return result
+            key = self.parse()
+            result[key] = self.parse()
+
+    def _array(self):
+        self.pos += 1
+        result = []
+        while True:
+            self.skip_ws()
+            if self.pos >= len(self.data):
+                self._eof()
+            if self.data[self.pos] == 0x5D:  # ]
+                self.pos += 1
+                return result
+            result.append(self.parse())
+
+    def _name(self):
+        data = self.data
+        end = self.pos + 1
+        while end < len(data) and data[end] not in _WHITESPACE and data[end] not in _DELIMITERS:
+            end += 1
+        if end >= len(data):
+            self._eof()
+        raw = data[self.pos + 1 : end]
+        self.pos = end
+        if b"#" in raw:
+            raw = re.sub(rb"#([0-9A-Fa-f]{2})", lambda m: bytes([int(m.group(1), 16)]), raw)
+        return Name("/" + raw.decode("latin-1"))
+
+    def _number(self, match):
+        token = match.group(0)
+        self.pos = match.end()
+        if b"." in token:
+            return float(token)
+        ref = _REF_TAIL.match(self.data, self.pos)
+        if ref:
+            self.pos = ref.end()
+            return Ref(int(token), int(ref.group(1)))
+        if self.pos >= len(self.data) and not self.complete:
+            raise _NeedMore()  # the window may have cut a longer number or "N G R"
+        return int(token)
+
+    def _keyword(self):
+        data = self.data
+        end = self.pos
+        while end < len(data) and data[end] not in _WHITESPACE and data[end] not in _DELIMITERS:
+            end += 1
+        word = data[self.pos : end]
+        if not word:
+            raise XrefError(f"Unexpected byte {data[self.pos:self.pos + 1]!r} at {self.pos}")
+        self.pos = end
+        if word == b"true":
+            return True
+        if word == b"false":
+            return False
+        if word == b"null":
+            return None
+        return word
+
+    def _string(self):
+        data = self.data
+        out = bytearray()
+        depth = 1
+        pos = self.pos + 1
+        while True:
+            if pos >= len(data):
+                self._eof()
+            c = data[pos]
+            if c == 0x5C:  # backslash
+                pos += 1
+                if pos >= len(data):
+                    self._eof()
+                e = data[pos]
+                if e in _STRING_ESCAPES:
+                    out += _STRING_ESCAPES[e]
+                elif 0x30 <= e <= 0x37:
+                    digits = data[pos : pos + 3]
+                    n = 1
+                    while n < len(digits) and 0x30 <= digits[n] <= 0x37:
+                        n += 1
+                    out.append(int(digits[:n], 8) & 0xFF)
+                    pos += n - 1
+                elif e == 0x0D:
+                    if data[pos + 1 : pos + 2] == b"\n":
+                        pos += 1
+                elif e != 0x0A:
+                    out.append(e)
+            elif c == 0x28:
+                depth += 1
+                out.append(c)
+            elif c == 0x29:
+                depth -= 1
+                if depth == 0:
+                    self.pos = pos + 1
+                    return bytes(out)
+                out.append(c)
+            else:
+                out.append(c)
+            pos += 1
+
+    def _hex_string(self):
+        end = self.data.find(b">", self.pos)
+        if end == -1:
+            self._eof()
+        digits = re.sub(rb"\s+", b"", self.data[self.pos + 1 : end])
+        self.pos = end + 1
+        if len(digits) % 2:
+            digits += b"0"
+        return bytes.fromhex(digits.decode("latin-1"))
+
+
+def _filter_chain(stream_dict):
+    filters = stream_dict.get("/Filter")
+    parms = stream_dict.get("/DecodeParms")
+    if filters is None:
+        return [], []
+    if not isinstance(filters, list):
+        filters, parms = [filters], [parms]
+    elif not isinstance(parms, list):
+        parms = [parms] * len(filters)
+    names = [FILTER_ALIASES.get(f[1:], f[1:]) for f in filters]
+    plain = [
+        {k[1:]: v for k, v in p.items()} if isinstance(p, dict) else None
+        for p in parms
+    ]
+    return names, plain + [None] * (len(names) - len(plain))
+
+
+class XrefResolver:
+    """
+    Resolve indirect objects of one PDF through its cross-reference data.
+
+    Only the tail, the xref sections and the requested objects are read;
+    bytes_read tracks how much of the file was touched.
+    """
+
+    def __init__(self, file_path):
+        self.file_path = file_path
+        self._file = open(file_path, "rb")
+        self.size = os.fstat(self._file.fileno()).st_size
+        self.bytes_read = 0
+        self.trailer = {}
+        # Newest revision first; each is a callable num -> entry or None.
+        self._sections = []
+        # (file offset, callable returning the in-use object numbers), same order.
+        self._section_objects = []
+        self._objects = {}
+        self._object_streams = {}
+        self._security = None
+        self._encrypt_num = None
+        try:
+            with stage("xref"):
+                self._load_xref_chain()
+            encrypt = self.trailer.get("/Encrypt")
+            if isinstance(encrypt, Ref):
+                # The /Encrypt dictionary itself is never encrypted.
+                self._encrypt_num = encrypt.num
+        except BaseException:
+            self._file.close()
+            raise
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _read(self, offset, length):
+        self._file.seek(offset)
+        data = self._file.read(length)
+        self.bytes_read += len(data)
+        count("bytes_read", len(data))
+        return data
+
+    def _parse_at(self, offset, parse):
+        """Call parse(parser) over a growing window starting at offset."""
+        window = OBJECT_WINDOW
+        while True:
+            data = self._read(offset, window)
+            complete = offset + len(data) >= self.size
+            try:
+                return parse(_Parser(data, 0, complete))
+            except (_NeedMore, IndexError):
+                if complete:
+                    raise XrefError(f"Truncated object at offset {offset}")
+                window *= 2
+
+    # -- xref chain ---------------------------------------------------------
+
+    @property
+    def revisions(self):
+        """Number of xref sections (1 + incremental updates)."""
+        return len(self._sections)
+
+    def _load_xref_chain(self):
+        tail_start = max(0, self.size - TAIL_BYTES)
+        tail = self._read(tail_start, self.size - tail_start)
+        matches = list(_STARTXREF.finditer(tail))
+        if not matches:
+            raise XrefError("No startxref found in file tail")
+        offset = int(matches[-1].group(1))
+        self.startxref = offset
+
+        seen = set()
+        while offset is not None:
+            if offset in seen or len(seen) >= MAX_XREF_SECTIONS:
+                raise XrefError("Cyclic or runaway /Prev chain")
+            if not 0 <= offset < self.size:
+                raise XrefError(f"xref offset {offset} outside file")
+            seen.add(offset)
+            head = self._read(offset, 4)
+            if head == b"xref":
+                trailer = self._load_xref_table(offset)
+                if "/XRefStm" in trailer:
+                    # Hybrid file: the stream holds entries the table omits,
+                    # and is consulted after the table of the same revision.
+                    self._load_xref_stream(trailer["/XRefStm"])
+            else:
+                trailer = self._load_xref_stream(offset)
+            for key in TRAILER_KEYS:
+                if key in trailer:
+                    self.trailer.setdefault(key, trailer[key])
+            prev = trailer.get("/Prev")
+            offset = prev if isinstance(prev, int) else None
+
+    def _load_xref_table(self, offset):
+        pos = offset + 4
+        subsections = []
+        while True:
+            head = self._read(pos, 64)
+            stripped = head.lstrip(_WHITESPACE)
+            if stripped.startswith(b"trailer"):
+                pos += len(head) - len(stripped) + len(b"trailer")
+                break
+            match = _SUBSECTION.match(head)
+            if not match:
+                raise XrefError(f"Malformed xref subsection at {pos}")
+            start, n = int(match.group(1)), int(match.group(2))
+            entries_at = pos + match.end()
+            # Entries are nominally 20 bytes; tolerate 19/21-byte writers.
+            first = self._read(entries_at, 21) if n else b""
+            width = 20
+            if n:
+                eol = re.match(rb"\d{10} \d{5} [nf]( ?\r\n| ?\n| ?\r)", first)
+                if not eol:
+                    raise XrefError(f"Malformed xref entry at {entries_at}")
+                width = eol.end()
+            subsections.append((start, n, entries_at, width))
+            pos = entries_at + n * width
+
+        trailer = self._parse_at(pos, lambda p: p.parse())
+        if not isinstance(trailer, dict):
+            raise XrefError("Malformed trailer")
+
+        def lookup(num):
+            for start, n, entries_at, width in subsections:
+                if start <= num < start + n:
+                    line = self._read(entries_at + (num - start) * width, 18)
+                    if line[17:18] != b"n":
+                        return ("free",)
+                    return ("offset", int(line[:10]), int(line[11:16]))
+            return None
+
+        def numbers():
+            for start, n, entries_at, width in subsections:
+                data = self._read(entries_at, n * width)
+                for i in range(n):
+                    if data[i * width + 17 : i * width + 18] == b"n":
+                        yield start + i
+
+        self._sections.append(lookup)
+        self._section_objects.append((offset, numbers))
+        return trailer
+
+    def _load_xref_stream(self, offset):
+        stream = self._object_at(offset)
+        if not isinstance(stream, Stream) or stream.get("/Type") != "/XRef":
+            raise XrefError(f"No xref stream at offset {offset}")
+        data = self._stream_data(stream)
+        widths = stream["/W"]
+        index = stream.get("/Index") or [0, stream["/Size"]]
+        row = sum(widths)
+        entries = {}
+        pos = 0
+        for start, n in zip(index[::2], index[1::2]):
+            for num in range(start, start + n):
+                if pos + row > len(data):
+                    break
+                fields = []
+                for w in widths:
+                    fields.append(int.from_bytes(data[pos : pos + w], "big") if w else None)
+                    pos += w
+                kind = 1 if fields[0] is None else fields[0]
+                if kind == 0:
+                    entries[num] = ("free",)
+                elif kind == 1:
+                    entries[num] = ("offset", fields[1], fields[2] or 0)
+                elif kind == 2:
+                    entries[num] = ("compressed", fields[1], fields[2])
+        self._sections.append(entries.get)
+        self._section_objects.append(
+            (offset, lambda: (n for n, e in entries.items() if e[0] != "free"))
+        )
+        return stream.dict
+
+    # -- objects ------------------------------------------------------------
+
+    def _parse_indirect(self, parser):
+        match = _OBJ_HEADER.match(parser.data, parser.pos)
+        if not match:
+            raise XrefError("Expected 'N G obj'")
+        parser.pos = match.end()
+        value = parser.parse()
+        parser.skip_ws()
+        rest = parser.data[parser.pos : parser.pos + 8]
+        if len(rest) < 8 and b"stream\r\n".startswith(rest):
+            # The window ends at, or inside, the stream keyword and its EOL.
+            parser._eof()
+        stream = _STREAM_START.match(parser.data, parser.pos)
+        if stream and isinstance(value, dict):
+            value = Stream(value, stream.end(), value.get("/Length"))
+        return int(match.group(1)), int(match.group(2)), value
+
+    def _object_at(self, offset):
+        num, gen, value = self._parse_at(offset, self._parse_indirect)
+        if isinstance(value, Stream):
+            value.offset += offset
+            value.ref = Ref(num, gen)
+        return value
+
+    # -- encryption ---------------------------------------------------------
+
+    @property
+    def encrypted(self):
+        return "/Encrypt" in self.trailer
+
+    @property
+    def security(self):
+        """The StandardSecurityHandler of an encrypted file, built on first use."""
+        if self._security is None and self.encrypted:
+            encrypt = self.resolve(self.trailer["/Encrypt"])
+            if not isinstance(encrypt, dict):
+                raise XrefError("Missing /Encrypt dictionary")
+            ids = self.trailer.get("/ID")
+            first_id = ids[0] if isinstance(ids, list) and ids else b""
+            self._security = StandardSecurityHandler(encrypt, first_id)
+        return self._security
+
+    def _decrypt_strings(self, value, num, gen):
+        security = self.security
+        if isinstance(value, bytes):
+            return security.decrypt_string(value, num, gen)
+        if isinstance(value, Stream):
+            value.dict = self._decrypt_strings(value.dict, num, gen)
+        elif isinstance(value, dict):
+            return {k: self._decrypt_strings(v, num, gen) for k, v in value.items()}
+        elif isinstance(value, list):
+            return [self._decrypt_strings(v, num, gen) for v in value]
+        return value
+
+    def objects_since(self, offset):
+        """
+        Return the numbers of objects (re)defined by xref sections located
+        at or after offset, i.e. by the incremental updates appended to a
+        file that was offset bytes long.
+        """
+        updated = set()
+        for section_offset, numbers in self._section_objects:
+            if section_offset >= offset:
+                updated.update(numbers())
+        return updated
+
+    def entry(self, num):
+        for lookup in self._sections:
+            found = lookup(num)
+            if found is not None:
+                return found
+        return None
+
+    def get(self, ref):
+        """Return the object for a Ref (or object number); None if absent."""
+        num = ref.num if isinstance(ref, Ref) else ref
+        if num in self._objects:
+            return self._objects[num]
+        found = self.entry(num)
+        if found is None or found[0] == "free":
+            value = None
+        elif found[0] == "offset":
+            value = self._object_at(found[1])
+            # Objects inside object streams were decrypted with their container.
+            if self.encrypted and num != self._encrypt_num:
+                value = self._decrypt_strings(value, num, found[2])
+        else:
+            value = self._from_object_stream(found[1], found[2])
+        self._objects[num] = value
+        return value
+
+    def resolve(self, value):
+        """Follow a Ref to its object; other values are returned unchanged."""
+        while isinstance(value, Ref):
+            value = self.get(value)
+        return value
+
+    def _from_object_stream(self, container_num, index):
+        parsed = self._object_streams.get(container_num)
+        if parsed is None:
+            container = self.get(container_num)
+            if not isinstance(container, Stream):
+                raise XrefError(f"Object stream {container_num} not found")
+            data = self._stream_data(container)
+            first = container["/First"]
+            header = _Parser(data[:first], 0, complete=True)
+            offsets = []
+            for _ in range(container["/N"]):
+                offsets.append((header.parse(), header.parse()))
+            parsed = (data, first, offsets)
+            self._object_streams[container_num] = parsed
+        data, first, offsets = parsed
+        if index >= len(offsets):
+            raise XrefError(f"Index {index} outside object stream {container_num}")
+        return _Parser(data, first + offsets[index][1], complete=True).parse()
+
+    def raw_stream(self, stream):
+        """Return the still-encoded body of a Stream."""
+        length = self.resolve(stream.length)
+        if not isinstance(length, int):
+            raise XrefError("Stream without a usable /Length")
+        return self._read(stream.offset, length)
+
+    def _stream_data(self, stream):
+        filters, parms = _filter_chain(stream.dict)
+        data = self.raw_stream(stream)
+        if self.encrypted and self._needs_decryption(stream):
+            ref = stream.ref
+            with stage("decrypt"):
+                data = self.security.decrypt_stream(data, ref.num, ref.gen)
+        data = decode_filters(data, filters, parms)
+        if data is None:
+            raise XrefError(f"Cannot decode stream filters {filters}")
+        return data
+
+    def _needs_decryption(self, stream):
+        if stream.ref is None or stream.get("/Type") == "/XRef":
+            return False
+        if stream.get("/Type") == "/Metadata" and not self.security.encrypt_metadata:
+            return False
+        # A /Crypt filter in the chain overrides the default (Identity only).
+        return "Crypt" not in _filter_chain(stream.dict)[0]
+
+    def stream_data(self, stream):
+        """Return the decoded body of a Stream (or a Ref to one)."""
+        stream = self.resolve(stream)
+        if not isinstance(stream, Stream):
+            raise XrefError("Not a stream object")
+        return self._stream_data(stream)
+
+    # -- XFA ----------------------------------------------------------------
+
+    def catalog(self):
+        catalog = self.resolve(self.trailer.get("/Root"))
+        if not isinstance(catalog, dict):
+            raise XrefError("Missing document catalog")
+        return catalog
+
+    def xfa_packets(self, packets=("datasets",)):
+        """
+        Return {packet name: decoded bytes} for the requested XFA packets,
+        in document order. packets=None returns every packet. A single-stream
+        /XFA is returned under the name "xdp".
+        """
+        acroform = self.resolve(self.catalog().get("/AcroForm"))
+        if not isinstance(acroform, dict):
+            return {}
+        xfa = self.resolve(acroform.get("/XFA"))
+        if isinstance(xfa, Stream):
+            return {"xdp": self._stream_data(xfa)}
+        if not isinstance(xfa, list):
+            return {}
+        result = {}
+        for name, ref in zip(xfa[::2], xfa[1::2]):
+            name = self.resolve(name)
+            name = name.decode("latin-1") if isinstance(name, bytes) else str(name)
+            if packets is None or name in packets:
+                result[name] = self.stream_data(ref)
+        return result
+
+
+def read_xfa_packets(file_path, packets=("datasets",)):
+    """Open file_path, resolve its XFA packets through the xref and close it."""
+    with XrefResolver(file_path) as resolver:
+        return resolver.xfa_packets(packets)